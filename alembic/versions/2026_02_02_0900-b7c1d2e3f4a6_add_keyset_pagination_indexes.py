@@ -0,0 +1,58 @@
+"""add composite indexes for keyset pagination
+
+Also backfills snippets.usage_count and makes it NOT NULL so it can be
+used as a keyset sort key.
+
+Revision ID: b7c1d2e3f4a6
+Revises: acde2e3f4a5b
+Create Date: 2026-02-02 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c1d2e3f4a6'
+down_revision: Union[str, None] = 'acde2e3f4a5b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE snippets SET usage_count = 0 WHERE usage_count IS NULL")
+    with op.batch_alter_table('snippets') as batch_op:
+        batch_op.alter_column(
+            'usage_count',
+            existing_type=sa.Integer(),
+            nullable=False,
+            server_default='0',
+        )
+
+    op.create_index('ix_patients_created_at_id', 'patients', ['created_at', 'id'], unique=False)
+    op.create_index('ix_encounters_created_at_id', 'encounters', ['created_at', 'id'], unique=False)
+    op.create_index('ix_encounters_patient_created_at_id', 'encounters', ['patient_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_documents_created_at_id', 'documents', ['created_at', 'id'], unique=False)
+    op.create_index('ix_documents_patient_created_at_id', 'documents', ['patient_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_templates_title_id', 'templates', ['title', 'id'], unique=False)
+    op.create_index('ix_snippets_usage_count_title_id', 'snippets', [sa.text('usage_count DESC'), 'title', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_snippets_usage_count_title_id', table_name='snippets')
+    op.drop_index('ix_templates_title_id', table_name='templates')
+    op.drop_index('ix_documents_patient_created_at_id', table_name='documents')
+    op.drop_index('ix_documents_created_at_id', table_name='documents')
+    op.drop_index('ix_encounters_patient_created_at_id', table_name='encounters')
+    op.drop_index('ix_encounters_created_at_id', table_name='encounters')
+    op.drop_index('ix_patients_created_at_id', table_name='patients')
+
+    with op.batch_alter_table('snippets') as batch_op:
+        batch_op.alter_column(
+            'usage_count',
+            existing_type=sa.Integer(),
+            nullable=True,
+            server_default=None,
+        )
@@ -0,0 +1,38 @@
+"""add patient search index (pg_trgm + unaccent on PostgreSQL, FTS5 on SQLite)
+
+Revision ID: c4d5e6f7a8b9
+Revises: b7c1d2e3f4a6
+Create Date: 2026-02-03 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.patient_search_ddl import POSTGRES_CREATE, POSTGRES_DROP, SQLITE_CREATE, SQLITE_DROP
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d5e6f7a8b9'
+down_revision: Union[str, None] = 'b7c1d2e3f4a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _statements(postgres, sqlite):
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgres
+    if dialect == "sqlite":
+        return sqlite
+    return []
+
+
+def upgrade() -> None:
+    for statement in _statements(POSTGRES_CREATE, SQLITE_CREATE):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for statement in _statements(POSTGRES_DROP, SQLITE_DROP):
+        op.execute(statement)
@@ -0,0 +1,28 @@
+"""add upload_sessions lease columns (one writer per upload across workers)
+
+Revision ID: b9c0d1e2f3a4
+Revises: a8b9c0d1e2f3
+Create Date: 2026-02-08 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9c0d1e2f3a4'
+down_revision: Union[str, None] = 'a8b9c0d1e2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('upload_sessions', sa.Column('lease_token', sa.String(length=32), nullable=True))
+    op.add_column('upload_sessions', sa.Column('leased_until', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('upload_sessions', 'leased_until')
+    op.drop_column('upload_sessions', 'lease_token')
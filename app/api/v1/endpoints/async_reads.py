@@ -0,0 +1,173 @@
+"""
+Async variants of the read-heavy endpoints (enabled with ASYNC_DB_ENABLED).
+
+The router is mounted ahead of the sync routers, so these routes take over
+the same paths. Each one runs on the event loop with an AsyncSession and
+executes the sync endpoint's query code through ``AsyncSession.run_sync``:
+database I/O is awaited on the async driver instead of holding a threadpool
+thread, and both stacks return identical responses.
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.endpoints import encounters, patients, search, snippets, templates
+from app.core.deps import get_current_active_user_async
+from app.core.principal_cache import Principal
+from app.db.async_session import get_async_db
+from app.models.encounter import MedicalSpecialty
+from app.schemas.encounter import Encounter as EncounterSchema, EncounterWithDetails
+from app.schemas.patient import Patient as PatientSchema, PatientWithAge
+from app.schemas.snippet import SnippetWithFavorite
+from app.schemas.template import TemplateWithFavorite
+
+router = APIRouter()
+
+CURSOR_QUERY = Query(None, description="Opaque cursor from X-Next-Cursor or X-Prev-Cursor")
+TOTAL_QUERY = Query(False, description="Return the (estimated) total in X-Total-Count")
+
+
+@router.get("/patients/", response_model=List[PatientSchema], tags=["Patients"])
+async def list_patients(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = CURSOR_QUERY,
+    include_total: bool = TOTAL_QUERY,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """Get list of all patients with pagination (async stack)."""
+    return await db.run_sync(lambda session: patients.list_patients(
+        response, skip=skip, limit=limit, cursor=cursor, include_total=include_total,
+        db=session, current_user=current_user,
+    ))
+
+
+@router.get("/patients/{patient_id}", response_model=PatientWithAge, tags=["Patients"])
+async def get_patient(
+    patient_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """Get a specific patient by ID (async stack)."""
+    return await db.run_sync(lambda session: patients.get_patient(
+        patient_id, db=session, current_user=current_user,
+    ))
+
+
+@router.get("/patients/{patient_id}/encounters", response_model=List[EncounterSchema], tags=["Patients"])
+async def get_patient_encounters(
+    patient_id: int,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = CURSOR_QUERY,
+    include_total: bool = TOTAL_QUERY,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """Get all encounters for a specific patient (async stack)."""
+    return await db.run_sync(lambda session: patients.get_patient_encounters(
+        patient_id, response, skip=skip, limit=limit, cursor=cursor, include_total=include_total,
+        db=session, current_user=current_user,
+    ))
+
+
+@router.get("/encounters/", response_model=List[EncounterSchema], tags=["Encounters"])
+async def list_encounters(
+    response: Response,
+    patient_id: Optional[int] = Query(None, description="Filter by patient ID"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = CURSOR_QUERY,
+    include_total: bool = TOTAL_QUERY,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """List encounters with optional patient filter (async stack)."""
+    return await db.run_sync(lambda session: encounters.list_encounters(
+        response, patient_id=patient_id, skip=skip, limit=limit, cursor=cursor,
+        include_total=include_total, db=session, current_user=current_user,
+    ))
+
+
+@router.get("/encounters/{encounter_id}", response_model=EncounterWithDetails, tags=["Encounters"])
+async def get_encounter(
+    encounter_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """Get a specific encounter with patient and doctor details (async stack)."""
+    return await db.run_sync(lambda session: encounters.get_encounter(
+        encounter_id, db=session, current_user=current_user,
+    ))
+
+
+@router.get("/search/", response_model=search.GlobalSearchResponse, tags=["Search"])
+async def global_search(
+    q: str = Query(..., min_length=1, description="Search query"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum results per category"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """Global search for the Command Palette (async stack)."""
+    return await db.run_sync(lambda session: search.global_search(
+        q=q, limit=limit, db=session, current_user=current_user,
+    ))
+
+
+@router.get("/templates/", response_model=List[TemplateWithFavorite], tags=["Templates"])
+async def list_templates(
+    request: Request,
+    response: Response,
+    specialty: Optional[MedicalSpecialty] = Query(None, description="Filter by medical specialty"),
+    only_active: bool = Query(True, description="Show only active templates"),
+    only_favorites: bool = Query(False, description="Show only user favorites"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = CURSOR_QUERY,
+    include_total: bool = TOTAL_QUERY,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """List templates with favorite status for the current user (async stack)."""
+    return await db.run_sync(lambda session: templates.list_templates(
+        request, response, specialty=specialty, only_active=only_active, only_favorites=only_favorites,
+        skip=skip, limit=limit, cursor=cursor, include_total=include_total,
+        db=session, current_user=current_user,
+    ))
+
+
+@router.get("/snippets/", response_model=List[SnippetWithFavorite], tags=["Snippets"])
+async def list_snippets(
+    request: Request,
+    response: Response,
+    category: Optional[str] = Query(None, description="Filter by category"),
+    only_active: bool = Query(True, description="Show only active snippets"),
+    only_favorites: bool = Query(False, description="Show only user favorites"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    include_total: bool = TOTAL_QUERY,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """List snippets, most used first, with favorite status for the current user (async stack)."""
+    return await db.run_sync(lambda session: snippets.list_snippets(
+        request, response, category=category, only_active=only_active, only_favorites=only_favorites,
+        skip=skip, limit=limit, include_total=include_total,
+        db=session, current_user=current_user,
+    ))
+
+
+@router.get("/snippets/{snippet_id}", response_model=SnippetWithFavorite, tags=["Snippets"])
+async def get_snippet(
+    snippet_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_active_user_async)
+):
+    """Get a specific snippet by ID with favorite status (async stack)."""
+    return await db.run_sync(lambda session: snippets.get_snippet(
+        snippet_id, db=session, current_user=current_user,
+    ))
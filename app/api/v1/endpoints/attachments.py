@@ -1,15 +1,26 @@
 """
 Attachment endpoints for file uploads (photos, documents).
 """
-import os
-import shutil
-from typing import List, Optional
-from pathlib import Path
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from typing import Callable, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 from app.db.session import get_db
 from app.core.deps import get_current_active_user
-from app.models.user import User
+from app.core.principal_cache import Principal
+from app.core.http_cache import (
+    cache_headers,
+    content_disposition,
+    is_not_modified,
+    not_modified_response,
+    range_headers,
+    requested_range,
+    starts_transfer,
+    storage_redirect_response,
+    strong_etag,
+    weak_etag,
+)
 from app.models.patient import Patient
 from app.models.encounter import Encounter
 from app.models.attachment import Attachment, AttachmentType
@@ -17,39 +28,24 @@ from app.schemas.attachment import (
     Attachment as AttachmentSchema,
     AttachmentWithUploader
 )
+from app.services.attachment_storage import StoredUpload, UploadTooLargeError, attachment_storage
 from app.services.audit_service import audit_service
+from app.services.blob_store import blob_store
 
 router = APIRouter()
 
-# Directory to store uploaded files
-UPLOAD_DIR = Path("uploads/attachments")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
 
-@router.post("/", response_model=AttachmentSchema, status_code=status.HTTP_201_CREATED)
-async def upload_attachment(
-    file: UploadFile = File(...),
-    patient_id: int = Form(...),
-    encounter_id: Optional[int] = Form(None),
-    attachment_type: AttachmentType = Form(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """
-    Upload a file attachment (photo, PDF, document).
-    File is associated with a patient and optionally with an encounter.
-    """
-    # Verify patient exists
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+def _check_upload_targets(db: Session, patient_id: int, encounter_id: Optional[int]) -> None:
+    """Verify the patient exists and the encounter, if given, belongs to it."""
+    patient = db.query(Patient.id).filter(Patient.id == patient_id).first()
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Patient with ID {patient_id} not found"
         )
 
-    # Verify encounter exists if provided
     if encounter_id:
-        encounter = db.query(Encounter).filter(Encounter.id == encounter_id).first()
+        encounter = db.query(Encounter.patient_id).filter(Encounter.id == encounter_id).first()
         if not encounter:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -62,41 +58,44 @@ async def upload_attachment(
                 detail="Encounter does not belong to the specified patient"
             )
 
-    # Generate unique filename
-    import uuid
-    file_extension = Path(file.filename).suffix if file.filename else ""
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = UPLOAD_DIR / unique_filename
-
-    # Save file to disk
-    try:
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to save file: {str(e)}"
-        )
-    finally:
-        file.file.close()
 
-    # Get file size
-    file_size = file_path.stat().st_size
+def _record_upload(
+    db: Session,
+    current_user: Principal,
+    stored: StoredUpload,
+    patient_id: int,
+    encounter_id: Optional[int],
+    attachment_type: AttachmentType,
+    original_filename: Optional[str],
+    mime_type: Optional[str],
+    before_commit: Optional[Callable[[Attachment], None]] = None
+) -> Attachment:
+    """
+    Insert the attachment row for an incoming file and audit the upload.
 
-    # Create attachment record
+    The content is added to the blob store in the same transaction and the
+    incoming file is removed once the row is committed. ``before_commit`` is
+    called with the flushed attachment so callers can update their own rows
+    in that transaction.
+    """
     attachment = Attachment(
         patient_id=patient_id,
         encounter_id=encounter_id,
         created_by=current_user.id,
-        file_path=str(file_path),
-        mime_type=file.content_type,
+        file_path=blob_store.put_file(db, stored.path, stored.sha256, stored.size),
+        mime_type=mime_type,
         attachment_type=attachment_type,
-        original_filename=file.filename,
-        file_size=file_size
+        original_filename=original_filename,
+        file_size=stored.size,
+        file_hash=stored.sha256
     )
     db.add(attachment)
+    if before_commit is not None:
+        db.flush()
+        before_commit(attachment)
     db.commit()
     db.refresh(attachment)
+    stored.path.unlink(missing_ok=True)
 
     # Audit log
     audit_service.log(
@@ -109,34 +108,79 @@ async def upload_attachment(
             "patient_id": patient_id,
             "encounter_id": encounter_id,
             "attachment_type": attachment_type.value,
-            "file_size": file_size,
-            "original_filename": file.filename
+            "file_size": stored.size,
+            "file_hash": stored.sha256,
+            "original_filename": original_filename
         }
     )
 
     return attachment
 
 
+@router.post("/", response_model=AttachmentSchema, status_code=status.HTTP_201_CREATED)
+async def upload_attachment(
+    file: UploadFile = File(...),
+    patient_id: int = Form(...),
+    encounter_id: Optional[int] = Form(None),
+    attachment_type: AttachmentType = Form(...),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Upload a file attachment (photo, PDF, document).
+    File is associated with a patient and optionally with an encounter.
+
+    The file is streamed to storage in chunks and hashed on the way; files
+    over ATTACHMENT_MAX_UPLOAD_MB are refused with 413. Disk and database
+    work runs in the threadpool, never on the event loop.
+    """
+    await run_in_threadpool(_check_upload_targets, db, patient_id, encounter_id)
+
+    try:
+        stored = await attachment_storage.save(file)
+    except UploadTooLargeError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(exc)
+        )
+    except OSError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to save file: {str(e)}"
+        )
+    finally:
+        await file.close()
+
+    try:
+        return await run_in_threadpool(
+            _record_upload, db, current_user, stored, patient_id, encounter_id, attachment_type,
+            file.filename, file.content_type
+        )
+    except Exception:
+        await attachment_storage.discard(stored)
+        raise
+
+
 @router.get("/encounters/{encounter_id}/attachments", response_model=List[AttachmentWithUploader])
 def list_encounter_attachments(
     encounter_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     List all attachments associated with an encounter.
     Returns attachments with uploader information.
     """
     # Verify encounter exists
-    encounter = db.query(Encounter).filter(Encounter.id == encounter_id).first()
-    if not encounter:
+    encounter_exists = db.query(Encounter.id).filter(Encounter.id == encounter_id).first()
+    if not encounter_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Encounter with ID {encounter_id} not found"
         )
 
-    # Get attachments
-    attachments = db.query(Attachment).filter(
+    # Get attachments, with uploaders joined in rather than lazy-loaded per row
+    attachments = db.query(Attachment).options(joinedload(Attachment.uploader)).filter(
         Attachment.encounter_id == encounter_id
     ).all()
 
@@ -152,6 +196,7 @@ def list_encounter_attachments(
             "attachment_type": attachment.attachment_type,
             "original_filename": attachment.original_filename,
             "file_size": attachment.file_size,
+            "file_hash": attachment.file_hash,
             "created_by": attachment.created_by,
             "created_at": attachment.created_at,
             "uploader_name": attachment.uploader.full_name if attachment.uploader else None
@@ -165,10 +210,12 @@ def list_encounter_attachments(
 def get_attachment(
     attachment_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get attachment details by ID."""
-    attachment = db.query(Attachment).filter(Attachment.id == attachment_id).first()
+    attachment = db.query(Attachment).options(joinedload(Attachment.uploader)).filter(
+        Attachment.id == attachment_id
+    ).first()
     if not attachment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -184,9 +231,86 @@ def get_attachment(
         "attachment_type": attachment.attachment_type,
         "original_filename": attachment.original_filename,
         "file_size": attachment.file_size,
+        "file_hash": attachment.file_hash,
         "created_by": attachment.created_by,
         "created_at": attachment.created_at,
         "uploader_name": attachment.uploader.full_name if attachment.uploader else None
     }
 
     return attachment_dict
+
+
+@router.get("/{attachment_id}/download")
+def download_attachment(
+    attachment_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Download an attachment file.
+    Supports If-None-Match revalidation (304) and single byte ranges (206).
+    When files are kept in object storage the response is a 307 redirect to
+    a short-lived presigned URL.
+    """
+    attachment = db.query(Attachment).filter(Attachment.id == attachment_id).first()
+    if not attachment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Attachment with ID {attachment_id} not found"
+        )
+
+    stored = blob_store.open(attachment.file_path)
+    if stored is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attachment file not found in storage"
+        )
+
+    # Content hash when recorded at upload; size/mtime for older attachments
+    if attachment.file_hash:
+        etag = strong_etag(attachment.file_hash)
+    else:
+        etag = weak_etag(f"{stored.size:x}", f"{stored.mtime_ns:x}")
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    filename = attachment.original_filename or f"attachment_{attachment.id}"
+    media_type = attachment.mime_type or "application/octet-stream"
+
+    # With object storage the client downloads (and ranges) straight from the bucket
+    redirect_url = blob_store.presigned_url(attachment.file_path, filename, media_type)
+    if redirect_url:
+        response = storage_redirect_response(redirect_url)
+    else:
+        headers = cache_headers(etag)
+        headers["Content-Disposition"] = content_disposition("attachment", filename)
+        byte_range = requested_range(request, etag, stored.size)
+        if byte_range is not None:
+            start, end = byte_range
+            headers.update(range_headers(start, end, stored.size))
+            response = StreamingResponse(
+                stored.iter_bytes(start, end),
+                status_code=status.HTTP_206_PARTIAL_CONTENT,
+                media_type=media_type,
+                headers=headers
+            )
+        else:
+            headers["Content-Length"] = str(stored.size)
+            response = StreamingResponse(stored.iter_bytes(), media_type=media_type, headers=headers)
+
+    # Audit log, once per download: not for the later ranges of a file
+    if starts_transfer(response):
+        audit_service.log(
+            db=db,
+            user=current_user,
+            entity="attachment",
+            action="download",
+            entity_id=attachment.id,
+            metadata={
+                "patient_id": attachment.patient_id,
+                "encounter_id": attachment.encounter_id
+            }
+        )
+
+    return response
@@ -9,6 +9,7 @@ from app.db.session import get_db
 from app.core.config import settings
 from app.core.limiter import limiter
 from app.core.deps import require_admin
+from app.core.principal_cache import Principal
 from app.core.security import (
     verify_password,
     get_password_hash,
@@ -197,7 +198,7 @@ def register(
     user_in: UserCreate,
     request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ):
     """
     Register a new user.
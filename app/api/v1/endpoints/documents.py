@@ -2,28 +2,106 @@
 Document endpoints for managing generated PDFs.
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.core.deps import get_current_active_user
-from app.models.user import User
+from app.core.principal_cache import Principal
+from app.core.pagination import SortKey, paginate
+from app.core.http_cache import (
+    cache_headers,
+    content_disposition,
+    is_not_modified,
+    not_modified_response,
+    range_headers,
+    requested_range,
+    starts_transfer,
+    storage_redirect_response,
+    strong_etag,
+)
 from app.models.document import Document
 from app.schemas.document import Document as DocumentSchema
-from app.services.pdf_service import pdf_service
+from app.services.pdf_service import pdf_service, DocumentIntegrityError
 from app.services.audit_service import audit_service
+from app.services.blob_store import blob_store
 
 router = APIRouter()
 
 
+def _document_file_response(
+    document: Document,
+    disposition: str,
+    request: Optional[Request] = None,
+    redirect: bool = False
+) -> Response:
+    """
+    Build a PDF response for a stored document.
+
+    The ETag is the document's SHA-256, so If-None-Match revalidation is
+    answered with 304 without touching storage. Full bodies are read once,
+    in chunks, and hashed on the way out unless the file was already verified
+    at its current mtime/size. Range requests are only served from a file
+    already verified; otherwise the Range header is ignored and the full body
+    is sent (and verified), which a server may always do.
+
+    With ``redirect`` and object storage, the client is sent to a presigned
+    URL instead; blobs are keyed by their SHA-256 and the store checks that
+    checksum when they are written.
+    """
+    etag = strong_etag(document.file_hash)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    if redirect:
+        redirect_url = blob_store.presigned_url(document.pdf_path, document.filename, "application/pdf", disposition)
+        if redirect_url:
+            return storage_redirect_response(redirect_url)
+
+    try:
+        stream = pdf_service.open_document_stream(document)
+    except DocumentIntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Document integrity verification failed"
+        )
+
+    if stream is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document file not found in storage"
+        )
+
+    headers = cache_headers(etag)
+    headers["Content-Disposition"] = content_disposition(disposition, document.filename)
+
+    # Verifying first would read the whole file and then the range again
+    byte_range = requested_range(request, etag, stream.size) if stream.verified else None
+    if byte_range is not None:
+        start, end = byte_range
+        headers.update(range_headers(start, end, stream.size))
+        return StreamingResponse(
+            stream.iter_range(start, end),
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type="application/pdf",
+            headers=headers
+        )
+
+    headers["Content-Length"] = str(stream.size)
+    return StreamingResponse(stream, media_type="application/pdf", headers=headers)
+
+
 @router.get("/", response_model=List[DocumentSchema])
 def list_documents(
+    response: Response,
     patient_id: Optional[int] = Query(None, description="Filter by patient ID"),
     document_type: Optional[str] = Query(None, description="Filter by document type"),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor or X-Prev-Cursor"),
+    include_total: bool = Query(False, description="Return the (estimated) total in X-Total-Count"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     List all documents with optional filtering.
@@ -31,8 +109,10 @@ def list_documents(
     Args:
         patient_id: Filter by patient ID
         document_type: Filter by document type
-        skip: Number of records to skip
+        skip: Number of records to skip (legacy offset pagination)
         limit: Maximum number of records to return
+        cursor: Keyset cursor from a previous page
+        include_total: Whether to return X-Total-Count
         db: Database session
         current_user: Current authenticated user
 
@@ -47,16 +127,15 @@ def list_documents(
     if document_type:
         query = query.filter(Document.document_type == document_type)
 
-    documents = query.order_by(Document.created_at.desc()).offset(skip).limit(limit).all()
-
-    return documents
+    keys = (SortKey(Document.created_at, descending=True), SortKey(Document.id, descending=True))
+    return paginate(query, keys, response, limit, skip=skip, cursor=cursor, include_total=include_total)
 
 
 @router.get("/{document_id}", response_model=DocumentSchema)
 def get_document(
     document_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Get document metadata by ID.
@@ -86,19 +165,22 @@ def get_document(
 @router.get("/{document_id}/download")
 def download_document(
     document_id: int,
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Download a document PDF file.
 
     Args:
         document_id: Document ID
+        request: Incoming request (If-None-Match / Range headers)
         db: Database session
         current_user: Current authenticated user
 
     Returns:
-        PDF file as response
+        PDF file as response (200), a byte range (206), 304 Not Modified
+        or a redirect to object storage (307)
 
     Raises:
         HTTPException: If document not found or file doesn't exist
@@ -111,56 +193,41 @@ def download_document(
             detail=f"Document with ID {document_id} not found"
         )
 
-    # Load PDF from storage
-    pdf_bytes = pdf_service.get_document_bytes(document)
-
-    if pdf_bytes is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document file not found in storage"
-        )
+    # Open PDF stream (verified while it is sent), or answer 304/206
+    response = _document_file_response(document, "attachment", request, redirect=True)
 
-    # Verify integrity
-    if not pdf_service.verify_document_integrity(document):
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Document integrity verification failed"
+    # Audit log, once per download: not for 304s or the later ranges of a file
+    if starts_transfer(response):
+        audit_service.log_document_download(
+            db,
+            current_user,
+            document.id,
+            document.patient_id
         )
 
-    # Audit log
-    audit_service.log_document_download(
-        db,
-        current_user,
-        document.id,
-        document.patient_id
-    )
-
     # Return PDF
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"attachment; filename={document.filename}"
-        }
-    )
+    return response
 
 
 @router.get("/{document_id}/preview")
 def preview_document(
     document_id: int,
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Preview a document PDF inline in browser.
 
     Args:
         document_id: Document ID
+        request: Incoming request (If-None-Match / Range headers)
         db: Database session
         current_user: Current authenticated user
 
     Returns:
-        PDF file for inline display
+        PDF file for inline display (200), a byte range (206), 304 Not Modified
+        or a redirect to object storage (307)
 
     Raises:
         HTTPException: If document not found
@@ -173,37 +240,15 @@ def preview_document(
             detail=f"Document with ID {document_id} not found"
         )
 
-    # Load PDF from storage
-    pdf_bytes = pdf_service.get_document_bytes(document)
-
-    if pdf_bytes is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document file not found in storage"
-        )
-
-    # Verify integrity
-    if not pdf_service.verify_document_integrity(document):
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Document integrity verification failed"
-        )
-
-    # Return PDF for inline display
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"inline; filename={document.filename}"
-        }
-    )
+    # Return PDF for inline display (verified while it is sent), or answer 304/206
+    return _document_file_response(document, "inline", request, redirect=True)
 
 
 @router.post("/{document_id}/reprint")
 def reprint_document(
     document_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Log a document reprint action and return the PDF.
@@ -227,21 +272,8 @@ def reprint_document(
             detail=f"Document with ID {document_id} not found"
         )
 
-    # Load PDF from storage
-    pdf_bytes = pdf_service.get_document_bytes(document)
-
-    if pdf_bytes is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document file not found in storage"
-        )
-
-    # Verify integrity
-    if not pdf_service.verify_document_integrity(document):
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Document integrity verification failed"
-        )
+    # Open PDF stream (verified while it is sent)
+    response = _document_file_response(document, "inline")
 
     # Audit log for reprint
     audit_service.log_document_print(
@@ -252,24 +284,19 @@ def reprint_document(
     )
 
     # Return PDF
-    return Response(
-        content=pdf_bytes,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"inline; filename={document.filename}"
-        }
-    )
+    return response
 
 
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_document(
     document_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Delete a document record.
-    Note: This does not delete the physical file, only the database record.
+    The PDF's blob loses a reference; unreferenced blobs are removed by
+    scripts/gc_blobs.py.
 
     Args:
         document_id: Document ID
@@ -287,7 +314,7 @@ def delete_document(
             detail=f"Document with ID {document_id} not found"
         )
 
-    # Audit log
+    # Audit log (committed atomically with the delete)
     audit_service.log(
         db,
         current_user,
@@ -295,9 +322,11 @@ def delete_document(
         action="delete",
         entity_id=document.id,
         description=f"Deleted document {document.filename}",
-        metadata={"filename": document.filename, "patient_id": document.patient_id}
+        metadata={"filename": document.filename, "patient_id": document.patient_id},
+        strict=True
     )
 
+    blob_store.release(db, document.pdf_path)
     db.delete(document)
     db.commit()
 
@@ -2,11 +2,12 @@
 Encounter endpoints for SOAP clinical consultations with role-based access.
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy.orm import Session, joinedload
 from app.db.session import get_db
 from app.core.deps import get_current_active_user, require_doctor_or_admin
-from app.models.user import User
+from app.core.principal_cache import Principal
+from app.core.pagination import SortKey, paginate
 from app.models.patient import Patient
 from app.models.encounter import Encounter, EncounterStatus, MedicalSpecialty
 from app.models.template import Template
@@ -26,7 +27,7 @@ router = APIRouter()
 def create_encounter(
     encounter_in: EncounterCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_doctor_or_admin)
+    current_user: Principal = Depends(require_doctor_or_admin)
 ):
     """
     Create a new encounter (SOAP consultation).
@@ -69,11 +70,14 @@ def create_encounter(
 
 @router.get("/", response_model=List[EncounterSchema])
 def list_encounters(
+    response: Response,
     patient_id: Optional[int] = Query(None, description="Filter by patient ID"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor or X-Prev-Cursor"),
+    include_total: bool = Query(False, description="Return the (estimated) total in X-Total-Count"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     List encounters with optional patient filter.
@@ -85,24 +89,28 @@ def list_encounters(
     if patient_id is not None:
         query = query.filter(Encounter.patient_id == patient_id)
 
-    # Order by most recent first
-    query = query.order_by(Encounter.created_at.desc())
-
-    encounters = query.offset(skip).limit(limit).all()
-    return encounters
+    # Most recent first
+    keys = (SortKey(Encounter.created_at, descending=True), SortKey(Encounter.id, descending=True))
+    return paginate(query, keys, response, limit, skip=skip, cursor=cursor, include_total=include_total)
 
 
 @router.get("/{encounter_id}", response_model=EncounterWithDetails)
 def get_encounter(
     encounter_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Get a specific encounter by ID with patient and doctor details.
     All authenticated users can view encounters.
     """
-    encounter = db.query(Encounter).filter(Encounter.id == encounter_id).first()
+    # Load patient and doctor in the same query instead of two lazy loads
+    encounter = (
+        db.query(Encounter)
+        .options(joinedload(Encounter.patient), joinedload(Encounter.doctor))
+        .filter(Encounter.id == encounter_id)
+        .first()
+    )
     if not encounter:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -134,7 +142,7 @@ def update_encounter(
     encounter_id: int,
     encounter_in: EncounterUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_doctor_or_admin)
+    current_user: Principal = Depends(require_doctor_or_admin)
 ):
     """
     Update an encounter.
@@ -176,7 +184,7 @@ def update_encounter_status(
     encounter_id: int,
     new_status: EncounterStatus,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_doctor_or_admin)
+    current_user: Principal = Depends(require_doctor_or_admin)
 ):
     """
     Update encounter status only.
@@ -215,7 +223,7 @@ def update_encounter_status(
 def delete_encounter(
     encounter_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_doctor_or_admin)
+    current_user: Principal = Depends(require_doctor_or_admin)
 ):
     """
     Delete an encounter (soft delete by setting status to cancelled).
@@ -252,7 +260,7 @@ def apply_template_to_encounter(
     encounter_id: int,
     template_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_doctor_or_admin)
+    current_user: Principal = Depends(require_doctor_or_admin)
 ):
     """
     Apply a template to an encounter, filling in the default SOAP fields.
@@ -315,7 +323,7 @@ def apply_template_to_encounter(
 def sign_encounter(
     encounter_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_doctor_or_admin)
+    current_user: Principal = Depends(require_doctor_or_admin)
 ):
     """
     Sign (finalize) an encounter, changing status to SIGNED.
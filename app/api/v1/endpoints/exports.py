@@ -0,0 +1,67 @@
+"""
+Bulk export endpoints for patients, encounters and document metadata.
+"""
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.core.deps import require_admin
+from app.core.principal_cache import Principal
+from app.core.http_cache import content_disposition
+from app.schemas.export import ExportEntity, ExportFormat
+from app.services.audit_service import audit_service
+from app.services.bulk_export import bulk_exporter, export_filename
+
+router = APIRouter()
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+@router.get("/{entity}")
+def export_records(
+    entity: ExportEntity,
+    file_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    gzip: bool = Query(False, description="Comprimir la salida con gzip"),
+    after_id: int = Query(0, ge=0, description="Reanudar después de este ID (último ID recibido)"),
+    include_deleted: bool = Query(False, description="Incluir pacientes eliminados"),
+    header: bool = Query(True, description="Incluir la fila de encabezado CSV"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_admin)
+):
+    """
+    Stream every row of a table in ID order as NDJSON or CSV.
+
+    The export is read through a server-side cursor, so it can be as large as
+    the table. To resume an interrupted download, request it again with
+    ``after_id`` set to the last ID received. Requires ADMIN role.
+    """
+    audit_service.log(
+        db=db,
+        user=current_user,
+        entity=entity.value.rstrip("s"),
+        action="export",
+        description=f"Exported {entity.value} as {file_format.value}",
+        metadata={"format": file_format.value, "gzip": gzip, "after_id": after_id, "include_deleted": include_deleted},
+    )
+
+    filename = export_filename(entity, file_format, gzip, after_id)
+    stream = bulk_exporter.stream(
+        db.get_bind(),
+        entity,
+        file_format,
+        after_id=after_id,
+        include_deleted=include_deleted,
+        compress=gzip,
+        header=header,
+    )
+    return StreamingResponse(
+        stream,
+        media_type="application/gzip" if gzip else MEDIA_TYPES[file_format],
+        headers={
+            "Content-Disposition": content_disposition("attachment", filename),
+            "Cache-Control": "no-store",
+        },
+    )
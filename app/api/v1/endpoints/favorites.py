@@ -5,34 +5,72 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.core.deps import get_current_active_user
-from app.models.user import User
-from app.models.template import Template
-from app.models.snippet import Snippet
+from app.core.principal_cache import Principal
+from app.schemas.favorite import FavoriteBulkRequest, FavoriteBulkResult
+from app.services.favorites import snippet_favorite_links, template_favorite_links
 
 router = APIRouter()
 
 
+# Bulk routes are declared first so "bulk-add" is not parsed as an id
+@router.post("/templates/bulk-add", response_model=FavoriteBulkResult)
+def add_templates_to_favorites(
+    body: FavoriteBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Add several templates to user's favorites (idempotent, unknown ids are reported)."""
+    changed, not_found = template_favorite_links.add(db, current_user.id, body.ids)
+    return FavoriteBulkResult(changed=changed, not_found=not_found)
+
+
+@router.post("/templates/bulk-remove", response_model=FavoriteBulkResult)
+def remove_templates_from_favorites(
+    body: FavoriteBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Remove several templates from user's favorites (idempotent, unknown ids are reported)."""
+    changed, not_found = template_favorite_links.remove(db, current_user.id, body.ids)
+    return FavoriteBulkResult(changed=changed, not_found=not_found)
+
+
+@router.post("/snippets/bulk-add", response_model=FavoriteBulkResult)
+def add_snippets_to_favorites(
+    body: FavoriteBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Add several snippets to user's favorites (idempotent, unknown ids are reported)."""
+    changed, not_found = snippet_favorite_links.add(db, current_user.id, body.ids)
+    return FavoriteBulkResult(changed=changed, not_found=not_found)
+
+
+@router.post("/snippets/bulk-remove", response_model=FavoriteBulkResult)
+def remove_snippets_from_favorites(
+    body: FavoriteBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Remove several snippets from user's favorites (idempotent, unknown ids are reported)."""
+    changed, not_found = snippet_favorite_links.remove(db, current_user.id, body.ids)
+    return FavoriteBulkResult(changed=changed, not_found=not_found)
+
+
 @router.post("/templates/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
 def add_template_to_favorites(
     template_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Add a template to user's favorites (idempotent)."""
-    template = db.query(Template).filter(Template.id == template_id).first()
-    if not template:
+    _, not_found = template_favorite_links.add(db, current_user.id, [template_id])
+    if not_found:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Template with ID {template_id} not found"
         )
 
-    # Check if already favorited
-    if template in current_user.favorite_templates:
-        return None
-
-    current_user.favorite_templates.append(template)
-    db.commit()
-
     return None
 
 
@@ -40,23 +78,16 @@ def add_template_to_favorites(
 def remove_template_from_favorites(
     template_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Remove a template from user's favorites (idempotent)."""
-    template = db.query(Template).filter(Template.id == template_id).first()
-    if not template:
+    _, not_found = template_favorite_links.remove(db, current_user.id, [template_id])
+    if not_found:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Template with ID {template_id} not found"
         )
 
-    # Check if it's in favorites
-    if template not in current_user.favorite_templates:
-        return None
-
-    current_user.favorite_templates.remove(template)
-    db.commit()
-
     return None
 
 
@@ -64,23 +95,16 @@ def remove_template_from_favorites(
 def add_snippet_to_favorites(
     snippet_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Add a snippet to user's favorites (idempotent)."""
-    snippet = db.query(Snippet).filter(Snippet.id == snippet_id).first()
-    if not snippet:
+    _, not_found = snippet_favorite_links.add(db, current_user.id, [snippet_id])
+    if not_found:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Snippet with ID {snippet_id} not found"
         )
 
-    # Check if already favorited
-    if snippet in current_user.favorite_snippets:
-        return None
-
-    current_user.favorite_snippets.append(snippet)
-    db.commit()
-
     return None
 
 
@@ -88,21 +112,14 @@ def add_snippet_to_favorites(
 def remove_snippet_from_favorites(
     snippet_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Remove a snippet from user's favorites (idempotent)."""
-    snippet = db.query(Snippet).filter(Snippet.id == snippet_id).first()
-    if not snippet:
+    _, not_found = snippet_favorite_links.remove(db, current_user.id, [snippet_id])
+    if not_found:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Snippet with ID {snippet_id} not found"
         )
 
-    # Check if it's in favorites
-    if snippet not in current_user.favorite_snippets:
-        return None
-
-    current_user.favorite_snippets.remove(snippet)
-    db.commit()
-
     return None
@@ -1,31 +1,79 @@
 """
 Patient endpoints for CRUD operations with audit logging.
 """
+import io
 from datetime import datetime, timezone
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, status, Query, UploadFile
 from fastapi.responses import Response
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.db.session import get_db
 from app.core.deps import get_current_active_user, require_admin
+from app.core.principal_cache import Principal
 from app.core.db_errors import raise_conflict_for_integrity_error
-from app.models.user import User
+from app.core.pagination import SortKey, paginate
 from app.models.patient import Patient
 from app.models.encounter import Encounter
 from app.schemas.patient import PatientCreate, PatientUpdate, Patient as PatientSchema, PatientWithAge
 from app.schemas.encounter import Encounter as EncounterSchema
+from app.schemas.patient_import import PatientImportFormat, PatientImportReport
+from app.schemas.timeline import TimelineEntry, TimelineKind
 from app.services.pdf_service import pdf_service
+from app.services.pdf_render import RenderSaturatedError, RenderTimeoutError
+from app.services.selftest import weasyprint_selftest, FAILED as SELFTEST_FAILED
 from app.services.audit_service import audit_service
+from app.services.patient_import import iter_records, patient_importer
+from app.services.patient_index import patient_index
+from app.services.patient_timeline import patient_timeline
 
 router = APIRouter()
 
 
+def _get_active_patient(db: Session, patient_id: int) -> Patient:
+    """Load a non-deleted patient or raise 404."""
+    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    if not patient or patient.deleted_at is not None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Patient with ID {patient_id} not found"
+        )
+    return patient
+
+
+async def _render_patient_card(db: Session, patient: Patient, user: Principal, save_to_db: bool):
+    """Render a patient card, translating render backpressure into HTTP errors."""
+    if weasyprint_selftest.status == SELFTEST_FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"PDF generation is unavailable: {weasyprint_selftest.detail}"
+        )
+    try:
+        return await pdf_service.generate_patient_card(
+            db=db,
+            patient=patient,
+            user=user,
+            save_to_db=save_to_db
+        )
+    except RenderSaturatedError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"PDF generation is busy, please retry: {exc}",
+            headers={"Retry-After": "5"}
+        ) from exc
+    except RenderTimeoutError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(exc)
+        ) from exc
+
+
 @router.post("/", response_model=PatientSchema, status_code=status.HTTP_201_CREATED)
 def create_patient(
     patient_in: PatientCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Create a new patient with audit logging."""
     # Check if patient with same CI already exists
@@ -69,27 +117,70 @@ def create_patient(
 
     # Audit log
     audit_service.log_patient_create(db, current_user, db_patient.id, db_patient.ci)
+    patient_index.upsert(db_patient)
 
     return db_patient
 
 
+@router.post("/import", response_model=PatientImportReport)
+def import_patients(
+    file: UploadFile = File(..., description="CSV con encabezado o NDJSON (un paciente por línea), UTF-8"),
+    file_format: Optional[PatientImportFormat] = Query(None, alias="format", description="Por defecto según la extensión"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_admin)
+):
+    """
+    Bulk-import patients from a CSV or NDJSON file.
+
+    Rows are validated as they are read and inserted in batches; rows whose
+    CI or email already exists are skipped. Each batch is committed with one
+    aggregated audit entry. Requires ADMIN role.
+    """
+    if file_format is None:
+        suffix = (file.filename or "").rsplit(".", 1)[-1].lower()
+        if suffix == "csv":
+            file_format = PatientImportFormat.CSV
+        elif suffix in ("ndjson", "jsonl"):
+            file_format = PatientImportFormat.NDJSON
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot infer the file format; pass format=csv or format=ndjson"
+            )
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return patient_importer.run(db, iter_records(stream, file_format), current_user)
+    finally:
+        stream.detach()
+
+
 @router.get("/", response_model=List[PatientSchema])
 def list_patients(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor or X-Prev-Cursor"),
+    include_total: bool = Query(False, description="Return the (estimated) total in X-Total-Count"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
-    """Get list of all patients with pagination."""
-    patients = db.query(Patient).filter(Patient.deleted_at.is_(None)).offset(skip).limit(limit).all()
-    return patients
+    """
+    Get list of all patients with pagination.
+
+    Without ``skip`` the list is keyset-paginated on (created_at, id); follow
+    the X-Next-Cursor / X-Prev-Cursor headers to move between pages.
+    """
+    query = db.query(Patient).filter(Patient.deleted_at.is_(None))
+    keys = (SortKey(Patient.created_at), SortKey(Patient.id))
+    return paginate(query, keys, response, limit, skip=skip, cursor=cursor, include_total=include_total)
 
 
 @router.get("/{patient_id}", response_model=PatientWithAge)
 def get_patient(
     patient_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get a specific patient by ID."""
     patient = db.query(Patient).filter(Patient.id == patient_id).first()
@@ -125,10 +216,13 @@ def get_patient(
 @router.get("/{patient_id}/encounters", response_model=List[EncounterSchema])
 def get_patient_encounters(
     patient_id: int,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor or X-Prev-Cursor"),
+    include_total: bool = Query(False, description="Return the (estimated) total in X-Total-Count"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Get all encounters for a specific patient.
@@ -143,11 +237,31 @@ def get_patient_encounters(
         )
 
     # Get patient's encounters
-    encounters = db.query(Encounter).filter(
-        Encounter.patient_id == patient_id
-    ).order_by(Encounter.created_at.desc()).offset(skip).limit(limit).all()
+    query = db.query(Encounter).filter(Encounter.patient_id == patient_id)
+    keys = (SortKey(Encounter.created_at, descending=True), SortKey(Encounter.id, descending=True))
+    return paginate(query, keys, response, limit, skip=skip, cursor=cursor, include_total=include_total)
+
+
+@router.get("/{patient_id}/timeline", response_model=List[TimelineEntry])
+def get_patient_timeline(
+    patient_id: int,
+    response: Response,
+    kind: Optional[List[TimelineKind]] = Query(None, description="Only include these kinds of events"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor or X-Prev-Cursor"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Get a patient's encounters, documents, attachments and audit events as one
+    stream, most recent first.
+
+    Follow the X-Next-Cursor / X-Prev-Cursor headers to move between pages.
+    """
+    _get_active_patient(db, patient_id)
 
-    return encounters
+    query, keys = patient_timeline.query(db, patient_id, kinds=kind)
+    return paginate(query, keys, response, limit, cursor=cursor)
 
 
 @router.put("/{patient_id}", response_model=PatientSchema)
@@ -155,7 +269,7 @@ def update_patient(
     patient_id: int,
     patient_in: PatientUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Update a patient's information with audit logging."""
     patient = db.query(Patient).filter(Patient.id == patient_id).first()
@@ -215,6 +329,7 @@ def update_patient(
     # Audit log
     if changed_fields:
         audit_service.log_patient_update(db, current_user, patient.id, patient.ci, changed_fields)
+    patient_index.upsert(patient)
 
     return patient
 
@@ -223,7 +338,7 @@ def update_patient(
 def delete_patient(
     patient_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ):
     """Delete a patient with audit logging."""
     patient = db.query(Patient).filter(Patient.id == patient_id).first()
@@ -236,10 +351,11 @@ def delete_patient(
     patient_ci = patient.ci
 
     patient.deleted_at = datetime.now(timezone.utc)
-    db.commit()
 
-    # Audit log
-    audit_service.log_patient_delete(db, current_user, patient_id, patient_ci)
+    # Audit log (committed atomically with the soft delete)
+    audit_service.log_patient_delete(db, current_user, patient_id, patient_ci, strict=True)
+    db.commit()
+    patient_index.remove(patient_id)
 
     return None
 
@@ -248,7 +364,7 @@ def delete_patient(
 def search_patient_by_ci(
     ci: str,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Search for a patient by CI."""
     patient = db.query(Patient).filter(
@@ -265,32 +381,24 @@ def search_patient_by_ci(
 
 
 @router.post("/{patient_id}/generate-card")
-def generate_patient_card_pdf(
+async def generate_patient_card_pdf(
     patient_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Generate and save a new PDF patient card.
     Returns the document ID and download URL.
+    Responds 503 when the render queue is saturated and 504 on render timeout.
     """
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
-    if not patient or patient.deleted_at is not None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Patient with ID {patient_id} not found"
-        )
+    patient = await run_in_threadpool(_get_active_patient, db, patient_id)
 
     # Generate PDF and save to database
-    pdf_bytes, document = pdf_service.generate_patient_card(
-        db=db,
-        patient=patient,
-        user=current_user,
-        save_to_db=True
-    )
+    pdf_bytes, document = await _render_patient_card(db, patient, current_user, save_to_db=True)
 
     # Audit log
-    audit_service.log_document_generate(
+    await run_in_threadpool(
+        audit_service.log_document_generate,
         db,
         current_user,
         document.id,
@@ -307,29 +415,20 @@ def generate_patient_card_pdf(
 
 
 @router.get("/{patient_id}/card-pdf")
-def get_patient_card_pdf_quick(
+async def get_patient_card_pdf_quick(
     patient_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Generate PDF on-the-fly without saving to database.
     Quick preview mode.
+    Responds 503 when the render queue is saturated and 504 on render timeout.
     """
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
-    if not patient or patient.deleted_at is not None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Patient with ID {patient_id} not found"
-        )
+    patient = await run_in_threadpool(_get_active_patient, db, patient_id)
 
     # Generate PDF without saving
-    pdf_bytes, _ = pdf_service.generate_patient_card(
-        db=db,
-        patient=patient,
-        user=current_user,
-        save_to_db=False
-    )
+    pdf_bytes, _ = await _render_patient_card(db, patient, current_user, save_to_db=False)
 
     # Return PDF as response
     return Response(
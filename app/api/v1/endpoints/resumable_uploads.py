@@ -0,0 +1,215 @@
+"""
+Resumable (tus-style) upload endpoints for large attachments.
+
+Protocol:
+    POST   /attachments/uploads          create a session (JSON body with the total length)
+    HEAD   /attachments/uploads/{id}     current Upload-Offset, to resume after a failure
+    PATCH  /attachments/uploads/{id}     append bytes at Upload-Offset
+                                         (Content-Type: application/offset+octet-stream)
+    GET    /attachments/uploads/{id}     session progress and, once complete, attachment_id
+    DELETE /attachments/uploads/{id}     abandon the upload
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from functools import partial
+from typing import Dict
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from app.db.session import get_db
+from app.core.deps import get_current_active_user
+from app.core.principal_cache import Principal
+from app.models.upload_session import UploadSession
+from app.schemas.upload_session import UploadSessionCreate, UploadSession as UploadSessionSchema
+from app.services.attachment_storage import UploadTooLargeError
+from app.services.resumable_uploads import UploadBusyError, UploadLengthExceededError, resumable_uploads
+from app.api.v1.endpoints.attachments import _check_upload_targets, _record_upload
+
+router = APIRouter()
+
+OFFSET_CONTENT_TYPE = "application/offset+octet-stream"
+
+
+def _progress_headers(upload: UploadSession) -> Dict[str, str]:
+    headers = {
+        "Upload-Offset": str(upload.offset),
+        "Upload-Length": str(upload.length),
+        "Upload-Expires": format_datetime(upload.expires_at.replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": "no-store",
+    }
+    if upload.attachment_id is not None:
+        headers["X-Attachment-ID"] = str(upload.attachment_id)
+    return headers
+
+
+def _get_upload(db: Session, upload_id: str, current_user: Principal) -> UploadSession:
+    """Load a session of the current user; 404 if unknown, 410 if it expired unfinished."""
+    upload = db.query(UploadSession).filter(
+        UploadSession.id == upload_id,
+        UploadSession.created_by == current_user.id
+    ).first()
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Upload {upload_id} not found"
+        )
+    if not upload.completed and upload.expires_at < datetime.utcnow():
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=f"Upload {upload_id} expired"
+        )
+    return upload
+
+
+@router.post("/", response_model=UploadSessionSchema, status_code=status.HTTP_201_CREATED)
+def create_upload(
+    upload_in: UploadSessionCreate,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Start a resumable upload.
+    The Location header is the URL to PATCH the file's bytes to.
+    """
+    _check_upload_targets(db, upload_in.patient_id, upload_in.encounter_id)
+    try:
+        upload = resumable_uploads.create(
+            db,
+            user_id=current_user.id,
+            patient_id=upload_in.patient_id,
+            encounter_id=upload_in.encounter_id,
+            attachment_type=upload_in.attachment_type,
+            original_filename=upload_in.original_filename,
+            mime_type=upload_in.mime_type,
+            length=upload_in.length,
+        )
+    except UploadTooLargeError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(exc)
+        )
+
+    response.headers.update(_progress_headers(upload))
+    response.headers["Location"] = str(request.url_for("upload_progress", upload_id=upload.id))
+    return upload
+
+
+@router.head("/{upload_id}", status_code=status.HTTP_200_OK)
+def upload_offset(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Report how many bytes were received (Upload-Offset) so a client can resume."""
+    upload = _get_upload(db, upload_id, current_user)
+    return Response(status_code=status.HTTP_200_OK, headers=_progress_headers(upload))
+
+
+@router.get("/{upload_id}", response_model=UploadSessionSchema)
+def upload_progress(
+    upload_id: str,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Get upload progress; ``attachment_id`` is set once the upload completed."""
+    upload = _get_upload(db, upload_id, current_user)
+    response.headers.update(_progress_headers(upload))
+    return upload
+
+
+@router.patch("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def append_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset_header: int = Header(..., alias="Upload-Offset", ge=0),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Append bytes at Upload-Offset.
+
+    A mismatched offset answers 409 with the server's Upload-Offset. When the
+    last byte arrives the file is assembled into an attachment and its ID is
+    returned in X-Attachment-ID.
+    """
+    if request.headers.get("content-type", "").split(";")[0].strip() != OFFSET_CONTENT_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Content-Type must be {OFFSET_CONTENT_TYPE}"
+        )
+
+    upload = await run_in_threadpool(_get_upload, db, upload_id, current_user)
+    if upload.completed or upload_offset_header != upload.offset:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload-Offset does not match the bytes received",
+            headers={"Upload-Offset": str(upload.offset)}
+        )
+
+    try:
+        token = await run_in_threadpool(resumable_uploads.claim, db, upload, upload_offset_header)
+    except UploadBusyError:
+        await run_in_threadpool(db.refresh, upload)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another request is uploading to this session",
+            headers={"Upload-Offset": str(upload.offset)}
+        )
+
+    try:
+        offset = await resumable_uploads.append(db, upload, token, request.stream())
+        if offset == upload.length:
+            stored = await run_in_threadpool(resumable_uploads.assemble, upload)
+            try:
+                # The upload points at its attachment in the transaction that creates it
+                await run_in_threadpool(
+                    _record_upload, db, current_user, stored, upload.patient_id, upload.encounter_id,
+                    upload.attachment_type, upload.original_filename, upload.mime_type,
+                    partial(resumable_uploads.complete, db, upload, token)
+                )
+            except Exception:
+                # The staged file is kept; an empty PATCH at this offset retries
+                await run_in_threadpool(db.rollback)
+                raise
+    except UploadBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another request took over this upload",
+            headers={"Upload-Offset": str(upload.offset)}
+        )
+    except UploadLengthExceededError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Body goes past the declared Upload-Length",
+            headers={"Upload-Offset": str(upload.offset)}
+        )
+    except ClientDisconnect:
+        # The bytes received so far are saved; the client resumes from HEAD
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    finally:
+        await run_in_threadpool(resumable_uploads.release, db, upload, token)
+
+    await run_in_threadpool(db.refresh, upload)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers=_progress_headers(upload))
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+def cancel_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """Abandon an unfinished upload and delete its staged bytes."""
+    upload = _get_upload(db, upload_id, current_user)
+    if upload.completed:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload already completed; delete the attachment instead"
+        )
+    resumable_uploads.discard(db, upload)
+    return None
@@ -6,8 +6,9 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.core.deps import get_current_active_user
-from app.models.user import User
-from app.models.patient import Patient
+from app.core.principal_cache import Principal
+from app.services.patient_index import patient_index
+from app.services.patient_search import patient_search
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -39,13 +40,13 @@ def global_search(
     q: str = Query(..., min_length=1, description="Search query"),
     limit: int = Query(10, ge=1, le=50, description="Maximum results per category"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     Global search endpoint for Command Palette.
 
     Searches across:
-    - Patients (by name, CI)
+    - Patients (by name, CI; accent-insensitive, ranked by relevance)
     - Quick actions (contextual based on search term)
 
     Args:
@@ -57,16 +58,15 @@ def global_search(
     Returns:
         Search results with patients and actions
     """
-    search_term = f"%{q.lower()}%"
     patients_results = []
     actions_results = []
 
-    # Search patients
-    patients = db.query(Patient).filter(
-        (Patient.first_name.ilike(search_term)) |
-        (Patient.last_name.ilike(search_term)) |
-        (Patient.ci.like(f"%{q}%"))
-    ).limit(limit).all()
+    # Search patients: in-memory typeahead index, or the database until it is built
+    if patient_index.ready:
+        patient_index.refresh_if_stale(db)
+        patients = patient_index.search(q, limit=limit)
+    else:
+        patients = patient_search.search(db, q, limit=limit)
 
     for patient in patients:
         patients_results.append(PatientSearchResult(
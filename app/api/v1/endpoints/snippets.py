@@ -2,11 +2,13 @@
 Snippet endpoints for reusable text fragments with favorites.
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.core.deps import get_current_active_user, require_doctor_or_admin
-from app.models.user import User
+from app.core.principal_cache import Principal
+from app.core.http_cache import is_not_modified, revalidation_headers, weak_etag
+from app.core.pagination import TOTAL_COUNT_HEADER
 from app.models.snippet import Snippet, SnippetCategory, user_favorite_snippets
 from app.schemas.snippet import (
     SnippetCreate,
@@ -14,6 +16,8 @@ from app.schemas.snippet import (
     Snippet as SnippetSchema,
     SnippetWithFavorite
 )
+from app.services.catalog_cache import snippet_catalog, snippet_favorites
+from app.services.usage_counter import snippet_usage
 
 router = APIRouter()
 
@@ -22,7 +26,7 @@ router = APIRouter()
 def create_snippet(
     snippet_in: SnippetCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_doctor_or_admin)
+    current_user: Principal = Depends(require_doctor_or_admin)
 ):
     """
     Create a new snippet.
@@ -31,77 +35,60 @@ def create_snippet(
     db_snippet = Snippet(**snippet_in.model_dump())
     db.add(db_snippet)
     db.commit()
+    snippet_catalog.invalidate()
     db.refresh(db_snippet)
     return db_snippet
 
 
 @router.get("/", response_model=List[SnippetWithFavorite])
 def list_snippets(
+    request: Request,
+    response: Response,
     category: Optional[str] = Query(None, description="Filter by category"),
     only_active: bool = Query(True, description="Show only active snippets"),
     only_favorites: bool = Query(False, description="Show only user favorites"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    include_total: bool = Query(False, description="Return the total in X-Total-Count"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     List snippets with optional filters.
     Returns snippets with favorite status for current user.
-    """
-    query = db.query(Snippet)
 
-    # Filter by category
-    if category:
-        query = query.filter(Snippet.category == category)
+    Snippets are listed most used first and paged with skip/limit: usage
+    counts change every time a snippet is used, so a keyset cursor on that
+    order would skip or repeat rows between pages.
+
+    Served from the in-memory catalog cache. The weak ETag combines the
+    catalog and favorites versions; send it back in If-None-Match to get a
+    304 when nothing changed.
+    """
+    catalog = snippet_catalog.snapshot(db)
+    favorite_ids, favorites_version = snippet_favorites.get(db, current_user.id)
 
-    # Filter by active status
-    if only_active:
-        query = query.filter(Snippet.is_active == 1)
+    etag = weak_etag(catalog.version, favorites_version)
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=revalidation_headers(etag))
+    response.headers.update(revalidation_headers(etag))
 
-    # Filter by favorites
+    # Most used first, then by title
+    snippets = catalog.select(category or None, only_active)
     if only_favorites:
-        query = query.join(
-            user_favorite_snippets,
-            Snippet.id == user_favorite_snippets.c.snippet_id
-        ).filter(user_favorite_snippets.c.user_id == current_user.id)
-
-    # Order by usage count (most used first), then by title
-    query = query.order_by(Snippet.usage_count.desc(), Snippet.title)
-
-    snippets = query.offset(skip).limit(limit).all()
-
-    # Get user's favorite snippet IDs from database (avoid lazy loading on detached object)
-    favorite_snippet_ids_query = db.query(user_favorite_snippets.c.snippet_id).filter(
-        user_favorite_snippets.c.user_id == current_user.id
-    )
-    favorite_ids = {row[0] for row in favorite_snippet_ids_query.all()}
-
-    # Add is_favorite flag to each snippet
-    snippets_with_favorite = []
-    for snippet in snippets:
-        snippet_dict = {
-            "id": snippet.id,
-            "specialty": snippet.specialty,
-            "title": snippet.title,
-            "category": snippet.category,
-            "content": snippet.content,
-            "is_active": snippet.is_active,
-            "usage_count": snippet.usage_count,
-            "created_at": snippet.created_at,
-            "updated_at": snippet.updated_at,
-            "is_favorite": snippet.id in favorite_ids
-        }
-        snippets_with_favorite.append(snippet_dict)
-
-    return snippets_with_favorite
+        snippets = [snippet for snippet in snippets if snippet["id"] in favorite_ids]
+
+    if include_total:
+        response.headers[TOTAL_COUNT_HEADER] = str(len(snippets))
+    page = snippets[skip:skip + limit]
+    return [{**snippet, "is_favorite": snippet["id"] in favorite_ids} for snippet in page]
 
 
 @router.get("/{snippet_id}", response_model=SnippetWithFavorite)
 def get_snippet(
     snippet_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get a specific snippet by ID with favorite status."""
     snippet = db.query(Snippet).filter(Snippet.id == snippet_id).first()
@@ -111,10 +98,6 @@ def get_snippet(
             detail=f"Snippet with ID {snippet_id} not found"
         )
 
-    # Increment usage count
-    snippet.usage_count += 1
-    db.commit()
-
     # Check if it's a favorite (query database directly)
     is_favorite = db.query(user_favorite_snippets).filter(
         user_favorite_snippets.c.user_id == current_user.id,
@@ -128,7 +111,8 @@ def get_snippet(
         "category": snippet.category,
         "content": snippet.content,
         "is_active": snippet.is_active,
-        "usage_count": snippet.usage_count,
+        # Include uses recorded by this process that are not flushed yet
+        "usage_count": snippet.usage_count + snippet_usage.pending(snippet.id),
         "created_at": snippet.created_at,
         "updated_at": snippet.updated_at,
         "is_favorite": is_favorite
@@ -137,12 +121,35 @@ def get_snippet(
     return snippet_dict
 
 
+@router.post("/{snippet_id}/usage", status_code=status.HTTP_202_ACCEPTED)
+def record_snippet_usage(
+    snippet_id: int,
+    uses: int = Query(1, ge=1, le=100, description="Number of uses to record"),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Record that a snippet was inserted in the editor.
+
+    The use is counted in memory and written to usage_count in the next
+    batched flush, so the editor can call this without waiting on it.
+    """
+    if not db.query(Snippet.id).filter(Snippet.id == snippet_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Snippet with ID {snippet_id} not found"
+        )
+
+    snippet_usage.record(db.get_bind(), snippet_id, uses)
+    return Response(status_code=status.HTTP_202_ACCEPTED)
+
+
 @router.put("/{snippet_id}", response_model=SnippetSchema)
 def update_snippet(
     snippet_id: int,
     snippet_in: SnippetUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_doctor_or_admin)
+    current_user: Principal = Depends(require_doctor_or_admin)
 ):
     """
     Update a snippet.
@@ -161,6 +168,7 @@ def update_snippet(
         setattr(snippet, field, value)
 
     db.commit()
+    snippet_catalog.invalidate()
     db.refresh(snippet)
 
     return snippet
@@ -170,7 +178,7 @@ def update_snippet(
 def delete_snippet(
     snippet_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_doctor_or_admin)
+    current_user: Principal = Depends(require_doctor_or_admin)
 ):
     """
     Soft delete a snippet (set is_active to 0).
@@ -185,5 +193,6 @@ def delete_snippet(
 
     snippet.is_active = 0
     db.commit()
+    snippet_catalog.invalidate()
 
     return None
@@ -2,12 +2,14 @@
 Template endpoints for SOAP consultation templates with favorites.
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from app.db.session import get_db
 from app.core.deps import get_current_active_user, require_doctor_or_admin
-from app.models.user import User
+from app.core.principal_cache import Principal
+from app.core.http_cache import is_not_modified, revalidation_headers, weak_etag
+from app.core.pagination import paginate_items
 from app.models.template import Template, user_favorite_templates
 from app.models.encounter import MedicalSpecialty
 from app.schemas.template import (
@@ -16,6 +18,7 @@ from app.schemas.template import (
     Template as TemplateSchema,
     TemplateWithFavorite
 )
+from app.services.catalog_cache import TEMPLATE_SORT_KEYS, template_catalog, template_favorites
 
 router = APIRouter()
 
@@ -24,7 +27,7 @@ router = APIRouter()
 def create_template(
     template_in: TemplateCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_doctor_or_admin)
+    current_user: Principal = Depends(require_doctor_or_admin)
 ):
     """
     Create a new template.
@@ -33,80 +36,54 @@ def create_template(
     db_template = Template(**template_in.model_dump())
     db.add(db_template)
     db.commit()
+    template_catalog.invalidate()
     db.refresh(db_template)
     return db_template
 
 
 @router.get("/", response_model=List[TemplateWithFavorite])
 def list_templates(
+    request: Request,
+    response: Response,
     specialty: Optional[MedicalSpecialty] = Query(None, description="Filter by medical specialty"),
     only_active: bool = Query(True, description="Show only active templates"),
     only_favorites: bool = Query(False, description="Show only user favorites"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor or X-Prev-Cursor"),
+    include_total: bool = Query(False, description="Return the (estimated) total in X-Total-Count"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """
     List templates with optional filters.
     Returns templates with favorite status for current user.
-    """
-    query = db.query(Template)
 
-    # Filter by specialty
-    if specialty:
-        query = query.filter(Template.specialty == specialty)
+    Served from the in-memory catalog cache. The weak ETag combines the
+    catalog and favorites versions; send it back in If-None-Match to get a
+    304 when nothing changed.
+    """
+    catalog = template_catalog.snapshot(db)
+    favorite_ids, favorites_version = template_favorites.get(db, current_user.id)
 
-    # Filter by active status
-    if only_active:
-        query = query.filter(Template.is_active == 1)
+    etag = weak_etag(catalog.version, favorites_version)
+    if is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=revalidation_headers(etag))
+    response.headers.update(revalidation_headers(etag))
 
-    # Filter by favorites
+    templates = catalog.select(specialty or None, only_active)
     if only_favorites:
-        query = query.join(
-            user_favorite_templates,
-            Template.id == user_favorite_templates.c.template_id
-        ).filter(user_favorite_templates.c.user_id == current_user.id)
-
-    # Order by title
-    query = query.order_by(Template.title)
-
-    templates = query.offset(skip).limit(limit).all()
-
-    # Get user's favorite template IDs from database (avoid lazy loading on detached object)
-    favorite_template_ids_query = db.query(user_favorite_templates.c.template_id).filter(
-        user_favorite_templates.c.user_id == current_user.id
-    )
-    favorite_ids = {row[0] for row in favorite_template_ids_query.all()}
-
-    # Add is_favorite flag to each template
-    templates_with_favorite = []
-    for template in templates:
-        template_dict = {
-            "id": template.id,
-            "title": template.title,
-            "description": template.description,
-            "specialty": template.specialty,
-            "default_subjective": template.default_subjective,
-            "default_objective": template.default_objective,
-            "default_assessment": template.default_assessment,
-            "default_plan": template.default_plan,
-            "is_active": template.is_active,
-            "requires_photo": template.requires_photo,
-            "created_at": template.created_at,
-            "updated_at": template.updated_at,
-            "is_favorite": template.id in favorite_ids
-        }
-        templates_with_favorite.append(template_dict)
-
-    return templates_with_favorite
+        templates = [template for template in templates if template["id"] in favorite_ids]
+
+    page = paginate_items(templates, TEMPLATE_SORT_KEYS, response, limit, skip=skip, cursor=cursor, include_total=include_total)
+    return [{**template, "is_favorite": template["id"] in favorite_ids} for template in page]
 
 
 @router.get("/{template_id}", response_model=TemplateWithFavorite)
 def get_template(
     template_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get a specific template by ID with favorite status."""
     template = db.query(Template).filter(Template.id == template_id).first()
@@ -146,7 +123,7 @@ def update_template(
     template_id: int,
     template_in: TemplateUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_doctor_or_admin)
+    current_user: Principal = Depends(require_doctor_or_admin)
 ):
     """
     Update a template.
@@ -165,6 +142,7 @@ def update_template(
         setattr(template, field, value)
 
     db.commit()
+    template_catalog.invalidate()
     db.refresh(template)
 
     return template
@@ -174,7 +152,7 @@ def update_template(
 def delete_template(
     template_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_doctor_or_admin)
+    current_user: Principal = Depends(require_doctor_or_admin)
 ):
     """
     Soft delete a template (set is_active to 0).
@@ -189,5 +167,6 @@ def delete_template(
 
     template.is_active = 0
     db.commit()
+    template_catalog.invalidate()
 
     return None
@@ -2,10 +2,15 @@
 Main API router that aggregates all endpoint routers.
 """
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, patients, documents, search, encounters, templates, snippets, favorites, attachments
+from app.core.config import settings
+from app.api.v1.endpoints import async_reads, auth, patients, documents, search, encounters, templates, snippets, favorites, attachments, exports, resumable_uploads
 
 api_router = APIRouter()
 
+# Async read endpoints take over the matching sync routes when enabled
+if settings.ASYNC_DB_ENABLED:
+    api_router.include_router(async_reads.router)
+
 # Include authentication routes
 api_router.include_router(
     auth.router,
@@ -62,9 +67,23 @@ api_router.include_router(
     tags=["Favorites"]
 )
 
+# Include resumable upload routes (before attachments so "uploads" is not read as an ID)
+api_router.include_router(
+    resumable_uploads.router,
+    prefix="/attachments/uploads",
+    tags=["Attachments"]
+)
+
 # Include attachments routes (Sprint 3)
 api_router.include_router(
     attachments.router,
     prefix="/attachments",
     tags=["Attachments"]
 )
+
+# Include bulk export routes
+api_router.include_router(
+    exports.router,
+    prefix="/exports",
+    tags=["Exports"]
+)
@@ -1,7 +1,7 @@
 """
 Application configuration using Pydantic Settings.
 """
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import validator
 
@@ -22,18 +22,90 @@ class Settings(BaseSettings):
 
     # Storage
     DOCUMENTS_STORAGE_PATH: str = "./storage/documents"
+    DOCUMENT_VERIFY_CACHE_ENABLED: bool = True  # Skip rehashing files unchanged since last verification
 
     # Database
     DATABASE_URL: str = "sqlite:///./galenos.db"
     SQLALCHEMY_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Recycle connections before server/proxy idle timeouts (-1 disables)
+    DB_POOL_PRE_PING: bool = True
+    # SQLite tuning (file databases only)
+    SQLITE_JOURNAL_MODE: str = "WAL"  # Readers no longer block the writer
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # Durable with WAL; FULL fsyncs every commit
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Wait on locks held by other processes
+    SQLITE_MMAP_SIZE_MB: int = 256
+    SQLITE_CACHE_SIZE_MB: int = 64
+    SQLITE_SERIALIZE_WRITES: bool = True  # Queue writers on an in-process gate instead of the file lock
+    SQLITE_WRITE_GATE_TIMEOUT_SECONDS: float = 30.0
+    ASYNC_DB_ENABLED: bool = False  # Serve list/get/search reads on the async engine (asyncpg/aiosqlite)
+    ASYNC_DATABASE_URL: Optional[str] = None  # Defaults to DATABASE_URL with the async driver
 
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30  # 0 disables the authenticated-user cache
+
+    # Audit log
+    AUDIT_ASYNC: bool = True  # Queue entries and bulk insert them from a background thread
+    AUDIT_BATCH_SIZE: int = 100
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_SPOOL_PATH: str = "./storage/audit_spool.ndjson"  # Each process spools to audit_spool.<pid>.ndjson
+    AUDIT_SPOOL_FSYNC: bool = False  # fsync each spooled entry (survives power loss, slower)
+
+    # Template/snippet catalog cache
+    CATALOG_CACHE_TTL_SECONDS: float = 10.0  # How often other workers' catalog/favorite changes are picked up (0 checks every request)
+
+    # Snippet usage counters
+    SNIPPET_USAGE_FLUSH_INTERVAL_SECONDS: float = 5.0  # Uses are batched in memory between flushes
 
     # WeasyPrint
-    WEASYPRINT_SELFTEST: bool = True
+    WEASYPRINT_SELFTEST: bool = True  # Runs in a background subprocess; result at /health/ready
+    WEASYPRINT_SELFTEST_TIMEOUT_SECONDS: float = 60.0
+
+    # PDF rendering
+    PDF_RENDER_WORKERS: int = 2  # 0 renders in a thread inside the API process
+    PDF_RENDER_MAX_QUEUE: int = 8  # Renders allowed to wait for a free worker
+    PDF_RENDER_TIMEOUT_SECONDS: float = 30.0
+    PDF_CACHE_ENABLED: bool = True
+    PDF_CACHE_MEMORY_MB: int = 32
+    PDF_CACHE_DISK_MB: int = 512
+
+    # Patient typeahead index (Command Palette search)
+    PATIENT_INDEX_ENABLED: bool = True
+    PATIENT_INDEX_MEMORY_MB: int = 64  # Above this the index is dropped and search uses the database
+    PATIENT_INDEX_REFRESH_SECONDS: float = 5.0  # How often to pick up changes from other workers
+
+    # Bulk patient import
+    PATIENT_IMPORT_BATCH_SIZE: int = 1000  # Rows per multi-row INSERT (keep rows x 15 under the driver's bind limit)
+    PATIENT_IMPORT_MAX_REPORTED_ERRORS: int = 1000
+
+    # Attachments
+    ATTACHMENT_STORAGE_PATH: str = "./uploads/attachments"  # Incoming uploads; kept files move to BLOB_STORAGE_PATH
+    ATTACHMENT_MAX_UPLOAD_MB: int = 25  # Larger uploads are refused with 413 before they are read
+    ATTACHMENT_UPLOAD_CHUNK_KB: int = 1024  # Read/write/hash unit while streaming an upload to disk
+    RESUMABLE_UPLOAD_STAGING_PATH: str = "./uploads/staging"  # Same filesystem as blobs so assembly is a hard link
+    RESUMABLE_UPLOAD_EXPIRY_HOURS: float = 24.0  # Abandoned uploads are purged this long after their last PATCH
+    RESUMABLE_UPLOAD_PURGE_INTERVAL_SECONDS: float = 600.0
+    RESUMABLE_UPLOAD_LEASE_SECONDS: float = 120.0  # A PATCH's claim on its upload; renewed while bytes arrive
+
+    # Content-addressed file storage (attachments and generated PDFs)
+    BLOB_STORAGE_BACKEND: str = "local"  # "local" (BLOB_STORAGE_PATH) or "s3" (shared by every API node)
+    BLOB_STORAGE_PATH: str = "./uploads/blobs"
+    BLOB_GC_GRACE_HOURS: float = 24.0  # Unreferenced blobs and orphan files younger than this are kept
+    BLOB_PRESIGNED_URL_SECONDS: int = 300  # S3 downloads redirect to a URL valid this long; 0 streams them through the API
+    S3_BUCKET: str = ""
+    S3_PREFIX: str = ""  # Key prefix inside the bucket, e.g. "galenos/"
+    S3_ENDPOINT_URL: Optional[str] = None  # For MinIO or other S3-compatible servers, e.g. http://minio:9000
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None  # Defaults to the standard AWS credential chain
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+
+    # Bulk export
+    EXPORT_BATCH_SIZE: int = 1000  # Rows fetched per round trip from the server-side cursor
 
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000"]
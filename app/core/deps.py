@@ -1,12 +1,16 @@
 """
 Dependencies for FastAPI endpoints.
 """
-from typing import Generator, Optional
+from typing import Generator, Hashable, Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from app.db.async_session import get_async_db
 from app.core.security import decode_access_token
+from app.core.principal_cache import Principal, principal_cache
 from app.models.user import User, UserRole
 from app.schemas.user import TokenData
 
@@ -14,49 +18,99 @@ from app.schemas.user import TokenData
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
 
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _token_identity(token: str) -> Tuple[str, Hashable]:
+    """Decode an access token into (username, cache marker) or raise 401."""
+    payload = decode_access_token(token)
+    if payload is None:
+        raise _credentials_exception()
+
+    username: str = payload.get("sub")
+    if username is None:
+        raise _credentials_exception()
+
+    token_data = TokenData(username=username, role=payload.get("role"))
+    return token_data.username, payload.get("jti") or payload.get("iat") or payload.get("exp")
+
+
 def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme)
-) -> User:
+) -> Principal:
     """
     Get the current authenticated user from JWT token.
 
+    The user is served from the principal cache when possible, so the hot
+    path does not touch the database (the session is only opened lazily).
+
     Args:
         db: Database session
         token: JWT token from request
 
     Returns:
-        User object if authenticated
+        Principal snapshot of the authenticated user
 
     Raises:
         HTTPException: If token is invalid or user not found
     """
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+    username, token_marker = _token_identity(token)
 
-    payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
+    principal = principal_cache.get(username, token_marker)
+    if principal is not None:
+        return principal
 
-    username: str = payload.get("sub")
-    if username is None:
-        raise credentials_exception
+    user = db.query(User).filter(User.username == username).first()
+    if user is None:
+        raise _credentials_exception()
 
-    token_data = TokenData(username=username, role=payload.get("role"))
+    principal = Principal.from_user(user)
+    principal_cache.put(username, token_marker, principal)
+    return principal
 
-    user = db.query(User).filter(User.username == token_data.username).first()
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> Principal:
+    """
+    Async variant of get_current_user for routes on the async database stack.
+
+    Args:
+        db: Async database session
+        token: JWT token from request
+
+    Returns:
+        Principal snapshot of the authenticated user
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    username, token_marker = _token_identity(token)
+
+    principal = principal_cache.get(username, token_marker)
+    if principal is not None:
+        return principal
+
+    result = await db.execute(select(User).where(User.username == username))
+    user = result.scalars().first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.put(username, token_marker, principal)
+    return principal
 
 
 def get_current_active_user(
-    current_user: User = Depends(get_current_user),
-) -> User:
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """
     Get the current active user.
 
@@ -64,7 +118,7 @@ def get_current_active_user(
         current_user: Current authenticated user
 
     Returns:
-        User object if active
+        Principal if active
 
     Raises:
         HTTPException: If user is inactive
@@ -77,6 +131,24 @@ def get_current_active_user(
     return current_user
 
 
+async def get_current_active_user_async(
+    current_user: Principal = Depends(get_current_user_async),
+) -> Principal:
+    """
+    Async-stack variant of get_current_active_user (async so it runs on the event loop).
+
+    Args:
+        current_user: Current authenticated user
+
+    Returns:
+        Principal if active
+
+    Raises:
+        HTTPException: If user is inactive
+    """
+    return get_current_active_user(current_user)
+
+
 def require_role(required_role: UserRole):
     """
     Dependency factory to require a specific user role.
@@ -87,7 +159,7 @@ def require_role(required_role: UserRole):
     Returns:
         Dependency function that checks user role
     """
-    def role_checker(current_user: User = Depends(get_current_active_user)) -> User:
+    def role_checker(current_user: Principal = Depends(get_current_active_user)) -> Principal:
         if current_user.role != required_role:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -97,7 +169,7 @@ def require_role(required_role: UserRole):
     return role_checker
 
 
-def require_doctor(current_user: User = Depends(get_current_active_user)) -> User:
+def require_doctor(current_user: Principal = Depends(get_current_active_user)) -> Principal:
     """
     Dependency to require doctor role.
 
@@ -105,7 +177,7 @@ def require_doctor(current_user: User = Depends(get_current_active_user)) -> Use
         current_user: Current authenticated user
 
     Returns:
-        User object if user is a doctor
+        Principal if user is a doctor
 
     Raises:
         HTTPException: If user is not a doctor
@@ -118,7 +190,7 @@ def require_doctor(current_user: User = Depends(get_current_active_user)) -> Use
     return current_user
 
 
-def require_doctor_or_admin(current_user: User = Depends(get_current_active_user)) -> User:
+def require_doctor_or_admin(current_user: Principal = Depends(get_current_active_user)) -> Principal:
     """
     Dependency to require doctor or admin role.
 
@@ -126,7 +198,7 @@ def require_doctor_or_admin(current_user: User = Depends(get_current_active_user
         current_user: Current authenticated user
 
     Returns:
-        User object if user is a doctor or admin
+        Principal if user is a doctor or admin
 
     Raises:
         HTTPException: If user is not a doctor or admin
@@ -139,7 +211,7 @@ def require_doctor_or_admin(current_user: User = Depends(get_current_active_user
     return current_user
 
 
-def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
+def require_admin(current_user: Principal = Depends(get_current_active_user)) -> Principal:
     """
     Dependency to require admin role.
 
@@ -147,7 +219,7 @@ def require_admin(current_user: User = Depends(get_current_active_user)) -> User
         current_user: Current authenticated user
 
     Returns:
-        User object if user is an admin
+        Principal if user is an admin
 
     Raises:
         HTTPException: If user is not an admin
@@ -0,0 +1,215 @@
+"""
+Helpers for HTTP caching and byte-range requests on stored files.
+"""
+import os
+import unicodedata
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import RedirectResponse, Response
+
+# Stored PDFs and attachments never change once written; they are patient
+# data, so shared caches must not keep them.
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+# API listings may change at any time: clients keep them but revalidate each use
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+# Redirects to presigned storage URLs must not outlive the URL's expiry
+NO_STORE_CACHE_CONTROL = "private, no-store"
+
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+def strong_etag(file_hash: str) -> str:
+    """Build a strong ETag from a content hash."""
+    return f'"{file_hash}"'
+
+
+def weak_etag_for_stat(stat: os.stat_result) -> str:
+    """Build a weak ETag from file size and modification time."""
+    return f'W/"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def weak_etag(*versions: str) -> str:
+    """Build a weak ETag from one or more version strings."""
+    return 'W/"' + "-".join(versions) + '"'
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag using weak comparison."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    target = _opaque_tag(etag)
+    return any(_opaque_tag(candidate.strip()) == target for candidate in header.split(","))
+
+
+def is_not_modified(request: Optional[Request], etag: str) -> bool:
+    """Return True if the client's cached copy (If-None-Match) is current."""
+    if request is None or request.method not in ("GET", "HEAD"):
+        return False
+    return etag_matches(request.headers.get("if-none-match"), etag)
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """Headers sent with every cacheable file response."""
+    return {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+
+
+def content_disposition(disposition: str, filename: str) -> str:
+    """
+    Build a Content-Disposition value that survives any filename (RFC 6266).
+
+    ``filename`` is an ASCII fallback (accents stripped, quotes, backslashes
+    and other unsafe characters replaced); when it differs from the real
+    name, ``filename*`` carries the exact name UTF-8 percent-encoded.
+
+    Args:
+        disposition: "attachment" or "inline"
+        filename: Name to offer the client
+
+    Returns:
+        Header value
+    """
+    fallback = "".join(
+        char if " " <= char <= "~" and char not in '"\\' else "_"
+        for char in unicodedata.normalize("NFKD", filename)
+        if not unicodedata.combining(char)
+    ) or "download"
+    value = f'{disposition}; filename="{fallback}"'
+    if filename and fallback != filename:
+        value += f"; filename*=UTF-8''{quote(filename, safe='')}"
+    return value
+
+
+def storage_redirect_response(url: str) -> RedirectResponse:
+    """Send the client to a presigned storage URL instead of streaming the file."""
+    return RedirectResponse(
+        url,
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+        headers={"Cache-Control": NO_STORE_CACHE_CONTROL}
+    )
+
+
+def not_modified_response(etag: str) -> Response:
+    """Build a 304 Not Modified response."""
+    headers = cache_headers(etag)
+    headers.pop("Accept-Ranges")
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def revalidation_headers(etag: str) -> Dict[str, str]:
+    """Headers for API responses that clients may cache but must revalidate."""
+    return {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+
+
+def requested_range(request: Optional[Request], etag: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range from the Range header.
+
+    Args:
+        request: Incoming request (None disables range handling)
+        etag: Current ETag, checked against If-Range
+        size: Total file size in bytes
+
+    Returns:
+        Inclusive (start, end) tuple, or None to send the full body
+
+    Raises:
+        HTTPException: 416 if the range cannot be satisfied
+    """
+    if request is None or request.method not in ("GET", "HEAD"):
+        return None
+
+    header = request.headers.get("range")
+    if not header or not header.startswith("bytes="):
+        return None
+
+    # If-Range needs a strong validator; otherwise fall back to the full body
+    if_range = request.headers.get("if-range")
+    if if_range and (etag.startswith("W/") or if_range.strip() != etag):
+        return None
+
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        # Multipart ranges are not supported; a full response is valid here
+        return None
+
+    start_text, _, end_text = spec.partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            # Suffix range: the last N bytes
+            length = int(end_text)
+            if length <= 0:
+                raise ValueError
+            start = max(size - length, 0)
+            end = size - 1
+    except ValueError:
+        return None
+
+    end = min(end, size - 1)
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+def range_headers(start: int, end: int, size: int) -> Dict[str, str]:
+    """Headers for a 206 Partial Content response."""
+    return {
+        "Content-Range": f"bytes {start}-{end}/{size}",
+        "Content-Length": str(end - start + 1),
+    }
+
+
+def starts_transfer(response: Response) -> bool:
+    """
+    True if a file response begins delivering the file to the client.
+
+    Full bodies, redirects to storage and ranges starting at byte 0 count;
+    304s and later ranges (a viewer fetching the rest of a file piece by
+    piece) do not, so auditing only these logs one event per download.
+    """
+    if response.status_code == status.HTTP_304_NOT_MODIFIED:
+        return False
+    if response.status_code == status.HTTP_206_PARTIAL_CONTENT:
+        return response.headers.get("content-range", "").startswith("bytes 0-")
+    return True
+
+
+def iter_file(path, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Read a file (or an inclusive byte range of it) in chunks.
+
+    Args:
+        path: File path
+        start: First byte offset
+        end: Last byte offset, inclusive (None reads to the end)
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = None if end is None else end - start + 1
+        while remaining is None or remaining > 0:
+            chunk = f.read(FILE_CHUNK_SIZE if remaining is None else min(FILE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
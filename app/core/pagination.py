@@ -0,0 +1,347 @@
+"""
+Keyset (cursor) pagination helpers for list endpoints.
+
+A cursor is an opaque, URL-safe token holding the sort-key values of the row
+it points at. Pages are fetched with a ``WHERE (k1, k2, ...) > (v1, v2, ...)``
+style predicate, so the cost of a page does not grow with its position in the
+result set the way ``OFFSET`` does.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_, text
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """One column of a keyset ordering."""
+    column: Any
+    descending: bool = False
+
+    @property
+    def attribute(self) -> str:
+        return self.column.key
+
+
+@dataclass
+class Page:
+    """A page of results with cursors to its neighbours."""
+    items: List[Any]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(values: Sequence[Any], backwards: bool = False) -> str:
+    """
+    Encode sort-key values into an opaque cursor.
+
+    Args:
+        values: Sort-key values of the boundary row
+        backwards: True if the cursor fetches the page before the row
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = {"k": [_encode_value(value) for value in values]}
+    if backwards:
+        payload["b"] = 1
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, key_count: int) -> tuple:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string from the client
+        key_count: Number of sort keys the endpoint expects
+
+    Returns:
+        Tuple of (values, backwards)
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [_decode_value(value) for value in payload["k"]]
+        if len(values) != key_count:
+            raise ValueError("cursor does not match this listing")
+        return values, bool(payload.get("b"))
+    except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        ) from exc
+
+
+def _keyset_predicate(keys: Sequence[SortKey], values: Sequence[Any], backwards: bool):
+    """Build ``(k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...`` honouring each key's direction."""
+    clauses = []
+    for index, key in enumerate(keys):
+        after = key.descending == backwards
+        comparison = key.column > values[index] if after else key.column < values[index]
+        equalities = [keys[i].column == values[i] for i in range(index)]
+        clauses.append(and_(*equalities, comparison))
+    return or_(*clauses)
+
+
+def _row_values(item: Any, keys: Sequence[SortKey]) -> List[Any]:
+    if isinstance(item, dict):
+        return [item[key.attribute] for key in keys]
+    return [getattr(item, key.attribute) for key in keys]
+
+
+def keyset_paginate(query: Query, keys: Sequence[SortKey], limit: int, cursor: Optional[str] = None) -> Page:
+    """
+    Fetch one page of a query ordered by ``keys``.
+
+    The last key must be unique (normally the primary key) so the ordering is
+    total and no row is skipped or repeated between pages.
+
+    Args:
+        query: Filtered query without ORDER BY, OFFSET or LIMIT
+        keys: Sort keys, most significant first
+        limit: Page size
+        cursor: Cursor from a previous page (None for the first page)
+
+    Returns:
+        Page with items and next/prev cursors
+    """
+    backwards = False
+    if cursor:
+        values, backwards = decode_cursor(cursor, len(keys))
+        query = query.filter(_keyset_predicate(keys, values, backwards))
+
+    ordering = []
+    for key in keys:
+        descending = key.descending != backwards
+        ordering.append(key.column.desc() if descending else key.column.asc())
+
+    rows = query.order_by(*ordering).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    page = Page(items=rows)
+    if not rows:
+        return page
+
+    more_after = has_more if not backwards else True
+    more_before = has_more if backwards else cursor is not None
+    if more_after:
+        page.next_cursor = encode_cursor(_row_values(rows[-1], keys))
+    if more_before:
+        page.prev_cursor = encode_cursor(_row_values(rows[0], keys), backwards=True)
+    return page
+
+
+def _follows(values: Sequence[Any], boundary: Sequence[Any], keys: Sequence[SortKey]) -> bool:
+    """True if a row with ``values`` comes after ``boundary`` in the keyset order."""
+    for value, bound, key in zip(values, boundary, keys):
+        if value != bound:
+            return value < bound if key.descending else value > bound
+    return False
+
+
+def sort_items(items: Sequence[dict], keys: Sequence[SortKey]) -> List[dict]:
+    """Sort in-memory rows into keyset order (stable sorts, least significant key first)."""
+    ordered = list(items)
+    for key in reversed(keys):
+        ordered.sort(key=lambda item: item[key.attribute], reverse=key.descending)
+    return ordered
+
+
+def keyset_paginate_items(items: Sequence[dict], keys: Sequence[SortKey], limit: int, cursor: Optional[str] = None) -> Page:
+    """
+    In-memory counterpart of keyset_paginate for rows already in keyset order.
+
+    Produces the same cursors as keyset_paginate, so a listing can move
+    between a cached and a database-backed implementation.
+
+    Args:
+        items: Rows as dicts, sorted with sort_items()
+        keys: Sort keys, most significant first
+        limit: Page size
+        cursor: Cursor from a previous page (None for the first page)
+
+    Returns:
+        Page with items and next/prev cursors
+    """
+    backwards = False
+    candidates = list(items)
+    if cursor:
+        boundary, backwards = decode_cursor(cursor, len(keys))
+        if backwards:
+            candidates = [item for item in candidates if _follows(boundary, _row_values(item, keys), keys)]
+        else:
+            candidates = [item for item in candidates if _follows(_row_values(item, keys), boundary, keys)]
+
+    has_more = len(candidates) > limit
+    rows = candidates[-limit:] if backwards else candidates[:limit]
+
+    page = Page(items=rows)
+    if not rows:
+        return page
+
+    more_after = has_more if not backwards else True
+    more_before = has_more if backwards else cursor is not None
+    if more_after:
+        page.next_cursor = encode_cursor(_row_values(rows[-1], keys))
+    if more_before:
+        page.prev_cursor = encode_cursor(_row_values(rows[0], keys), backwards=True)
+    return page
+
+
+def estimate_total(query: Query) -> int:
+    """
+    Count the rows matched by a query, cheaply where the database allows.
+
+    On PostgreSQL the planner's row estimate is used (no table scan); other
+    databases fall back to an exact COUNT.
+
+    Args:
+        query: Filtered query
+
+    Returns:
+        Estimated or exact row count
+    """
+    session = query.session
+    if session.get_bind().dialect.name == "postgresql":
+        compiled = query.order_by(None).statement.compile(
+            dialect=session.get_bind().dialect,
+            compile_kwargs={"literal_binds": True},
+        )
+        plan = session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    return query.order_by(None).count()
+
+
+def paginate(
+    query: Query,
+    keys: Sequence[SortKey],
+    response: Response,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+) -> List[Any]:
+    """
+    Paginate a list endpoint in keyset or legacy offset mode.
+
+    Keyset mode is used unless ``skip`` is given. Cursors to the neighbouring
+    pages are returned in the ``X-Next-Cursor`` and ``X-Prev-Cursor`` headers
+    so the response body keeps its existing shape.
+
+    Args:
+        query: Filtered query without ORDER BY, OFFSET or LIMIT
+        keys: Sort keys, most significant first, ending with a unique column
+        response: Response whose headers receive the cursors
+        limit: Page size
+        skip: Legacy offset (cannot be combined with a cursor)
+        cursor: Cursor from a previous page
+        include_total: Add an X-Total-Count header
+
+    Returns:
+        Items of the requested page
+
+    Raises:
+        HTTPException: 400 if both skip and cursor are given or the cursor is invalid
+    """
+    if skip and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either skip or cursor, not both"
+        )
+
+    if include_total:
+        response.headers[TOTAL_COUNT_HEADER] = str(estimate_total(query))
+
+    if skip:
+        ordering = [key.column.desc() if key.descending else key.column.asc() for key in keys]
+        return query.order_by(*ordering).offset(skip).limit(limit).all()
+
+    page = keyset_paginate(query, keys, limit, cursor)
+    _set_cursor_headers(response, page)
+    return page.items
+
+
+def paginate_items(
+    items: Sequence[dict],
+    keys: Sequence[SortKey],
+    response: Response,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+) -> List[dict]:
+    """
+    Paginate in-memory rows the same way paginate() pages a query.
+
+    Args:
+        items: Filtered rows as dicts, sorted with sort_items()
+        keys: Sort keys, most significant first, ending with a unique field
+        response: Response whose headers receive the cursors
+        limit: Page size
+        skip: Legacy offset (cannot be combined with a cursor)
+        cursor: Cursor from a previous page
+        include_total: Add an X-Total-Count header
+
+    Returns:
+        Items of the requested page
+
+    Raises:
+        HTTPException: 400 if both skip and cursor are given or the cursor is invalid
+    """
+    if skip and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either skip or cursor, not both"
+        )
+
+    if include_total:
+        response.headers[TOTAL_COUNT_HEADER] = str(len(items))
+
+    if skip:
+        return list(items[skip:skip + limit])
+
+    page = keyset_paginate_items(items, keys, limit, cursor)
+    _set_cursor_headers(response, page)
+    return page.items
+
+
+def _set_cursor_headers(response: Response, page: Page) -> None:
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if page.prev_cursor:
+        response.headers[PREV_CURSOR_HEADER] = page.prev_cursor
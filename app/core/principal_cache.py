@@ -0,0 +1,131 @@
+"""
+Short-lived cache of authenticated principals.
+
+Every authenticated request used to load the full User row. The cache keeps
+an immutable snapshot of the fields the dependency chain needs, keyed by the
+token's subject and issue time, and is invalidated when a transaction that
+updated or deleted a User row commits in this process (not at flush, or a
+concurrent request could re-cache the old row before the commit). The TTL
+bounds staleness across workers.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.user import User, UserRole
+
+# Upper bound on cached principals; the cache is cleared when it is exceeded
+MAX_CACHED_PRINCIPALS = 10000
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Immutable snapshot of an authenticated user."""
+    id: int
+    username: str
+    email: str
+    full_name: str
+    role: UserRole
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        """Build a snapshot from a User row."""
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+        )
+
+
+class PrincipalCache:
+    """TTL cache of principals keyed by (username, token issue marker)."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[Tuple[str, Hashable], Tuple[float, Principal]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, username: str, token_marker: Hashable) -> Optional[Principal]:
+        """Return a cached principal if present and not expired."""
+        if not self.enabled:
+            return None
+        key = (username, token_marker)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return principal
+
+    def put(self, username: str, token_marker: Hashable, principal: Principal) -> None:
+        """Cache a principal for the configured TTL."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if len(self._entries) >= MAX_CACHED_PRINCIPALS:
+                self._entries.clear()
+            self._entries[(username, token_marker)] = (time.monotonic() + self.ttl_seconds, principal)
+
+    def invalidate_user(self, username: str) -> None:
+        """Drop every cached principal for a username."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == username]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all cached principals."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global instance
+principal_cache = PrincipalCache(ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+
+# Session.info key of the usernames to invalidate when the transaction commits
+_PENDING_KEY = "principal_cache_invalidate"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_changed_user(mapper, connection, target: User) -> None:
+    """Remember a flushed user change (role, is_active, ...) until its transaction commits."""
+    session = object_session(target)
+    usernames = {target.username}
+    history = inspect(target).attrs.username.history
+    usernames.update(history.deleted or ())
+    if session is None:
+        for username in usernames:
+            principal_cache.invalidate_user(username)
+        return
+    session.info.setdefault(_PENDING_KEY, set()).update(usernames)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    """Invalidate cached principals of users changed by the committed transaction."""
+    for username in session.info.pop(_PENDING_KEY, ()):
+        principal_cache.invalidate_user(username)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_users(session: Session, previous_transaction) -> None:
+    """A rolled back change never reached the database; the cache is still right."""
+    if not session.in_transaction():
+        session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,62 @@
+"""
+Request body size limits enforced before the body is parsed.
+
+FastAPI parses a multipart body (spooling files to disk) before the endpoint
+runs, so an endpoint can only reject an oversized upload after it has been
+received in full. This ASGI middleware rejects it up front when the declared
+Content-Length is too large, and stops reading a chunked body as soon as it
+passes the limit.
+"""
+from typing import Dict, Optional
+
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Allowance for multipart boundaries and form fields around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class RequestBodyLimitMiddleware:
+    """Limit the body size of POST/PUT/PATCH requests under given path prefixes."""
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    def _limit_for(self, scope: Scope) -> Optional[int]:
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            return None
+        path = scope["path"]
+        for prefix, limit in self.limits.items():
+            if path.startswith(prefix):
+                return limit
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self._limit_for(scope)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds the maximum size of {limit // (1024 * 1024)} MB"
+        headers = dict(scope["headers"])
+        declared = headers.get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > limit:
+            response = JSONResponse({"detail": detail}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # FastAPI re-raises HTTPException from body parsing as-is
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,90 @@
+"""
+Optional async database stack (enabled with ASYNC_DB_ENABLED).
+
+The async engine is created lazily on first use, so deployments that do not
+enable it never import asyncpg or aiosqlite.
+"""
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.session import configured_sqlite_pragmas, is_sqlite_file
+from app.db.sqlite_tuning import apply_sqlite_pragmas
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+_engine: Optional[AsyncEngine] = None
+_session_factory: Optional[async_sessionmaker] = None
+
+
+def async_database_url(database_url: str) -> str:
+    """
+    Derive the async driver URL from a sync database URL.
+
+    Args:
+        database_url: Sync URL such as postgresql://... or sqlite:///...
+
+    Returns:
+        URL using asyncpg or aiosqlite
+
+    Raises:
+        RuntimeError: If no async driver is known for the database
+    """
+    url = make_url(database_url)
+    driver = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"No async driver configured for '{url.get_backend_name()}' databases")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _engine_options(database_url: str) -> Dict[str, Any]:
+    url = make_url(database_url)
+    options: Dict[str, Any] = {
+        "echo": settings.SQLALCHEMY_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    return options
+
+
+def get_async_engine() -> AsyncEngine:
+    """Return the process-wide async engine, creating it on first use."""
+    global _engine, _session_factory
+    if _engine is None:
+        url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+        _engine = create_async_engine(url, **_engine_options(url))
+        if is_sqlite_file(url):
+            apply_sqlite_pragmas(_engine.sync_engine, configured_sqlite_pragmas())
+        _session_factory = async_sessionmaker(_engine, expire_on_commit=False, autoflush=False)
+    return _engine
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's connections (no-op if it was never created)."""
+    global _engine, _session_factory
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _session_factory = None
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency to get an async database session.
+    Yields an AsyncSession and ensures it's closed after use.
+    """
+    get_async_engine()
+    async with _session_factory() as session:
+        yield session
@@ -0,0 +1,119 @@
+"""
+DDL for the patient search index.
+
+PostgreSQL gets trigram GIN indexes over accent-folded names; SQLite gets an
+external-content FTS5 table kept in sync by triggers. The statements are
+attached to the patients table so ``Base.metadata.create_all`` (tests, seed
+script) builds the same objects as the Alembic migration.
+"""
+from typing import Optional
+
+from sqlalchemy import DDL, Table, event
+
+# unaccent() is only STABLE, so it cannot be used in an index expression
+# directly; this wrapper pins the dictionary and is declared IMMUTABLE.
+POSTGRES_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_patients_name_trgm ON patients
+    USING gin (f_unaccent(lower(first_name || ' ' || last_name)) gin_trgm_ops)
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_patients_ci_trgm ON patients USING gin (ci gin_trgm_ops)",
+]
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS ix_patients_ci_trgm",
+    "DROP INDEX IF EXISTS ix_patients_name_trgm",
+]
+
+# Objects the DDL above creates outside the ORM metadata; Alembic must not
+# treat them as drift (FTS5 also adds patients_fts_data, _idx, _docsize, ...).
+UNMAPPED_TABLE_PREFIX = "patients_fts"
+UNMAPPED_INDEXES = frozenset({"ix_patients_name_trgm", "ix_patients_ci_trgm"})
+
+SQLITE_CREATE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+        first_name, last_name, ci,
+        content='patients', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS patients_fts_ai AFTER INSERT ON patients BEGIN
+        INSERT INTO patients_fts(rowid, first_name, last_name, ci)
+        VALUES (new.id, new.first_name, new.last_name, new.ci);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS patients_fts_ad AFTER DELETE ON patients BEGIN
+        INSERT INTO patients_fts(patients_fts, rowid, first_name, last_name, ci)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.ci);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS patients_fts_au AFTER UPDATE OF first_name, last_name, ci ON patients BEGIN
+        INSERT INTO patients_fts(patients_fts, rowid, first_name, last_name, ci)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.ci);
+        INSERT INTO patients_fts(rowid, first_name, last_name, ci)
+        VALUES (new.id, new.first_name, new.last_name, new.ci);
+    END
+    """,
+    "INSERT INTO patients_fts(patients_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS patients_fts_au",
+    "DROP TRIGGER IF EXISTS patients_fts_ad",
+    "DROP TRIGGER IF EXISTS patients_fts_ai",
+    "DROP TABLE IF EXISTS patients_fts",
+]
+
+
+def include_object(object, name: Optional[str], type_: str, reflected: bool, compare_to) -> bool:
+    """
+    Alembic ``include_object`` hook that skips the search index objects.
+
+    They exist only as raw DDL, so without this autogenerate and
+    ``alembic check`` see them as unmapped and propose dropping them.
+
+    Args:
+        object: The schema item under comparison
+        name: Object name
+        type_: Alembic object type ("table", "index", ...)
+        reflected: Whether the object was reflected from the database
+        compare_to: The matching model object, or None if there is none
+
+    Returns:
+        False for reflected search objects, True for everything else
+    """
+    if not reflected or compare_to is not None or name is None:
+        return True
+    if type_ == "table":
+        return not name.startswith(UNMAPPED_TABLE_PREFIX)
+    if type_ == "index":
+        return name not in UNMAPPED_INDEXES
+    return True
+
+
+def attach_search_ddl(table: Table) -> None:
+    """
+    Create and drop the search index together with the patients table.
+
+    Args:
+        table: The patients table
+    """
+    for statement in POSTGRES_CREATE:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in SQLITE_CREATE:
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in POSTGRES_DROP:
+        event.listen(table, "before_drop", DDL(statement).execute_if(dialect="postgresql"))
+    for statement in SQLITE_DROP:
+        event.listen(table, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
@@ -0,0 +1,174 @@
+"""
+Connection pool instrumentation.
+
+``InstrumentedQueuePool`` times every checkout (including waits for a free
+connection and pre-ping) and counts checkout timeouts; pool events record how
+long connections are held. ``pool_status`` reports occupancy from the pool's
+own counters, so it never needs a connection itself.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+# Number of recent checkout waits kept for percentile estimates
+RECENT_SAMPLES = 1024
+
+
+class PoolMetrics:
+    """Thread-safe counters for pool checkouts, waits and hold times."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero all counters."""
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.hold_total = 0.0
+            self.hold_max = 0.0
+            self.checkins = 0
+            self.peak_in_use = 0
+            self._recent_waits: Deque[float] = deque(maxlen=RECENT_SAMPLES)
+
+    def record_checkout(self, wait: float, in_use: Optional[int] = None) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self._recent_waits.append(wait)
+            if in_use is not None:
+                self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def record_timeout(self, wait: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.wait_max = max(self.wait_max, wait)
+
+    def record_checkin(self, held: float) -> None:
+        with self._lock:
+            self.checkins += 1
+            self.hold_total += held
+            self.hold_max = max(self.hold_max, held)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters in milliseconds, suitable for a JSON response."""
+        with self._lock:
+            recent = sorted(self._recent_waits)
+            checkouts, checkins = self.checkouts, self.checkins
+            return {
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "peak_in_use": self.peak_in_use,
+                "wait_ms": {
+                    "avg": _ms(self.wait_total / checkouts) if checkouts else 0.0,
+                    "p50": _ms(_percentile(recent, 0.50)),
+                    "p95": _ms(_percentile(recent, 0.95)),
+                    "max": _ms(self.wait_max),
+                },
+                "hold_ms": {
+                    "avg": _ms(self.hold_total / checkins) if checkins else 0.0,
+                    "max": _ms(self.hold_max),
+                },
+            }
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def _percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout latency and timeouts."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_checkout(time.perf_counter() - started, in_use=self.checkedout())
+        return connection
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def attach_pool_metrics(engine: Engine, metrics: PoolMetrics) -> None:
+    """
+    Wire pool metrics into an engine.
+
+    Args:
+        engine: Engine whose pool should be measured
+        metrics: Metrics object to record into
+    """
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.metrics = metrics
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            metrics.record_checkin(time.perf_counter() - checked_out_at)
+
+
+def pool_status(pool: Pool) -> Dict[str, Any]:
+    """
+    Describe pool occupancy without checking out a connection.
+
+    Args:
+        pool: Engine pool
+
+    Returns:
+        Dict with the pool class, occupancy and (for instrumented pools) metrics
+    """
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        size = pool.size()
+        max_overflow = pool._max_overflow
+        checked_out = pool.checkedout()
+        capacity = size + max_overflow if max_overflow >= 0 else None
+        status.update({
+            "size": size,
+            "max_overflow": max_overflow,
+            "checked_out": checked_out,
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "timeout_seconds": pool.timeout(),
+            "saturation": round(checked_out / capacity, 3) if capacity else None,
+            "saturated": capacity is not None and checked_out >= capacity,
+        })
+    else:
+        status["saturated"] = False
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status["metrics"] = metrics.snapshot()
+    return status
+
+
+# Global instance
+pool_metrics = PoolMetrics()
@@ -1,16 +1,67 @@
 """
 Database session configuration.
 """
+from typing import Any, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from app.db.pool_metrics import InstrumentedQueuePool, attach_pool_metrics, pool_metrics
+from app.db.sqlite_tuning import apply_sqlite_pragmas, attach_write_gate, sqlite_pragmas, sqlite_write_gate
+
+
+def _engine_options(database_url: str) -> Dict[str, Any]:
+    """
+    Build create_engine keyword arguments from settings.
+
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool, since
+    every new connection would open a separate empty database.
+    """
+    url = make_url(database_url)
+    options: Dict[str, Any] = {
+        "echo": settings.SQLALCHEMY_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            return options
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    return options
+
+
+def is_sqlite_file(database_url: str) -> bool:
+    """True for SQLite databases stored in a file (not in memory)."""
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def configured_sqlite_pragmas() -> Dict[str, Any]:
+    """Connection pragmas for SQLite file databases, from settings."""
+    return sqlite_pragmas(
+        journal_mode=settings.SQLITE_JOURNAL_MODE,
+        synchronous=settings.SQLITE_SYNCHRONOUS,
+        busy_timeout_ms=settings.SQLITE_BUSY_TIMEOUT_MS,
+        mmap_size_mb=settings.SQLITE_MMAP_SIZE_MB,
+        cache_size_mb=settings.SQLITE_CACHE_SIZE_MB,
+    )
+
 
 # Create engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.SQLALCHEMY_ECHO
-)
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
+attach_pool_metrics(engine, pool_metrics)
+if is_sqlite_file(settings.DATABASE_URL):
+    apply_sqlite_pragmas(engine, configured_sqlite_pragmas())
+    if settings.SQLITE_SERIALIZE_WRITES:
+        attach_write_gate(engine, sqlite_write_gate)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,179 @@
+"""
+SQLite production tuning: connection pragmas and an in-process write gate.
+
+SQLite allows a single writer per database file. With several pool
+connections writing at once, the losers spin on the file lock until
+``busy_timeout`` runs out and then fail with "database is locked".
+``SQLiteWriteGate`` serializes writes inside the process instead: a
+connection takes the gate before its first write statement and gives it
+back when its transaction ends, so writers queue in order on a lock rather
+than polling the file. Reads never take the gate and, with WAL, are not
+blocked by the writer. ``busy_timeout`` still covers other processes
+(CLI scripts, a second worker) writing to the same file.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# First keyword of statements that need the write gate
+WRITE_KEYWORDS = frozenset({"INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "DROP", "ALTER"})
+
+_GATE_KEY = "sqlite_write_gate"
+
+
+def sqlite_pragmas(
+    journal_mode: str,
+    synchronous: str,
+    busy_timeout_ms: int,
+    mmap_size_mb: int,
+    cache_size_mb: int,
+) -> Dict[str, Any]:
+    """
+    Build the pragma set applied to every new connection.
+
+    Args:
+        journal_mode: Journal mode, normally WAL
+        synchronous: FULL, NORMAL or OFF (NORMAL is durable enough with WAL)
+        busy_timeout_ms: How long SQLite waits on a lock held by another process
+        mmap_size_mb: Memory-mapped I/O window (0 disables)
+        cache_size_mb: Page cache size per connection
+
+    Returns:
+        Ordered mapping of pragma name to value
+    """
+    return {
+        "journal_mode": journal_mode,
+        "synchronous": synchronous,
+        "busy_timeout": busy_timeout_ms,
+        "mmap_size": mmap_size_mb * 1024 * 1024,
+        # Negative values are KiB rather than pages
+        "cache_size": -cache_size_mb * 1024,
+    }
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Dict[str, Any]) -> None:
+    """
+    Run the given pragmas on every connection the engine opens.
+
+    Args:
+        engine: SQLite engine (the sync_engine of an AsyncEngine also works)
+        pragmas: Mapping from sqlite_pragmas()
+    """
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def _is_write(statement: str) -> bool:
+    words = statement.lstrip().split(None, 1)
+    return bool(words) and words[0].upper() in WRITE_KEYWORDS
+
+
+class SQLiteWriteGate:
+    """Process-wide lock that lets one connection write at a time."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        # A plain Lock (not RLock): the transaction may end on another thread
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.acquisitions = 0
+        self.timeouts = 0
+        self.wait_max = 0.0
+
+    @property
+    def locked(self) -> bool:
+        """True while some connection holds the gate."""
+        return self._lock.locked()
+
+    def acquire(self) -> None:
+        """
+        Wait for the gate.
+
+        Raises:
+            sqlalchemy.exc.TimeoutError: If the gate is not free within the timeout
+        """
+        started = time.perf_counter()
+        acquired = self._lock.acquire(timeout=self.timeout)
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self.wait_max = max(self.wait_max, waited)
+            if acquired:
+                self.acquisitions += 1
+            else:
+                self.timeouts += 1
+        if not acquired:
+            raise exc.TimeoutError(f"Timed out after {self.timeout:.1f}s waiting for the SQLite write gate")
+
+    def release(self) -> None:
+        """Give the gate back."""
+        self._lock.release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Gate counters for the health endpoint."""
+        with self._stats_lock:
+            return {
+                "locked": self.locked,
+                "acquisitions": self.acquisitions,
+                "timeouts": self.timeouts,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+def attach_write_gate(engine: Engine, gate: SQLiteWriteGate) -> None:
+    """
+    Serialize writes made through an engine behind a write gate.
+
+    The gate is taken before the first write statement of a transaction.
+    It is released once that transaction is over: when the connection goes
+    back to the pool (after the commit, or the pool's rollback-on-return),
+    or when the same connection begins its next transaction. Connection
+    ``commit`` events fire before the DBAPI commit, so releasing there would
+    let the next writer hit the file lock.
+
+    Args:
+        engine: SQLite engine shared by the application
+        gate: Gate to hold while a transaction has written
+    """
+    def _release(connection_info: Dict[str, Any]) -> None:
+        if connection_info.pop(_GATE_KEY, None) is not None:
+            gate.release()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        if _GATE_KEY not in conn.info and _is_write(statement):
+            gate.acquire()
+            conn.info[_GATE_KEY] = True
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        _release(conn.info)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        _release(connection_record.info)
+
+    @event.listens_for(engine, "close")
+    def _on_close(dbapi_connection, connection_record):
+        _release(connection_record.info)
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        _release(connection_record.info)
+
+
+# Global instance
+sqlite_write_gate = SQLiteWriteGate(timeout=settings.SQLITE_WRITE_GATE_TIMEOUT_SECONDS)
@@ -0,0 +1,33 @@
+"""
+Dialect-aware INSERT ... ON CONFLICT DO NOTHING.
+
+PostgreSQL and SQLite both support ``ON CONFLICT DO NOTHING`` (and
+``RETURNING``) through their dialect-specific ``insert`` constructs. Other
+backends get ``None`` and callers fall back to a portable statement.
+"""
+from typing import Optional
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import Insert
+
+_DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def insert_ignoring_conflicts(db: Session, table: Table) -> Optional[Insert]:
+    """
+    Build an INSERT that skips rows violating any unique constraint.
+
+    Args:
+        db: Session whose bind decides the dialect
+        table: Target table
+
+    Returns:
+        Insert statement with ON CONFLICT DO NOTHING, or None if the dialect
+        has no equivalent
+    """
+    dialect_insert = _DIALECT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        return None
+    return dialect_insert(table).on_conflict_do_nothing()
@@ -1,24 +1,33 @@
 """
 Main FastAPI application entry point.
 """
-import io
 import logging
 import os
-import tempfile
+import threading
 import time
 from uuid import uuid4
-from contextlib import asynccontextmanager, redirect_stderr
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 from app.core.limiter import limiter
+from app.core.upload_limits import MULTIPART_OVERHEAD_BYTES, RequestBodyLimitMiddleware
 from app.api.v1.router import api_router
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, engine, is_sqlite_file
+from app.db.async_session import dispose_async_engine
+from app.db.pool_metrics import pool_status
+from app.db.sqlite_tuning import sqlite_write_gate
+from app.services.pdf_render import render_engine
+from app.services.audit_writer import audit_writer
+from app.services.usage_counter import snippet_usage
+from app.services.patient_index import patient_index
+from app.services.selftest import weasyprint_selftest, PENDING, RUNNING, FAILED
 
 logger = logging.getLogger(__name__)
 if settings.DEBUG:
@@ -59,61 +68,45 @@ if len(settings.SECRET_KEY) < 32:
     raise RuntimeError("SECRET_KEY must be at least 32 characters.")
 
 
+def _start_render_engine() -> None:
+    try:
+        render_engine.start()
+    except Exception as exc:
+        # Workers are recreated on the next render; PDF endpoints answer 503 meanwhile.
+        logger.error("PDF render engine warm-up FAILED: %s", exc)
+
+
+def _build_patient_index() -> None:
+    try:
+        patient_index.build(SessionLocal)
+    except Exception as exc:
+        # Search keeps using the database until the next restart.
+        logger.error("Patient typeahead index build FAILED: %s", exc)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    if not _weasyprint_selftest_enabled():
+    # PDF checks run in the background so the API serves other traffic right away;
+    # /health/ready reports when PDF generation is usable.
+    if _weasyprint_selftest_enabled():
+        _log_info("Running WeasyPrint self-test in the background...")
+        weasyprint_selftest.start(on_success=_start_render_engine)
+    else:
         _log_info("WeasyPrint self-test: SKIPPED (WEASYPRINT_SELFTEST=0)")
-        yield
-        return
-
-    _log_info("Running WeasyPrint self-test...")
-    noise = ""
-    selftest_failed = False
-    pdf_bytes = b""
-    tmp = None
-    saved_fd = None
-    buf = io.StringIO()
+        weasyprint_selftest.skip()
+        threading.Thread(target=_start_render_engine, name="pdf-render-warmup", daemon=True).start()
+    if settings.AUDIT_ASYNC:
+        await run_in_threadpool(audit_writer.start)
+    if settings.PATIENT_INDEX_ENABLED:
+        # Built in the background; /search falls back to SQL until it is ready
+        threading.Thread(target=_build_patient_index, name="patient-index", daemon=True).start()
     try:
-        tmp = tempfile.TemporaryFile(mode="w+b")
-        saved_fd = os.dup(2)
-        os.dup2(tmp.fileno(), 2)
-        with redirect_stderr(buf):
-            from weasyprint import HTML
-            pdf_bytes = HTML(string="<html><body><h1>Self-Test</h1></body></html>").write_pdf()
-    except Exception as exc:
-        logger.error("WeasyPrint self-test FAILED: %s", exc)
-        selftest_failed = True
-        if settings.DEBUG:
-            logger.warning("Continuing in DEBUG mode despite WeasyPrint failure")
-        else:
-            raise RuntimeError(
-                f"WeasyPrint initialization failed: {exc}\n"
-                "Windows: Ensure MSYS2 mingw64 is installed at C:\\msys64\\mingw64\n"
-                "Run: python scripts/test_weasyprint_minimal.py for diagnostics"
-            ) from exc
-    finally:
-        if saved_fd is not None:
-            time.sleep(5.0)
-            os.dup2(saved_fd, 2)
-            os.close(saved_fd)
-        native_noise = ""
-        if tmp is not None:
-            tmp.seek(0)
-            native_noise = tmp.read().decode("utf-8", errors="replace").strip()
-            tmp.close()
-        buf_noise = buf.getvalue().strip()
-        noise = "\n".join(filter(None, [buf_noise, native_noise])).strip()
-
-    if noise and settings.DEBUG:
-        logger.debug("WeasyPrint/GTK stderr captured during self-test:\n%s", noise)
-    if selftest_failed and settings.DEBUG:
         yield
-        return
-    if not pdf_bytes.startswith(b"%PDF"):
-        raise RuntimeError("WeasyPrint generated invalid PDF (wrong header)")
-    _log_info("WeasyPrint self-test PASSED (%s bytes)", len(pdf_bytes))
-    yield
-
+    finally:
+        render_engine.shutdown()
+        await run_in_threadpool(audit_writer.stop)
+        await run_in_threadpool(snippet_usage.stop)
+        await dispose_async_engine()
 
 
 # Create FastAPI application
@@ -157,8 +150,18 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.BACKEND_CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    allow_methods=["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[
+        "ETag", "X-Next-Cursor", "X-Prev-Cursor", "X-Total-Count",
+        "Location", "Upload-Offset", "Upload-Length", "Upload-Expires", "X-Attachment-ID",
+    ],
+)
+
+# Refuse oversized uploads before the multipart body is spooled
+app.add_middleware(
+    RequestBodyLimitMiddleware,
+    limits={"/api/v1/attachments": settings.ATTACHMENT_MAX_UPLOAD_MB * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES},
 )
 
 # Include API router
@@ -201,6 +204,77 @@ def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/db", tags=["Health"])
+def database_health(response: Response):
+    """
+    Database and connection pool health.
+
+    Reports pool occupancy and checkout wait times. When the pool is
+    exhausted the database is not probed, so this endpoint never waits for
+    (or takes) a connection that a request needs.
+
+    Returns:
+        Pool status, metrics and probe result
+    """
+    report = pool_status(engine.pool)
+    if report["saturated"]:
+        report["status"] = "saturated"
+        return report
+
+    started = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception:
+        report["status"] = "down"
+        response.status_code = 503
+        return report
+    probe_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    report = pool_status(engine.pool)
+    report["status"] = "healthy"
+    report["probe_ms"] = probe_ms
+    if settings.SQLITE_SERIALIZE_WRITES and is_sqlite_file(settings.DATABASE_URL):
+        report["write_gate"] = sqlite_write_gate.snapshot()
+    return report
+
+
+@app.get("/health/ready", tags=["Health"])
+def readiness_check(response: Response):
+    """
+    Readiness endpoint for load balancers and rolling deploys.
+
+    Ready once the database answers and the WeasyPrint self-test has passed
+    (or was skipped). A failed self-test is tolerated in DEBUG mode.
+
+    Returns:
+        Readiness status with the result of each check
+    """
+    checks = {"database": "up", "weasyprint": weasyprint_selftest.as_dict()}
+    ready = True
+
+    db = None
+    try:
+        db = SessionLocal()
+        db.execute(text("SELECT 1"))
+    except Exception:
+        checks["database"] = "down"
+        ready = False
+    finally:
+        if db is not None:
+            db.close()
+
+    selftest_status = weasyprint_selftest.status
+    if selftest_status in (PENDING, RUNNING):
+        ready = False
+    elif selftest_status == FAILED and not settings.DEBUG:
+        ready = False
+
+    if not ready:
+        response.status_code = 503
+    return {"status": "ready" if ready else "not_ready", "checks": checks}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -10,6 +10,8 @@ from app.models.template import Template, user_favorite_templates
 from app.models.snippet import Snippet, SnippetCategory, user_favorite_snippets
 from app.models.attachment import Attachment, AttachmentType
 from app.models.revoked_token import RevokedToken
+from app.models.upload_session import UploadSession
+from app.models.blob import Blob
 
 __all__ = [
     "User", "UserRole",
@@ -20,5 +22,7 @@ __all__ = [
     "Template", "user_favorite_templates",
     "Snippet", "SnippetCategory", "user_favorite_snippets",
     "Attachment", "AttachmentType",
-    "RevokedToken"
+    "RevokedToken",
+    "UploadSession",
+    "Blob"
 ]
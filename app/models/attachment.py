@@ -37,6 +37,7 @@ class Attachment(Base):
     # Metadata
     original_filename = Column(String(255), nullable=True)
     file_size = Column(Integer, nullable=True)  # Size in bytes
+    file_hash = Column(String(64), nullable=True)  # SHA-256 computed while uploading (NULL for older rows)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
@@ -0,0 +1,28 @@
+"""
+Blob model: reference counts for content-addressed file storage.
+"""
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from app.db.session import Base
+
+
+class Blob(Base):
+    """
+    A file stored once under its SHA-256, shared by every row that references it.
+
+    ``refcount`` counts the attachments and documents whose path is
+    ``sha256:<sha256>``; blobs at zero are removed by the garbage collector
+    once ``updated_at`` is older than the grace period.
+    """
+    __tablename__ = "blobs"
+
+    sha256 = Column(String(64), primary_key=True)  # Hex digest, also the file name on disk
+    size = Column(BigInteger, nullable=False)
+    refcount = Column(Integer, nullable=False, default=0)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<Blob {self.sha256[:12]} refs={self.refcount}>"
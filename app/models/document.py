@@ -2,7 +2,7 @@
 Document model for tracking generated PDFs.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
@@ -18,6 +18,10 @@ class DocumentType:
 class Document(Base):
     """Document model for tracking generated documents."""
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_created_at_id", "created_at", "id"),
+        Index("ix_documents_patient_created_at_id", "patient_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -2,7 +2,7 @@
 Encounter (Clinical Consultation) model using SOAP format.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 from app.db.session import Base
@@ -44,6 +44,10 @@ class Encounter(Base):
     - P (Plan): Treatment plan and next steps
     """
     __tablename__ = "encounters"
+    __table_args__ = (
+        Index("ix_encounters_created_at_id", "created_at", "id"),
+        Index("ix_encounters_patient_created_at_id", "patient_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
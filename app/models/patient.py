@@ -2,13 +2,17 @@
 Patient model for medical records.
 """
 from datetime import datetime, date
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Index
 from app.db.session import Base
+from app.db.patient_search_ddl import attach_search_ddl
 
 
 class Patient(Base):
     """Patient model for storing patient information."""
     __tablename__ = "patients"
+    __table_args__ = (
+        Index("ix_patients_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -34,7 +38,7 @@ class Patient(Base):
 
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     deleted_at = Column(DateTime, nullable=True, index=True)
 
     @property
@@ -52,3 +56,6 @@ class Patient(Base):
 
     def __repr__(self):
         return f"<Patient {self.full_name} (CI: {self.ci})>"
+
+
+attach_search_ddl(Patient.__table__)
@@ -2,7 +2,7 @@
 Snippet model for reusable text fragments in clinical notes.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Table, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Table, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 from app.models.encounter import MedicalSpecialty
@@ -45,7 +45,7 @@ class Snippet(Base):
 
     # Metadata
     is_active = Column(Integer, default=1)  # SQLite compatible boolean
-    usage_count = Column(Integer, default=0)  # Track how often it's used
+    usage_count = Column(Integer, default=0, server_default="0", nullable=False)  # Track how often it's used
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -58,3 +58,7 @@ class Snippet(Base):
 
     def __repr__(self):
         return f"<Snippet {self.title} - {self.category}>"
+
+
+# Matches the listing order (most used first, then title) for keyset pagination
+Index("ix_snippets_usage_count_title_id", Snippet.usage_count.desc(), Snippet.title, Snippet.id)
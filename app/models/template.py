@@ -2,7 +2,7 @@
 Template model for SOAP consultation templates.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, JSON, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, JSON, Table, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 from app.models.encounter import MedicalSpecialty
@@ -24,6 +24,9 @@ class Template(Base):
     Provides default structure for specific medical specialties.
     """
     __tablename__ = "templates"
+    __table_args__ = (
+        Index("ix_templates_title_id", "title", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -0,0 +1,54 @@
+"""
+Upload session model for resumable attachment uploads.
+"""
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy.orm import relationship
+from app.db.session import Base
+from app.models.attachment import AttachmentType
+
+
+class UploadSession(Base):
+    """
+    An attachment upload received in several requests.
+
+    Bytes are appended to a staged file at ``offset``; when ``offset``
+    reaches ``length`` the file is moved into attachment storage and
+    ``attachment_id`` points at the created attachment.
+    """
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(32), primary_key=True)  # Random hex token used in the upload URL
+
+    # Target of the finished attachment
+    patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
+    encounter_id = Column(Integer, ForeignKey("encounters.id"), nullable=True)
+    attachment_type = Column(Enum(AttachmentType), nullable=False, default=AttachmentType.OTHER)
+    original_filename = Column(String(255), nullable=True)
+    mime_type = Column(String(100), nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+
+    # Progress
+    length = Column(BigInteger, nullable=False)  # Declared total size in bytes
+    offset = Column(BigInteger, nullable=False, default=0)  # Bytes received so far
+    attachment_id = Column(Integer, ForeignKey("attachments.id"), nullable=True)
+
+    # Lease of the request writing the upload (at most one, on any worker)
+    lease_token = Column(String(32), nullable=True)
+    leased_until = Column(DateTime, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)  # Pushed forward by every PATCH
+
+    # Relationships
+    attachment = relationship("Attachment")
+
+    @property
+    def completed(self) -> bool:
+        """True once every byte was received and the attachment was created."""
+        return self.attachment_id is not None
+
+    def __repr__(self):
+        return f"<UploadSession {self.id} {self.offset}/{self.length}>"
@@ -9,6 +9,11 @@ from app.schemas.encounter import Encounter, EncounterCreate, EncounterUpdate, E
 from app.schemas.template import Template, TemplateCreate, TemplateUpdate, TemplateInDB, TemplateWithFavorite
 from app.schemas.snippet import Snippet, SnippetCreate, SnippetUpdate, SnippetInDB, SnippetWithFavorite
 from app.schemas.attachment import Attachment, AttachmentCreate, AttachmentInDB, AttachmentWithUploader
+from app.schemas.export import ExportEntity, ExportFormat
+from app.schemas.favorite import FavoriteBulkRequest, FavoriteBulkResult
+from app.schemas.patient_import import PatientImportFormat, PatientImportReport, PatientImportRowError
+from app.schemas.upload_session import UploadSession, UploadSessionCreate
+from app.schemas.timeline import TimelineEntry, TimelineKind
 
 __all__ = [
     "User",
@@ -50,4 +55,15 @@ __all__ = [
     "AttachmentCreate",
     "AttachmentInDB",
     "AttachmentWithUploader",
+    "ExportEntity",
+    "ExportFormat",
+    "FavoriteBulkRequest",
+    "FavoriteBulkResult",
+    "PatientImportFormat",
+    "PatientImportReport",
+    "PatientImportRowError",
+    "UploadSession",
+    "UploadSessionCreate",
+    "TimelineEntry",
+    "TimelineKind",
 ]
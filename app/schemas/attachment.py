@@ -20,6 +20,7 @@ class AttachmentCreate(AttachmentBase):
     file_path: str
     mime_type: Optional[str] = None
     file_size: Optional[int] = None
+    file_hash: Optional[str] = None
     created_by: int
 
 
@@ -29,6 +30,7 @@ class AttachmentInDB(AttachmentBase):
     file_path: str
     mime_type: Optional[str]
     file_size: Optional[int]
+    file_hash: Optional[str] = None
     created_by: int
     created_at: datetime
 
@@ -0,0 +1,17 @@
+"""
+Bulk export Pydantic schemas.
+"""
+import enum
+
+
+class ExportEntity(str, enum.Enum):
+    """Tables that can be exported."""
+    PATIENTS = "patients"
+    ENCOUNTERS = "encounters"
+    DOCUMENTS = "documents"
+
+
+class ExportFormat(str, enum.Enum):
+    """Supported export file formats."""
+    NDJSON = "ndjson"
+    CSV = "csv"
@@ -0,0 +1,16 @@
+"""
+Favorites Pydantic schemas for bulk operations.
+"""
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class FavoriteBulkRequest(BaseModel):
+    """Ids of templates or snippets to add to or remove from favorites."""
+    ids: List[int] = Field(..., min_length=1, max_length=500, description="IDs a agregar o remover")
+
+
+class FavoriteBulkResult(BaseModel):
+    """Outcome of a bulk favorites operation."""
+    changed: int = Field(..., description="Favoritos agregados o removidos")
+    not_found: List[int] = Field(default_factory=list, description="IDs inexistentes (ignorados)")
@@ -0,0 +1,32 @@
+"""
+Bulk patient import Pydantic schemas.
+"""
+import enum
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class PatientImportFormat(str, enum.Enum):
+    """Supported bulk import file formats."""
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+class PatientImportRowError(BaseModel):
+    """A row that was not imported."""
+    row: int = Field(..., description="Línea del archivo (1 = primera fila de datos)")
+    ci: Optional[str] = None
+    errors: List[str]
+
+
+class PatientImportReport(BaseModel):
+    """Summary of a bulk patient import."""
+    received: int = Field(0, description="Filas leídas")
+    inserted: int = Field(0, description="Pacientes creados")
+    duplicates: int = Field(0, description="Filas omitidas por CI o email ya existente")
+    invalid: int = Field(0, description="Filas con errores de formato o validación")
+    batches: int = 0
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
+    errors: List[PatientImportRowError] = Field(default_factory=list)
+    errors_truncated: bool = Field(False, description="Hay más errores que los reportados")
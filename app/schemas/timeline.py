@@ -0,0 +1,35 @@
+"""
+Patient timeline Pydantic schemas.
+"""
+import enum
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, ConfigDict
+
+
+class TimelineKind(str, enum.Enum):
+    """Kind of event on a patient timeline."""
+    ENCOUNTER = "encounter"
+    DOCUMENT = "document"
+    ATTACHMENT = "attachment"
+    AUDIT = "audit"
+
+
+class TimelineEntry(BaseModel):
+    """
+    Lightweight projection of one timeline event.
+
+    ``title`` and ``detail`` depend on the kind: specialty and status for
+    encounters, document type and filename for documents, filename and
+    attachment type for attachments, action and description for audit events.
+    """
+    kind: TimelineKind
+    id: int
+    occurred_at: datetime
+    encounter_id: Optional[int] = None
+    title: Optional[str] = None
+    detail: Optional[str] = None
+    actor_id: Optional[int] = None
+    actor_name: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
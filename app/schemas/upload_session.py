@@ -0,0 +1,33 @@
+"""
+Resumable upload session Pydantic schemas.
+"""
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict
+from app.models.attachment import AttachmentType
+
+
+class UploadSessionCreate(BaseModel):
+    """Schema for starting a resumable upload."""
+    patient_id: int = Field(..., gt=0)
+    encounter_id: Optional[int] = Field(None, gt=0)
+    attachment_type: AttachmentType
+    original_filename: Optional[str] = Field(None, max_length=255)
+    mime_type: Optional[str] = Field(None, max_length=100)
+    length: int = Field(..., gt=0, description="Tamaño total del archivo en bytes")
+
+
+class UploadSession(BaseModel):
+    """Schema for upload session progress (response)."""
+    id: str
+    patient_id: int
+    encounter_id: Optional[int]
+    attachment_type: AttachmentType
+    original_filename: Optional[str]
+    length: int
+    offset: int
+    attachment_id: Optional[int]
+    completed: bool
+    expires_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,128 @@
+"""
+Chunked, non-blocking storage of uploaded attachment files.
+
+``save`` reads the ``UploadFile`` a chunk at a time and hands each chunk to a
+worker thread, which writes it and feeds the SHA-256, so a large photo never
+blocks the event loop and is hashed without a second pass over the file.
+The size limit is checked against the part size Starlette already knows
+before anything is copied, and again while streaming; a file that is too
+large, or an upload that fails half way, leaves nothing on disk. Files
+written here are incoming: once recorded they are moved into the blob store
+(app.services.blob_store), which keeps one copy per distinct content.
+"""
+import hashlib
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+
+class UploadTooLargeError(Exception):
+    """Raised when an upload exceeds the configured maximum size."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File exceeds the maximum size of {max_bytes // (1024 * 1024)} MB")
+        self.max_bytes = max_bytes
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    """An incoming file written to disk and hashed."""
+    path: Path
+    size: int
+    sha256: str
+
+
+def _write_chunk(handle: BinaryIO, digest, chunk: bytes) -> None:
+    handle.write(chunk)
+    digest.update(chunk)
+
+
+class AttachmentStorage:
+    """Write uploads under a directory with unique names."""
+
+    def __init__(self, directory: Path, max_bytes: int, chunk_size: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+
+    async def save(self, upload: UploadFile) -> StoredUpload:
+        """
+        Stream an upload to disk, computing its size and SHA-256.
+
+        Args:
+            upload: Uploaded file
+
+        Returns:
+            Stored file with its size and hex SHA-256
+
+        Raises:
+            UploadTooLargeError: If the file is larger than ``max_bytes``
+        """
+        if upload.size is not None and upload.size > self.max_bytes:
+            raise UploadTooLargeError(self.max_bytes)
+
+        path = self._new_path(upload.filename)
+        digest = hashlib.sha256()
+        size = 0
+
+        await run_in_threadpool(self.directory.mkdir, parents=True, exist_ok=True)
+        handle = await run_in_threadpool(path.open, "wb")
+        try:
+            while True:
+                chunk = await upload.read(self.chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > self.max_bytes:
+                    raise UploadTooLargeError(self.max_bytes)
+                await run_in_threadpool(_write_chunk, handle, digest, chunk)
+        except BaseException:
+            await run_in_threadpool(handle.close)
+            await run_in_threadpool(path.unlink, missing_ok=True)
+            raise
+        await run_in_threadpool(handle.close)
+
+        return StoredUpload(path=path, size=size, sha256=digest.hexdigest())
+
+    def hash_file(self, source: Path) -> StoredUpload:
+        """
+        Hash a fully received file in place (blocking).
+
+        Args:
+            source: Assembled file, e.g. a finished resumable upload
+
+        Returns:
+            The file with its size and hex SHA-256
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with source.open("rb") as handle:
+            while True:
+                chunk = handle.read(self.chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                digest.update(chunk)
+        return StoredUpload(path=source, size=size, sha256=digest.hexdigest())
+
+    def _new_path(self, filename: Optional[str]) -> Path:
+        suffix = Path(filename).suffix if filename else ""
+        return self.directory / f"{uuid.uuid4()}{suffix}"
+
+    async def discard(self, stored: StoredUpload) -> None:
+        """Remove a stored file whose database record could not be written."""
+        await run_in_threadpool(stored.path.unlink, missing_ok=True)
+
+
+# Global instance
+attachment_storage = AttachmentStorage(
+    directory=Path(settings.ATTACHMENT_STORAGE_PATH),
+    max_bytes=settings.ATTACHMENT_MAX_UPLOAD_MB * 1024 * 1024,
+    chunk_size=settings.ATTACHMENT_UPLOAD_CHUNK_KB * 1024,
+)
@@ -1,10 +1,14 @@
 """
 Audit service for logging user actions.
 """
+import json
+from datetime import datetime
 from typing import Optional, Dict, Any
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.principal_cache import Principal
 from app.models.audit_log import AuditLog
-from app.models.user import User
+from app.services.audit_writer import audit_writer
 
 
 class AuditService:
@@ -13,16 +17,22 @@ class AuditService:
     @staticmethod
     def log(
         db: Session,
-        user: User,
+        user: Principal,
         entity: str,
         action: str,
         entity_id: Optional[int] = None,
         description: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        strict: bool = False
     ) -> AuditLog:
         """
         Create an audit log entry.
 
+        By default the entry is queued for the batched background writer and
+        is committed shortly after the request. With ``strict=True`` the entry
+        is added to ``db`` and flushed, so it is committed (or rolled back)
+        together with the caller's business transaction; the caller commits.
+
         Args:
             db: Database session
             user: User performing the action
@@ -31,19 +41,41 @@ class AuditService:
             entity_id: ID of the affected entity
             description: Human-readable description
             metadata: Additional metadata as dictionary
+            strict: Write in the caller's transaction instead of queueing
 
         Returns:
-            Created AuditLog instance
+            AuditLog instance (transient when queued)
         """
+        # Round-trip through JSON so dates and enums are stored as plain values
+        metadata = json.loads(json.dumps(metadata or {}, default=str))
+
         audit_log = AuditLog(
             user_id=user.id,
             entity=entity,
             entity_id=entity_id,
             action=action,
             description=description,
-            metadata=metadata or {}
+            metadata_=metadata,
+            created_at=datetime.utcnow()
         )
 
+        if strict:
+            db.add(audit_log)
+            db.flush()
+            return audit_log
+
+        if settings.AUDIT_ASYNC:
+            audit_writer.enqueue(db.get_bind(), {
+                "user_id": audit_log.user_id,
+                "entity": audit_log.entity,
+                "entity_id": audit_log.entity_id,
+                "action": audit_log.action,
+                "description": audit_log.description,
+                "metadata": metadata,
+                "created_at": audit_log.created_at,
+            })
+            return audit_log
+
         db.add(audit_log)
         db.commit()
         db.refresh(audit_log)
@@ -51,7 +83,7 @@ class AuditService:
         return audit_log
 
     @staticmethod
-    def log_patient_create(db: Session, user: User, patient_id: int, patient_ci: str) -> AuditLog:
+    def log_patient_create(db: Session, user: Principal, patient_id: int, patient_ci: str) -> AuditLog:
         """Log patient creation."""
         return AuditService.log(
             db=db,
@@ -66,7 +98,7 @@ class AuditService:
     @staticmethod
     def log_patient_update(
         db: Session,
-        user: User,
+        user: Principal,
         patient_id: int,
         patient_ci: str,
         changed_fields: Optional[Dict[str, Any]] = None
@@ -83,7 +115,13 @@ class AuditService:
         )
 
     @staticmethod
-    def log_patient_delete(db: Session, user: User, patient_id: int, patient_ci: str) -> AuditLog:
+    def log_patient_delete(
+        db: Session,
+        user: Principal,
+        patient_id: int,
+        patient_ci: str,
+        strict: bool = False
+    ) -> AuditLog:
         """Log patient deletion."""
         return AuditService.log(
             db=db,
@@ -92,13 +130,14 @@ class AuditService:
             action="delete",
             entity_id=patient_id,
             description=f"Deleted patient with CI: {patient_ci}",
-            metadata={"patient_ci": patient_ci}
+            metadata={"patient_ci": patient_ci},
+            strict=strict
         )
 
     @staticmethod
     def log_document_generate(
         db: Session,
-        user: User,
+        user: Principal,
         document_id: int,
         patient_id: int,
         document_type: str
@@ -117,7 +156,7 @@ class AuditService:
     @staticmethod
     def log_document_download(
         db: Session,
-        user: User,
+        user: Principal,
         document_id: int,
         patient_id: int
     ) -> AuditLog:
@@ -135,7 +174,7 @@ class AuditService:
     @staticmethod
     def log_document_print(
         db: Session,
-        user: User,
+        user: Principal,
         document_id: int,
         patient_id: int
     ) -> AuditLog:
@@ -153,7 +192,7 @@ class AuditService:
     @staticmethod
     def log_apply_template(
         db: Session,
-        user: User,
+        user: Principal,
         encounter_id: int,
         template_id: int,
         patient_id: int,
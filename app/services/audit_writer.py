@@ -0,0 +1,398 @@
+"""
+Batched, asynchronous writer for audit log entries.
+
+Entries are appended to a local spool file and queued in memory; a background
+thread bulk-inserts them when the batch is full or the flush interval passes.
+The spool always mirrors what has not been committed yet, so entries that were
+queued when the process died are replayed on the next startup.
+
+Every process spools to its own file (``audit_spool.<pid>.ndjson`` next to
+AUDIT_SPOOL_PATH) and holds an exclusive lock on ``<spool>.lock`` while it
+runs, so uvicorn workers sharing the path never move or replay each other's
+entries. ``recover`` only adopts spools whose lock it can take, i.e. whose
+owner has exited.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+def _try_lock(handle) -> bool:
+    """Take a non-blocking exclusive lock on an open file; False if another process holds it."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _read_spool_file(path: Path) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    if not path.exists():
+        return rows
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rows.append(_row_from_spool(json.loads(line)))
+            except (ValueError, TypeError):
+                logger.error("Skipping corrupt audit spool line: %r", line[:200])
+    return rows
+
+
+class AuditWriter:
+    """Queue audit rows in memory and flush them to the database in bulk."""
+
+    def __init__(
+        self,
+        spool_path: Path,
+        batch_size: int,
+        flush_interval: float,
+        fsync: bool = False,
+        owner: Optional[str] = None
+    ):
+        self.spool_base = spool_path
+        self._fixed_owner = owner
+        self._lock_handle = None
+        self._lock_owner: Optional[str] = None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._queue: List[Tuple[Optional[Engine], Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._spool = None
+
+    @property
+    def pending(self) -> int:
+        """Number of entries waiting to be flushed."""
+        return len(self._queue)
+
+    @property
+    def owner(self) -> str:
+        """Spool owner token: the process ID unless fixed at construction."""
+        return self._fixed_owner or str(os.getpid())
+
+    @property
+    def spool_path(self) -> Path:
+        """This process's spool file."""
+        return self._spool_for(self.owner)
+
+    def _spool_for(self, owner: str) -> Path:
+        base = self.spool_base
+        return base.with_name(f"{base.stem}.{owner}{base.suffix}")
+
+    @staticmethod
+    def _inflight_for(spool: Path) -> Path:
+        return spool.with_name(spool.name + ".inflight")
+
+    @staticmethod
+    def _lock_for(spool: Path) -> Path:
+        return spool.with_name(spool.name + ".lock")
+
+    @property
+    def _inflight_path(self) -> Path:
+        return self._inflight_for(self.spool_path)
+
+    @property
+    def _rejected_path(self) -> Path:
+        return self.spool_base.with_name(self.spool_base.name + ".rejected")
+
+    def _claim(self) -> None:
+        """
+        Lock this process's spool, once per process (again after a fork).
+
+        Files already at the spool path belong to an earlier process that had
+        the same PID; they are renamed aside so ``recover`` adopts them.
+        """
+        owner = self.owner
+        if self._lock_owner == owner:
+            return
+        self._spool = None
+        spool = self.spool_path
+        spool.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(self._lock_for(spool), "a")
+        if not _try_lock(handle):
+            handle.close()
+            raise RuntimeError(f"Audit spool {spool} is locked by another process")
+        self._lock_handle = handle
+        self._lock_owner = owner
+
+        if spool.exists() or self._inflight_for(spool).exists():
+            leftover = self._spool_for(f"{owner}-{time.time_ns()}")
+            for source, target in ((spool, leftover), (self._inflight_for(spool), self._inflight_for(leftover))):
+                if source.exists():
+                    os.replace(source, target)
+
+    def _release(self) -> None:
+        """Drop the spool lock; the lock file is removed when nothing is left to replay."""
+        if self._lock_handle is None:
+            return
+        if not self.spool_path.exists() and not self._inflight_path.exists():
+            self._lock_for(self.spool_path).unlink(missing_ok=True)
+        self._lock_handle.close()
+        self._lock_handle = None
+        self._lock_owner = None
+
+    def _open_spool(self):
+        self._claim()
+        if self._spool is None:
+            self._spool = open(self.spool_path, "a", encoding="utf-8")
+        return self._spool
+
+    def _append_lines(self, handle, rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            handle.write(json.dumps(row, default=str) + "\n")
+        handle.flush()
+        if self.fsync:
+            os.fsync(handle.fileno())
+
+    def enqueue(self, bind: Optional[Engine], row: Dict[str, Any]) -> None:
+        """
+        Queue an audit row for the next bulk insert.
+
+        Args:
+            bind: Engine the row must be written to (None uses the app engine)
+            row: Column values for the audit_logs table
+        """
+        with self._lock:
+            self._append_lines(self._open_spool(), [row])
+            self._queue.append((bind, row))
+            full = len(self._queue) >= self.batch_size
+        self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Audit writer flush failed; entries stay spooled")
+
+    def _take_batch(self) -> List[Tuple[Optional[Engine], Dict[str, Any]]]:
+        """Move queued rows to the in-flight spool; caller must hold the lock."""
+        batch, self._queue = self._queue, []
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+        if self.spool_path.exists():
+            os.replace(self.spool_path, self._inflight_path)
+        return batch
+
+    def _restore_batch(self, batch: List[Tuple[Optional[Engine], Dict[str, Any]]]) -> None:
+        """Put failed rows back in front of the queue and rewrite the spool to match."""
+        with self._lock:
+            self._queue = batch + self._queue
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+            tmp_path = self.spool_path.with_name(self.spool_path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                self._append_lines(handle, [row for _, row in self._queue])
+            os.replace(tmp_path, self.spool_path)
+            if self._inflight_path.exists():
+                self._inflight_path.unlink()
+
+    def flush(self) -> int:
+        """
+        Write all queued entries with one bulk insert per target engine.
+
+        Returns:
+            Number of entries written
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._queue:
+                    return 0
+                batch = self._take_batch()
+
+            groups: Dict[Optional[Engine], List[Dict[str, Any]]] = {}
+            for bind, row in batch:
+                groups.setdefault(bind, []).append(row)
+
+            written = 0
+            remaining: List[Tuple[Optional[Engine], Dict[str, Any]]] = []
+            for bind, rows in groups.items():
+                try:
+                    _bulk_insert(bind, rows)
+                    written += len(rows)
+                except Exception as exc:
+                    logger.warning("Audit bulk insert of %s rows failed: %s", len(rows), exc)
+                    inserted, failed = self._insert_one_by_one(bind, rows)
+                    written += inserted
+                    remaining.extend((bind, row) for row in failed)
+
+            if remaining:
+                self._restore_batch(remaining)
+            elif self._inflight_path.exists():
+                self._inflight_path.unlink()
+            return written
+
+    def _insert_one_by_one(self, bind: Optional[Engine], rows: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Retry rows individually so one bad row cannot block the queue.
+
+        Rows that fail while others succeed are moved to the rejected file;
+        if every row fails the database is assumed down and all are kept.
+        """
+        inserted = 0
+        failed: List[Dict[str, Any]] = []
+        for row in rows:
+            try:
+                _bulk_insert(bind, [row])
+                inserted += 1
+            except Exception:
+                failed.append(row)
+
+        if inserted == 0 or not failed:
+            return inserted, failed
+
+        logger.error("Rejected %s audit rows; see %s", len(failed), self._rejected_path)
+        with open(self._rejected_path, "a", encoding="utf-8") as handle:
+            self._append_lines(handle, failed)
+        return inserted, []
+
+    def _orphan_spools(self) -> Set[Path]:
+        """Spool files of other owners next to ours (and the unsuffixed legacy spool)."""
+        base = self.spool_base
+        pattern = re.compile(rf"^{re.escape(base.stem)}(\.[^.]+)?{re.escape(base.suffix)}$")
+        spools: Set[Path] = set()
+        if not base.parent.is_dir():
+            return spools
+        for path in base.parent.iterdir():
+            name = path.name
+            for extension in (".inflight", ".lock"):
+                if name.endswith(extension):
+                    name = name[:-len(extension)]
+                    break
+            if pattern.match(name):
+                spools.add(path.with_name(name))
+        spools.discard(self.spool_path)
+        return spools
+
+    def _adopt(self, spool: Path, bind: Optional[Engine]) -> int:
+        """Move the entries of a spool whose owner has exited into our queue and spool."""
+        lock_path = self._lock_for(spool)
+        with open(lock_path, "a") as handle:
+            if not _try_lock(handle):
+                return 0  # Owner still running
+            rows = _read_spool_file(self._inflight_for(spool)) + _read_spool_file(spool)
+            if rows:
+                with self._lock:
+                    # Mirrored in our spool before the source is removed
+                    self._append_lines(self._open_spool(), rows)
+                    self._queue.extend((bind, row) for row in rows)
+            self._inflight_for(spool).unlink(missing_ok=True)
+            spool.unlink(missing_ok=True)
+        try:
+            lock_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+        return len(rows)
+
+    def recover(self, bind: Optional[Engine] = None) -> int:
+        """
+        Replay entries left in spools by processes that have exited.
+
+        Spools whose owner still holds its lock (another live worker) are
+        left alone.
+
+        Args:
+            bind: Engine to write to (None uses the app engine)
+
+        Returns:
+            Number of entries replayed
+        """
+        self._claim()
+        recovered = 0
+        for spool in sorted(self._orphan_spools()):
+            recovered += self._adopt(spool, bind)
+
+        if recovered:
+            logger.info("Recovered %s audit entries from spool", recovered)
+            self.flush()
+        return recovered
+
+    def start(self) -> None:
+        """Replay any spooled entries and start the background flusher."""
+        self.recover()
+        self._ensure_thread()
+
+    def stop(self) -> None:
+        """Flush pending entries and stop the background flusher."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self.flush()
+        with self._lock:
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+            self._release()
+
+
+def _row_from_spool(data: Dict[str, Any]) -> Dict[str, Any]:
+    created_at = data.get("created_at")
+    if isinstance(created_at, str):
+        data["created_at"] = datetime.fromisoformat(created_at)
+    return data
+
+
+def _bulk_insert(bind: Optional[Engine], rows: List[Dict[str, Any]]) -> None:
+    if bind is None:
+        from app.db.session import engine as bind
+    with bind.begin() as conn:
+        conn.execute(insert(AuditLog.__table__), rows)
+
+
+# Global instance
+audit_writer = AuditWriter(
+    spool_path=Path(settings.AUDIT_SPOOL_PATH),
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    fsync=settings.AUDIT_SPOOL_FSYNC,
+)
@@ -0,0 +1,273 @@
+"""
+Content-addressed, deduplicated storage for attachments and generated PDFs.
+
+Every file is stored once under its SHA-256, in two levels of shard
+directories (``ab/cd/abcd...``) so no directory grows past a few thousand
+entries, on the storage backend selected by ``BLOB_STORAGE_BACKEND`` (local
+disk or an S3-compatible bucket, see app.services.storage_backends). Rows
+point at a blob with a ``sha256:<hex>`` reference in
+``Attachment.file_path`` / ``Document.pdf_path``; paths written before the
+blob store existed are plain paths and still resolve. The ``blobs`` table
+counts references, so the same referral PDF uploaded for several encounters,
+or an unchanged card regenerated, costs one file.
+
+Files are placed before the reference count is changed in the caller's
+transaction, so no database write is pending, and no SQLite write gate held,
+while a file is copied or uploaded. Files are only deleted by the garbage
+collector (``collect_garbage``, run by ``scripts/gc_blobs.py``), which
+decides on the blob row: blobs whose row has had no references for longer
+than the grace period are removed, as are files that never got a committed
+row (e.g. a request that failed after placing its file). A put that finds
+its blob's row gone by the time it adds the reference stores the file again.
+"""
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.http_cache import content_disposition
+from app.db.upsert import insert_ignoring_conflicts
+from app.models.blob import Blob
+from app.services.storage_backends import LocalStorageBackend, StorageBackend, StoredObject, create_storage_backend
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_PREFIX = "sha256:"
+
+# Objects checked against the blobs table per query during garbage collection
+GC_BATCH_SIZE = 500
+
+
+@dataclass
+class BlobGarbageReport:
+    """What a garbage collection pass removed (or would remove, on a dry run)."""
+    blobs: int = 0
+    orphans: int = 0
+    bytes_freed: int = 0
+
+
+class BlobStore:
+    """Store files under sharded SHA-256 keys with reference counts."""
+
+    def __init__(self, backend: StorageBackend, presigned_url_seconds: int):
+        self.backend = backend
+        self.presigned_url_seconds = presigned_url_seconds
+
+    @staticmethod
+    def reference(sha256: str) -> str:
+        """Stored path value for a blob."""
+        return f"{REFERENCE_PREFIX}{sha256}"
+
+    @staticmethod
+    def is_reference(stored_path: str) -> bool:
+        """True if a stored path is a blob reference rather than a legacy path."""
+        return stored_path.startswith(REFERENCE_PREFIX)
+
+    @staticmethod
+    def key_for(sha256: str) -> str:
+        """Backend key of a blob."""
+        return f"{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+    def open(self, stored_path: str, legacy_root: Optional[Path] = None) -> Optional[StoredObject]:
+        """
+        Look up an ``Attachment.file_path`` / ``Document.pdf_path`` value.
+
+        Args:
+            stored_path: Blob reference or legacy path
+            legacy_root: Directory relative legacy paths are stored under
+
+        Returns:
+            The stored object to stream, or None if it does not exist
+        """
+        if self.is_reference(stored_path):
+            return self.backend.stat(self.key_for(stored_path[len(REFERENCE_PREFIX):]))
+        # Files written before the blob store are local; absolute paths ignore the root
+        return LocalStorageBackend(legacy_root or Path(".")).stat(stored_path)
+
+    def presigned_url(
+        self,
+        stored_path: str,
+        filename: str,
+        media_type: str,
+        disposition: str = "attachment"
+    ) -> Optional[str]:
+        """
+        Direct download URL for a blob, if the backend supports them.
+
+        Returns:
+            A URL valid for ``presigned_url_seconds``, or None for legacy paths,
+            local storage or when presigned downloads are disabled
+        """
+        if not self.is_reference(stored_path) or self.presigned_url_seconds <= 0:
+            return None
+        return self.backend.presigned_url(
+            self.key_for(stored_path[len(REFERENCE_PREFIX):]),
+            media_type, content_disposition(disposition, filename), self.presigned_url_seconds
+        )
+
+    def put_file(self, db: Session, source: Path, sha256: str, size: int) -> str:
+        """
+        Add a reference to the blob with a file's content, storing it if new.
+
+        The file is streamed to the backend (hard-linked on local storage)
+        unless it is already stored, and ``source`` is left for the caller
+        to remove. The reference count is then changed in ``db``'s
+        transaction; the caller commits it together with the row that holds
+        the reference. If the blob row had to be created, the file is stored
+        again when the garbage collector removed it in the meantime.
+
+        Args:
+            db: Database session
+            source: Fully written file
+            sha256: Hex SHA-256 of the file
+            size: File size in bytes
+
+        Returns:
+            Blob reference to store in the row
+        """
+        key = self.key_for(sha256)
+        if not self.backend.touch(key):
+            self.backend.put_file(key, source)
+        if self._add_reference(db, sha256, size) and self.backend.stat(key) is None:
+            self.backend.put_file(key, source)
+        return self.reference(sha256)
+
+    def put_bytes(self, db: Session, data: bytes, sha256: Optional[str] = None) -> str:
+        """
+        Add a reference to the blob with the given content, storing it if new.
+
+        Args:
+            db: Database session (committed by the caller)
+            data: File content
+            sha256: Hex SHA-256 of ``data`` if already computed
+
+        Returns:
+            Blob reference to store in the row
+        """
+        sha256 = sha256 or hashlib.sha256(data).hexdigest()
+        key = self.key_for(sha256)
+        if not self.backend.touch(key):
+            self.backend.put_bytes(key, data)
+        if self._add_reference(db, sha256, len(data)) and self.backend.stat(key) is None:
+            self.backend.put_bytes(key, data)
+        return self.reference(sha256)
+
+    def release(self, db: Session, stored_path: str) -> None:
+        """
+        Drop a reference (legacy paths are ignored).
+
+        The file stays until the garbage collector removes it, so a
+        transaction that re-adds the reference meanwhile loses nothing.
+        """
+        if not self.is_reference(stored_path):
+            return
+        db.query(Blob).filter(
+            Blob.sha256 == stored_path[len(REFERENCE_PREFIX):],
+            Blob.refcount > 0
+        ).update(
+            {Blob.refcount: Blob.refcount - 1, Blob.updated_at: datetime.utcnow()},
+            synchronize_session=False
+        )
+
+    def collect_garbage(self, db: Session, grace: timedelta, dry_run: bool = False) -> BlobGarbageReport:
+        """
+        Delete blobs without references and files without a blob row.
+
+        Only blobs whose row has been unreferenced, and files without a row
+        that are older, for longer than ``grace`` are removed, which leaves
+        in-flight uploads alone. A put racing the deletion of its blob's row
+        re-creates the row and the file (see ``put_file``).
+
+        Args:
+            db: Database session
+            grace: Minimum age of what is removed
+            dry_run: Only count what would be removed
+
+        Returns:
+            Counts of removed blobs, orphan files and bytes
+        """
+        report = BlobGarbageReport()
+        cutoff = datetime.utcnow() - grace
+
+        unreferenced = db.query(Blob.sha256, Blob.size).filter(
+            Blob.refcount <= 0,
+            Blob.updated_at < cutoff
+        ).all()
+        for sha256, size in unreferenced:
+            if not dry_run:
+                # The row is re-checked (and locked) by the DELETE; a put that
+                # referenced it meanwhile bumped refcount and updated_at
+                deleted = db.query(Blob).filter(
+                    Blob.sha256 == sha256,
+                    Blob.refcount <= 0,
+                    Blob.updated_at < cutoff
+                ).delete(synchronize_session=False)
+                if not deleted:
+                    db.rollback()
+                    continue
+                # The file goes before the commit, so a put blocked on the row
+                # finds it gone, inserts a new row and stores the file again
+                self.backend.delete(self.key_for(sha256))
+                db.commit()
+            report.blobs += 1
+            report.bytes_freed += size
+
+        cutoff_ns = int((time.time() - grace.total_seconds()) * 1_000_000_000)
+        batch: List[StoredObject] = []
+        for stored in self.backend.list_objects():
+            if stored.mtime_ns < cutoff_ns:
+                batch.append(stored)
+            if len(batch) >= GC_BATCH_SIZE:
+                self._remove_orphans(db, batch, report, dry_run)
+                batch = []
+        if batch:
+            self._remove_orphans(db, batch, report, dry_run)
+
+        if report.blobs or report.orphans:
+            logger.info(
+                "Blob GC%s: %s unreferenced blobs, %s orphan files, %s bytes",
+                " (dry run)" if dry_run else "", report.blobs, report.orphans, report.bytes_freed
+            )
+        return report
+
+    def _remove_orphans(self, db: Session, objects: List[StoredObject], report: BlobGarbageReport, dry_run: bool) -> None:
+        """Delete objects whose name is not a blob row (stale temp files included)."""
+        names = {stored.key.rsplit("/", 1)[-1]: stored for stored in objects}
+        known = {sha256 for (sha256,) in db.query(Blob.sha256).filter(Blob.sha256.in_(list(names)))}
+        for name, stored in names.items():
+            if name in known:
+                continue
+            if not dry_run:
+                self.backend.delete(stored.key)
+            report.orphans += 1
+            report.bytes_freed += stored.size
+
+    def _add_reference(self, db: Session, sha256: str, size: int) -> bool:
+        """Count a reference; True if the blob row had to be created."""
+        now = datetime.utcnow()
+        values = {Blob.refcount: Blob.refcount + 1, Blob.updated_at: now}
+        if db.query(Blob).filter(Blob.sha256 == sha256).update(values, synchronize_session=False):
+            return False
+
+        insert = insert_ignoring_conflicts(db, Blob.__table__)
+        if insert is None:
+            insert = Blob.__table__.insert()
+        result = db.execute(insert.values(sha256=sha256, size=size, refcount=1, created_at=now, updated_at=now))
+        if result.rowcount == 0:
+            # Inserted by a concurrent transaction since our UPDATE
+            db.query(Blob).filter(Blob.sha256 == sha256).update(values, synchronize_session=False)
+            return False
+        return True
+
+
+# Global instance
+blob_store = BlobStore(
+    backend=create_storage_backend(),
+    presigned_url_seconds=settings.BLOB_PRESIGNED_URL_SECONDS,
+)
@@ -0,0 +1,202 @@
+"""
+Streaming bulk export of patients, encounters and document metadata.
+
+Rows are read in ``id`` order through a server-side cursor
+(``yield_per``, which implies ``stream_results``), serialized as NDJSON or
+CSV and optionally gzip-compressed on the fly, so memory stays flat however
+large the table is. Every row carries its ``id``; an interrupted export is
+resumed by asking for the rows after the last id received.
+
+Exports read plain columns only (no ORM objects, no relationships), and
+documents are exported as metadata: the PDF files are not included.
+"""
+import csv
+import enum
+import io
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.document import Document
+from app.models.encounter import Encounter
+from app.models.patient import Patient
+from app.schemas.export import ExportEntity, ExportFormat
+
+# Serialized output is yielded in chunks of about this size
+CHUNK_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """Model and columns exported for one entity."""
+    model: Any
+    fields: Sequence[str]
+    soft_deleted: bool = False
+
+
+EXPORT_SPECS: Dict[ExportEntity, ExportSpec] = {
+    ExportEntity.PATIENTS: ExportSpec(
+        Patient,
+        fields=(
+            "id", "first_name", "last_name", "ci", "date_of_birth", "phone", "email", "address",
+            "emergency_contact_name", "emergency_contact_phone", "emergency_contact_relationship",
+            "allergies", "medical_history", "created_at", "updated_at", "deleted_at",
+        ),
+        soft_deleted=True,
+    ),
+    ExportEntity.ENCOUNTERS: ExportSpec(
+        Encounter,
+        fields=(
+            "id", "patient_id", "doctor_id", "specialty", "status", "template_id",
+            "subjective", "objective", "assessment", "plan", "created_at", "updated_at",
+        ),
+    ),
+    ExportEntity.DOCUMENTS: ExportSpec(
+        Document,
+        fields=(
+            "id", "document_type", "patient_id", "created_by", "filename", "file_size",
+            "file_hash", "description", "created_at",
+        ),
+    ),
+}
+
+
+def _plain(value: Any) -> Any:
+    """Convert column values to JSON/CSV friendly scalars."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class BulkExporter:
+    """Stream table rows as NDJSON or CSV bytes."""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+
+    def rows(
+        self,
+        db: Session,
+        entity: ExportEntity,
+        after_id: int = 0,
+        include_deleted: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield rows in id order, fetched from a server-side cursor.
+
+        Args:
+            db: Database session kept open while iterating
+            entity: What to export
+            after_id: Only rows with a greater id (resume point)
+            include_deleted: Include soft-deleted patients
+
+        Yields:
+            Row dictionaries with plain values
+        """
+        spec = EXPORT_SPECS[entity]
+        model = spec.model
+        statement = select(*(getattr(model, name) for name in spec.fields)).where(model.id > after_id)
+        if spec.soft_deleted and not include_deleted:
+            statement = statement.where(model.deleted_at.is_(None))
+        statement = statement.order_by(model.id).execution_options(yield_per=self.batch_size)
+
+        for row in db.execute(statement):
+            yield {name: _plain(value) for name, value in zip(spec.fields, row)}
+
+    def serialize(
+        self,
+        rows: Iterator[Dict[str, Any]],
+        entity: ExportEntity,
+        file_format: ExportFormat,
+        header: bool = True,
+    ) -> Iterator[bytes]:
+        """
+        Serialize rows into chunks of NDJSON or CSV.
+
+        Args:
+            rows: Rows from ``rows``
+            entity: Exported entity (for the CSV header)
+            file_format: Output format
+            header: Write the CSV header row (off when appending to a partial export)
+
+        Yields:
+            UTF-8 encoded chunks
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n") if file_format == ExportFormat.CSV else None
+        if writer is not None and header:
+            writer.writerow(EXPORT_SPECS[entity].fields)
+
+        for row in rows:
+            if writer is not None:
+                writer.writerow(row.values())
+            else:
+                buffer.write(json.dumps(row, ensure_ascii=False, default=str))
+                buffer.write("\n")
+            if buffer.tell() >= CHUNK_BYTES:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    def stream(
+        self,
+        bind: Engine,
+        entity: ExportEntity,
+        file_format: ExportFormat,
+        after_id: int = 0,
+        include_deleted: bool = False,
+        compress: bool = False,
+        header: bool = True,
+    ) -> Iterator[bytes]:
+        """
+        Stream an export in its own session (it outlives the request's session).
+
+        Args:
+            bind: Engine to read from
+            entity: What to export
+            file_format: Output format
+            after_id: Only rows with a greater id (resume point)
+            include_deleted: Include soft-deleted patients
+            compress: Gzip the output on the fly
+            header: Write the CSV header row
+
+        Yields:
+            Encoded (and optionally compressed) chunks
+        """
+        with Session(bind=bind) as db:
+            chunks = self.serialize(self.rows(db, entity, after_id, include_deleted), entity, file_format, header)
+            if compress:
+                chunks = gzip_chunks(chunks)
+            yield from chunks
+
+
+def gzip_chunks(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a byte stream incrementally (a complete .gz member)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_filename(entity: ExportEntity, file_format: ExportFormat, compress: bool, after_id: Optional[int] = 0) -> str:
+    """Download filename, e.g. ``patients-after-1200.ndjson.gz``."""
+    name = entity.value if not after_id else f"{entity.value}-after-{after_id}"
+    return f"{name}.{file_format.value}" + (".gz" if compress else "")
+
+
+# Global instance
+bulk_exporter = BulkExporter(batch_size=settings.EXPORT_BATCH_SIZE)
@@ -0,0 +1,197 @@
+"""
+Process-level caches for the template and snippet catalogs and user favorites.
+
+Both catalogs are small and change rarely, so each is held as an immutable
+snapshot indexed by (group, only_active), where the group is the specialty
+for templates and the category for snippets. A snapshot is replaced when
+this process writes to the catalog (``invalidate``) and, to pick up writes
+made by other workers, when a cheap fingerprint query (row count, highest
+id, latest ``updated_at``) changes. The fingerprint is checked at most once
+per TTL.
+
+Versions are hashes of the cached content, never counters, so two workers
+holding the same data report the same version. ETags built from them are
+safe to compare across workers.
+"""
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.pagination import SortKey, sort_items
+from app.models.snippet import Snippet, user_favorite_snippets
+from app.models.template import Template, user_favorite_templates
+
+
+def content_version(value: Any) -> str:
+    """Short, stable hash of JSON-serializable content."""
+    raw = json.dumps(value, sort_keys=True, default=str, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable copy of a catalog, in listing order."""
+    version: str
+    fingerprint: Tuple[Any, ...]
+    items: Tuple[Dict[str, Any], ...]
+    _index: Dict[Tuple[Any, bool], Tuple[Dict[str, Any], ...]] = field(repr=False)
+
+    def select(self, group: Any = None, only_active: bool = True) -> Tuple[Dict[str, Any], ...]:
+        """Rows of one group (None for all groups), still in listing order."""
+        return self._index.get((group, only_active), ())
+
+
+class CatalogCache:
+    """Cached snapshot of one catalog table."""
+
+    def __init__(self, model, fields: Sequence[str], group_field: str, keys: Sequence[SortKey], ttl: float):
+        self.model = model
+        self.fields = tuple(fields)
+        self.group_field = group_field
+        self.keys = tuple(keys)
+        self.ttl = ttl
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        # Bumped by invalidate() so a load that raced a write is not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def snapshot(self, db: Session) -> CatalogSnapshot:
+        """
+        Return the current snapshot, reloading it if the table changed.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Catalog snapshot
+        """
+        current, generation = self._snapshot, self._generation
+        if current is not None and time.monotonic() - self._checked_at < self.ttl:
+            return current
+
+        fingerprint = self._fingerprint(db)
+        if current is None or current.fingerprint != fingerprint:
+            current = self._load(db, fingerprint)
+        with self._lock:
+            if generation == self._generation:
+                self._snapshot = current
+                self._checked_at = time.monotonic()
+        return current
+
+    def invalidate(self) -> None:
+        """Drop the snapshot after a write; the next read reloads it."""
+        with self._lock:
+            self._snapshot = None
+            self._generation += 1
+
+    def _fingerprint(self, db: Session) -> Tuple[Any, ...]:
+        row = db.query(
+            func.count(self.model.id),
+            func.max(self.model.id),
+            func.max(self.model.updated_at),
+        ).one()
+        return tuple(row)
+
+    def _load(self, db: Session, fingerprint: Tuple[Any, ...]) -> CatalogSnapshot:
+        columns = [getattr(self.model, name) for name in self.fields]
+        items = sort_items([dict(row._mapping) for row in db.query(*columns).all()], self.keys)
+
+        index: Dict[Tuple[Any, bool], List[Dict[str, Any]]] = {}
+        for item in items:
+            active = item["is_active"] == 1
+            for group in (None, item[self.group_field]):
+                index.setdefault((group, False), []).append(item)
+                if active:
+                    index.setdefault((group, True), []).append(item)
+
+        return CatalogSnapshot(
+            version=content_version(items),
+            fingerprint=fingerprint,
+            items=tuple(items),
+            _index={key: tuple(rows) for key, rows in index.items()},
+        )
+
+
+class FavoritesCache:
+    """Per-user sets of favorite ids from one association table."""
+
+    def __init__(self, table: Table, id_column: str, ttl: float):
+        self.table = table
+        self.id_column = id_column
+        self.ttl = ttl
+        self._entries: Dict[int, Tuple[FrozenSet[int], str, float]] = {}
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int) -> Tuple[FrozenSet[int], str]:
+        """
+        Return a user's favorite ids and their version.
+
+        Args:
+            db: Database session
+            user_id: User whose favorites are needed
+
+        Returns:
+            Tuple of (favorite ids, version)
+        """
+        entry, generation = self._entries.get(user_id), self._generations.get(user_id, 0)
+        if entry is not None and time.monotonic() - entry[2] < self.ttl:
+            return entry[0], entry[1]
+
+        column = self.table.c[self.id_column]
+        ids = frozenset(
+            row[0] for row in db.query(column).filter(self.table.c.user_id == user_id).all()
+        )
+        version = content_version(sorted(ids))
+        with self._lock:
+            if generation == self._generations.get(user_id, 0):
+                self._entries[user_id] = (ids, version, time.monotonic())
+        return ids, version
+
+    def invalidate(self, user_id: int) -> None:
+        """Forget a user's favorites after they change."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self) -> None:
+        """Forget every user's favorites."""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+TEMPLATE_SORT_KEYS = (SortKey(Template.title), SortKey(Template.id))
+SNIPPET_SORT_KEYS = (SortKey(Snippet.usage_count, descending=True), SortKey(Snippet.title), SortKey(Snippet.id))
+
+# Global instances
+template_catalog = CatalogCache(
+    Template,
+    fields=(
+        "id", "title", "description", "specialty", "default_subjective", "default_objective",
+        "default_assessment", "default_plan", "is_active", "requires_photo", "created_at", "updated_at",
+    ),
+    group_field="specialty",
+    keys=TEMPLATE_SORT_KEYS,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+)
+snippet_catalog = CatalogCache(
+    Snippet,
+    fields=(
+        "id", "specialty", "title", "category", "content", "is_active", "usage_count",
+        "created_at", "updated_at",
+    ),
+    group_field="category",
+    keys=SNIPPET_SORT_KEYS,
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+)
+template_favorites = FavoritesCache(user_favorite_templates, "template_id", ttl=settings.CATALOG_CACHE_TTL_SECONDS)
+snippet_favorites = FavoritesCache(user_favorite_snippets, "snippet_id", ttl=settings.CATALOG_CACHE_TTL_SECONDS)
@@ -0,0 +1,102 @@
+"""
+Set-based favorites on the user/template and user/snippet association tables.
+
+Adding and removing favorites are single INSERT ... ON CONFLICT DO NOTHING and
+DELETE statements on the association table, so neither the user's favorites
+collection nor the favorited objects are ever loaded to test membership.
+Both operations are idempotent and take any number of ids.
+"""
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import Table, delete, exists, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.db.upsert import insert_ignoring_conflicts
+from app.models.snippet import Snippet, user_favorite_snippets
+from app.models.template import Template, user_favorite_templates
+from app.services.catalog_cache import FavoritesCache, snippet_favorites, template_favorites
+
+
+class FavoriteLinks:
+    """Add and remove one user's favorites in an association table."""
+
+    def __init__(self, model, table: Table, id_column: str, cache: FavoritesCache):
+        self.model = model
+        self.table = table
+        self.id_column = id_column
+        self.cache = cache
+
+    def add(self, db: Session, user_id: int, ids: Iterable[int]) -> Tuple[int, List[int]]:
+        """
+        Favorite every existing id; ids already favorited are left alone.
+
+        Args:
+            db: Database session (committed on success)
+            user_id: User whose favorites change
+            ids: Template or snippet ids
+
+        Returns:
+            Tuple of (number of favorites added, ids that do not exist)
+        """
+        existing, missing = self._split(db, ids)
+        added = 0
+        if existing:
+            result = db.execute(self._insert_ignoring_duplicates(db, user_id, existing))
+            added = result.rowcount
+        db.commit()
+        if added:
+            self.cache.invalidate(user_id)
+        return added, missing
+
+    def remove(self, db: Session, user_id: int, ids: Iterable[int]) -> Tuple[int, List[int]]:
+        """
+        Unfavorite every existing id; ids not favorited are left alone.
+
+        Args:
+            db: Database session (committed on success)
+            user_id: User whose favorites change
+            ids: Template or snippet ids
+
+        Returns:
+            Tuple of (number of favorites removed, ids that do not exist)
+        """
+        existing, missing = self._split(db, ids)
+        removed = 0
+        if existing:
+            column = self.table.c[self.id_column]
+            result = db.execute(
+                delete(self.table).where(self.table.c.user_id == user_id, column.in_(existing))
+            )
+            removed = result.rowcount
+        db.commit()
+        if removed:
+            self.cache.invalidate(user_id)
+        return removed, missing
+
+    def _split(self, db: Session, ids: Iterable[int]) -> Tuple[List[int], List[int]]:
+        """Separate ids that exist in the catalog from unknown ones, deduplicated."""
+        wanted = sorted(set(ids))
+        found = {
+            row[0] for row in db.query(self.model.id).filter(self.model.id.in_(wanted)).all()
+        } if wanted else set()
+        return [i for i in wanted if i in found], [i for i in wanted if i not in found]
+
+    def _insert_ignoring_duplicates(self, db: Session, user_id: int, ids: List[int]):
+        rows = [{"user_id": user_id, self.id_column: i} for i in ids]
+        statement = insert_ignoring_conflicts(db, self.table)
+        if statement is not None:
+            return statement.values(rows)
+
+        # Portable fallback: insert only the pairs that are not there yet
+        column = self.table.c[self.id_column]
+        candidates = (
+            select(literal(user_id).label("user_id"), self.model.id.label(self.id_column))
+            .where(self.model.id.in_(ids))
+            .where(~exists().where(self.table.c.user_id == user_id, column == self.model.id))
+        )
+        return insert(self.table).from_select(["user_id", self.id_column], candidates)
+
+
+# Global instances
+template_favorite_links = FavoriteLinks(Template, user_favorite_templates, "template_id", template_favorites)
+snippet_favorite_links = FavoriteLinks(Snippet, user_favorite_snippets, "snippet_id", snippet_favorites)
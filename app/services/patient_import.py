@@ -0,0 +1,242 @@
+"""
+Bulk patient import from CSV or NDJSON.
+
+The file is read as a stream, one record at a time, and each record is
+validated with ``PatientCreate``. Valid rows are written in batches of
+``PATIENT_IMPORT_BATCH_SIZE``, each batch as one multi-row
+``INSERT ... ON CONFLICT DO NOTHING RETURNING id, ci`` plus one aggregated
+audit entry, committed together. Rows whose CI or email already exists are
+skipped by the database rather than checked one by one, so memory and round
+trips depend on the batch size, not on the size of the file.
+
+Committed batches stay committed if a later batch fails; the report lists
+every row that was not imported and why.
+"""
+import csv
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.principal_cache import Principal
+from app.db.upsert import insert_ignoring_conflicts
+from app.models.patient import Patient
+from app.schemas.patient import PatientCreate
+from app.schemas.patient_import import PatientImportFormat, PatientImportReport, PatientImportRowError
+from app.services.audit_service import audit_service
+from app.services.patient_index import patient_index
+
+logger = logging.getLogger(__name__)
+
+# (row number, parsed record or None, parse error or None)
+ImportRecord = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+def iter_records(stream: TextIO, file_format: PatientImportFormat) -> Iterator[ImportRecord]:
+    """
+    Parse a CSV (header row required) or NDJSON stream lazily.
+
+    Blank CSV cells become None so optional fields validate as missing.
+
+    Args:
+        stream: Text stream positioned at the start of the file
+        file_format: Format of the stream
+
+    Yields:
+        Tuples of (row number, record, parse error)
+    """
+    if file_format == PatientImportFormat.CSV:
+        reader = csv.DictReader(stream)
+        for row, record in enumerate(reader, start=1):
+            if None in record:
+                yield row, None, "Row has more values than the header"
+                continue
+            yield row, {key.strip(): (value.strip() or None) if value is not None else None
+                        for key, value in record.items()}, None
+        return
+
+    row = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield row, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield row, None, "Each line must be a JSON object"
+            continue
+        yield row, record, None
+
+
+def _validation_messages(exc: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    ]
+
+
+class PatientImporter:
+    """Validate and insert patients in batches."""
+
+    def __init__(self, batch_size: int, max_reported_errors: int):
+        self.batch_size = batch_size
+        self.max_reported_errors = max_reported_errors
+
+    def run(self, db: Session, records: Iterable[ImportRecord], user: Principal) -> PatientImportReport:
+        """
+        Import a stream of records.
+
+        Args:
+            db: Database session (committed once per batch)
+            records: Records from ``iter_records``
+            user: User the audit entries are attributed to
+
+        Returns:
+            Import report with counts, throughput and per-row errors
+        """
+        report = PatientImportReport()
+        started = time.perf_counter()
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+
+        try:
+            for row, record, error in records:
+                report.received += 1
+                if error is not None:
+                    self._reject(report, row, None, [error])
+                    continue
+                try:
+                    patient = PatientCreate.model_validate(record)
+                except ValidationError as exc:
+                    self._reject(report, row, _ci_of(record), _validation_messages(exc))
+                    continue
+                batch.append((row, patient.model_dump()))
+                if len(batch) >= self.batch_size:
+                    self._write_batch(db, batch, user, report)
+                    batch = []
+        except UnicodeDecodeError:
+            self._reject(report, report.received + 1, None, ["File is not valid UTF-8; import stopped here"])
+
+        if batch:
+            self._write_batch(db, batch, user, report)
+
+        report.seconds = round(time.perf_counter() - started, 3)
+        if report.seconds > 0:
+            report.rows_per_second = round(report.received / report.seconds, 1)
+        logger.info(
+            "Patient import: %s rows, %s inserted, %s duplicates, %s invalid in %.1fs",
+            report.received, report.inserted, report.duplicates, report.invalid, report.seconds,
+        )
+        return report
+
+    def _write_batch(
+        self,
+        db: Session,
+        batch: List[Tuple[int, Dict[str, Any]]],
+        user: Principal,
+        report: PatientImportReport,
+    ) -> None:
+        report.batches += 1
+
+        # Rows repeating a CI or email earlier in the same batch
+        rows: List[Tuple[int, Dict[str, Any]]] = []
+        seen_ci, seen_email = set(), set()
+        for row, data in batch:
+            email = data["email"].lower() if data["email"] else None
+            if data["ci"] in seen_ci or (email and email in seen_email):
+                report.duplicates += 1
+                self._report(report, row, data["ci"], ["Duplicate CI or email within the file"])
+                continue
+            seen_ci.add(data["ci"])
+            if email:
+                seen_email.add(email)
+            rows.append((row, data))
+
+        try:
+            inserted = self._insert(db, [data for _, data in rows])
+            if inserted:
+                audit_service.log(
+                    db=db,
+                    user=user,
+                    entity="patient",
+                    action="bulk_import",
+                    description=f"Imported {len(inserted)} patients (rows {rows[0][0]}-{rows[-1][0]})",
+                    metadata={"count": len(inserted), "patient_ids": sorted(inserted.values())},
+                    strict=True,
+                )
+            db.commit()
+        except SQLAlchemyError as exc:
+            db.rollback()
+            logger.warning("Patient import batch of %s rows failed: %s", len(rows), exc)
+            message = f"Batch failed: {getattr(exc, 'orig', exc)}"
+            for row, data in rows:
+                report.invalid += 1
+                self._report(report, row, data["ci"], [message])
+            return
+
+        skipped = [(row, data) for row, data in rows if data["ci"] not in inserted]
+        if skipped:
+            existing_ci = {
+                ci for (ci,) in db.query(Patient.ci).filter(Patient.ci.in_([d["ci"] for _, d in skipped]))
+            }
+            for row, data in skipped:
+                report.duplicates += 1
+                reason = (f"Patient with CI {data['ci']} already exists" if data["ci"] in existing_ci
+                          else f"Patient with email {data['email']} already exists")
+                self._report(report, row, data["ci"], [reason])
+
+        report.inserted += len(inserted)
+        for _, data in rows:
+            if data["ci"] in inserted:
+                patient_index.upsert(Patient(id=inserted[data["ci"]], **data))
+
+    def _insert(self, db: Session, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Insert rows that do not conflict; returns {ci: id} of the inserted ones."""
+        if not rows:
+            return {}
+        table = Patient.__table__
+        statement = insert_ignoring_conflicts(db, table)
+        if statement is None:
+            # No ON CONFLICT: leave out rows whose CI or email already exists
+            emails = [r["email"] for r in rows if r["email"]]
+            taken = db.query(Patient.ci, Patient.email).filter(
+                or_(Patient.ci.in_([r["ci"] for r in rows]), Patient.email.in_(emails))
+            ).all()
+            taken_ci = {ci for ci, _ in taken}
+            taken_email = {email for _, email in taken if email}
+            rows = [r for r in rows if r["ci"] not in taken_ci and r["email"] not in taken_email]
+            if not rows:
+                return {}
+            statement = insert(table)
+        result = db.execute(statement.values(rows).returning(table.c.ci, table.c.id))
+        return {ci: patient_id for ci, patient_id in result}
+
+    def _reject(self, report: PatientImportReport, row: int, ci: Optional[str], errors: List[str]) -> None:
+        report.invalid += 1
+        self._report(report, row, ci, errors)
+
+    def _report(self, report: PatientImportReport, row: int, ci: Optional[str], errors: List[str]) -> None:
+        if len(report.errors) >= self.max_reported_errors:
+            report.errors_truncated = True
+            return
+        report.errors.append(PatientImportRowError(row=row, ci=ci, errors=errors))
+
+
+def _ci_of(record: Optional[Dict[str, Any]]) -> Optional[str]:
+    value = (record or {}).get("ci")
+    return str(value) if value is not None else None
+
+
+# Global instance
+patient_importer = PatientImporter(
+    batch_size=settings.PATIENT_IMPORT_BATCH_SIZE,
+    max_reported_errors=settings.PATIENT_IMPORT_MAX_REPORTED_ERRORS,
+)
@@ -0,0 +1,281 @@
+"""
+In-memory typeahead index of active patients for the Command Palette.
+
+Each patient contributes accent-folded name words plus the digits of its CI
+and phone. Name words are matched by prefix; CI and phone numbers are also
+indexed by their trailing digits so a partial number typed from the end
+still matches. Keys live in one sorted list, so a prefix lookup is a pair of
+binary searches and a query never touches the database.
+
+The index is built at startup, updated in place by the patient endpoints of
+this process, and caught up with changes made by other workers by re-reading
+rows whose ``updated_at`` is past the last seen watermark.
+"""
+import logging
+import sys
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.patient import Patient
+
+logger = logging.getLogger(__name__)
+
+# Shortest trailing-digit fragment of a CI or phone number that is indexed
+MIN_NUMBER_SUFFIX = 3
+
+# Rough per-key overhead of a (str, int) tuple inside the sorted list
+_KEY_OVERHEAD = sys.getsizeof(("", 0)) + sys.getsizeof(0) + 8
+
+
+def fold(value: Optional[str]) -> str:
+    """Lowercase and strip accents (``"Peña Núñez"`` -> ``"pena nunez"``)."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def _words(value: Optional[str]) -> List[str]:
+    return "".join(c if c.isalnum() else " " for c in fold(value)).split()
+
+
+def _digits(value: Optional[str]) -> str:
+    return "".join(c for c in value or "" if c.isdigit())
+
+
+@dataclass(frozen=True)
+class IndexedPatient:
+    """Fields returned by the typeahead plus the keys the patient is indexed under."""
+    id: int
+    full_name: str
+    ci: str
+    phone: Optional[str]
+    keys: Tuple[str, ...]
+
+    @classmethod
+    def from_patient(cls, patient: Patient) -> "IndexedPatient":
+        keys = set(_words(patient.first_name)) | set(_words(patient.last_name))
+        for number in (_digits(patient.ci), _digits(patient.phone)):
+            keys.update(number[i:] for i in range(len(number) - MIN_NUMBER_SUFFIX + 1))
+            if number:
+                keys.add(number)
+        keys.update(_words(patient.ci))
+        return cls(
+            id=patient.id,
+            full_name=patient.full_name,
+            ci=patient.ci,
+            phone=patient.phone,
+            keys=tuple(sorted(keys)),
+        )
+
+    @property
+    def size(self) -> int:
+        """Approximate memory used by this entry and its keys, in bytes."""
+        total = sys.getsizeof(self.full_name) + sys.getsizeof(self.ci) + sys.getsizeof(self.phone or "")
+        return total + sum(sys.getsizeof(key) + _KEY_OVERHEAD for key in self.keys)
+
+
+class PatientTypeaheadIndex:
+    """Thread-safe prefix index over active patients."""
+
+    def __init__(self, max_bytes: int, refresh_interval: float):
+        self.max_bytes = max_bytes
+        self.refresh_interval = refresh_interval
+        self._entries: Dict[int, IndexedPatient] = {}
+        self._keys: List[Tuple[str, int]] = []
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._ready = False
+        self._watermark: Optional[datetime] = None
+        self._last_refresh = 0.0
+
+    @property
+    def ready(self) -> bool:
+        """True once the index has been built and fits its memory budget."""
+        return self._ready
+
+    @property
+    def size_bytes(self) -> int:
+        """Approximate memory used by the index."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def build(self, session_factory: Callable[[], Session]) -> None:
+        """
+        Load every active patient into a fresh index.
+
+        If the index would exceed its memory budget it stays disabled and
+        searches fall back to the database.
+
+        Args:
+            session_factory: Callable returning a new database session
+        """
+        db = session_factory()
+        try:
+            watermark = db.query(func.max(Patient.updated_at)).scalar()
+            entries: Dict[int, IndexedPatient] = {}
+            keys: List[Tuple[str, int]] = []
+            total = 0
+            for patient in db.query(Patient).filter(Patient.deleted_at.is_(None)).yield_per(1000):
+                entry = IndexedPatient.from_patient(patient)
+                entries[entry.id] = entry
+                keys.extend((key, entry.id) for key in entry.keys)
+                total += entry.size
+                if total > self.max_bytes:
+                    logger.warning(
+                        "Patient typeahead index exceeds its %s MB budget; using database search",
+                        self.max_bytes // (1024 * 1024),
+                    )
+                    with self._lock:
+                        self._clear()
+                    return
+        finally:
+            db.close()
+
+        keys.sort()
+        with self._lock:
+            self._entries, self._keys, self._bytes = entries, keys, total
+            self._watermark = watermark
+            self._last_refresh = time.monotonic()
+            self._ready = True
+        logger.info("Patient typeahead index built: %s patients, ~%s KB", len(entries), total // 1024)
+
+    def refresh_if_stale(self, db: Session) -> None:
+        """
+        Pick up patients changed by other workers since the last refresh.
+
+        Rows are re-read from slightly before the watermark so writes from
+        processes with a skewed clock are not missed; upserts are idempotent.
+
+        Args:
+            db: Database session
+        """
+        if not self._ready or time.monotonic() - self._last_refresh < self.refresh_interval:
+            return
+        self._last_refresh = time.monotonic()
+
+        query = db.query(Patient)
+        if self._watermark is not None:
+            overlap = timedelta(seconds=max(self.refresh_interval, 1.0))
+            query = query.filter(Patient.updated_at >= self._watermark - overlap)
+
+        watermark = self._watermark
+        changed = query.all()
+        for patient in changed:
+            self.upsert(patient)
+            if watermark is None or patient.updated_at > watermark:
+                watermark = patient.updated_at
+        self._watermark = watermark
+
+    def upsert(self, patient: Patient) -> None:
+        """Add or replace a patient (soft-deleted patients are removed)."""
+        if not self._ready:
+            return
+        if patient.deleted_at is not None:
+            self.remove(patient.id)
+            return
+        entry = IndexedPatient.from_patient(patient)
+        with self._lock:
+            current = self._entries.get(patient.id)
+            if current == entry:
+                return
+            if current is not None:
+                self._discard(current)
+            if self._bytes + entry.size > self.max_bytes:
+                logger.warning("Patient typeahead index is over budget; using database search")
+                self._clear()
+                return
+            self._add(entry)
+
+    def remove(self, patient_id: int) -> None:
+        """Drop a patient from the index."""
+        with self._lock:
+            entry = self._entries.get(patient_id)
+            if entry is not None:
+                self._discard(entry)
+
+    def clear(self) -> None:
+        """Drop the index; searches use the database until it is rebuilt."""
+        with self._lock:
+            self._clear()
+
+    def search(self, query: str, limit: int = 10) -> List[IndexedPatient]:
+        """
+        Find patients whose keys start with every term of the query.
+
+        Args:
+            query: Text typed by the user
+            limit: Maximum number of results
+
+        Returns:
+            Matching patients, exact CI matches first, then by name
+        """
+        terms = _words(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            # Seed candidates from the term with the fewest matching keys, verify the rest per entry
+            ranges = [(self._prefix_range(term), term) for term in terms]
+            (start, end), seed = min(ranges, key=lambda r: r[0][1] - r[0][0])
+            if start == end:
+                return []
+            candidate_ids = {self._keys[i][1] for i in range(start, end)}
+            others = [term for _, term in ranges if term != seed]
+            matches = [
+                self._entries[patient_id]
+                for patient_id in candidate_ids
+                if all(any(key.startswith(term) for key in self._entries[patient_id].keys) for term in others)
+            ]
+
+        folded_query = fold(query).strip()
+        matches.sort(key=lambda entry: (
+            entry.ci != query.strip(),
+            not fold(entry.full_name).startswith(folded_query),
+            fold(entry.full_name),
+            entry.id,
+        ))
+        return matches[:limit]
+
+    def _prefix_range(self, prefix: str) -> Tuple[int, int]:
+        start = bisect_left(self._keys, (prefix, -1))
+        end = bisect_left(self._keys, (prefix + "\U0010ffff", -1), lo=start)
+        return start, end
+
+    def _add(self, entry: IndexedPatient) -> None:
+        self._entries[entry.id] = entry
+        for key in entry.keys:
+            insort(self._keys, (key, entry.id))
+        self._bytes += entry.size
+
+    def _discard(self, entry: IndexedPatient) -> None:
+        del self._entries[entry.id]
+        for key in entry.keys:
+            position = bisect_left(self._keys, (key, entry.id))
+            if position < len(self._keys) and self._keys[position] == (key, entry.id):
+                del self._keys[position]
+        self._bytes -= entry.size
+
+    def _clear(self) -> None:
+        self._entries = {}
+        self._keys = []
+        self._bytes = 0
+        self._ready = False
+
+
+# Global instance
+patient_index = PatientTypeaheadIndex(
+    max_bytes=settings.PATIENT_INDEX_MEMORY_MB * 1024 * 1024,
+    refresh_interval=settings.PATIENT_INDEX_REFRESH_SECONDS,
+)
@@ -0,0 +1,146 @@
+"""
+Ranked patient search backed by the database's text-search index.
+
+The backend is chosen from the session's dialect: PostgreSQL uses pg_trgm
+word similarity over accent-folded names, SQLite uses the FTS5 table defined
+in app.db.patient_search_ddl, and any other database falls back to LIKE.
+"""
+import re
+from typing import List
+
+from sqlalchemy import String, case, func, literal_column, or_, text
+from sqlalchemy.orm import Session
+
+from app.models.patient import Patient
+
+# FTS5 tokens: letters and digits, everything else separates terms
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class PatientSearchService:
+    """Search non-deleted patients by name or CI, best matches first."""
+
+    def search(self, db: Session, query: str, limit: int = 10) -> List[Patient]:
+        """
+        Search patients by name or CI.
+
+        Args:
+            db: Database session
+            query: Free-text search term
+            limit: Maximum number of patients to return
+
+        Returns:
+            Matching patients ordered by relevance
+        """
+        query = query.strip()
+        if not query:
+            return []
+
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            return self._search_postgres(db, query, limit)
+        if dialect == "sqlite":
+            return self._search_sqlite(db, query, limit)
+        return self._search_like(db, query, limit)
+
+    def _search_postgres(self, db: Session, query: str, limit: int) -> List[Patient]:
+        """Trigram word-similarity search served by the GIN indexes."""
+        # Must match the ix_patients_name_trgm expression exactly (literal space, not a bind)
+        full_name = Patient.first_name + literal_column("' '", String) + Patient.last_name
+        name = func.f_unaccent(func.lower(full_name), type_=String)
+        term = func.f_unaccent(func.lower(query), type_=String)
+        like_term = func.f_unaccent(func.lower(_escape_like(query)), type_=String)
+        return (
+            db.query(Patient)
+            .filter(Patient.deleted_at.is_(None))
+            .filter(or_(
+                term.op("<%")(name),
+                name.like("%" + like_term + "%", escape="\\"),
+                # ix_patients_ci_trgm serves substring matches, e.g. the end of a CI
+                Patient.ci.like(f"%{_escape_like(query)}%", escape="\\"),
+            ))
+            .order_by(
+                case((Patient.ci == query, 0), else_=1),
+                func.word_similarity(term, name).desc(),
+                Patient.id,
+            )
+            .limit(limit)
+            .all()
+        )
+
+    def _search_sqlite(self, db: Session, query: str, limit: int) -> List[Patient]:
+        """
+        FTS5 prefix search ranked by bm25 (CI matches weigh more than names).
+
+        FTS5 only matches token prefixes, so digit-only queries also look for
+        the digits anywhere in the CI (e.g. the last digits of the number),
+        after the indexed matches.
+        """
+        match = _fts_match_expression(query)
+        if match is None:
+            return []
+
+        rows = db.execute(
+            text(
+                "SELECT patients.id FROM patients_fts "
+                "JOIN patients ON patients.id = patients_fts.rowid "
+                "WHERE patients_fts MATCH :match AND patients.deleted_at IS NULL "
+                "ORDER BY bm25(patients_fts, 1.0, 1.0, 2.0), patients.id "
+                "LIMIT :limit"
+            ),
+            {"match": match, "limit": limit},
+        ).all()
+        ids = [row[0] for row in rows]
+        if query.isdigit() and len(ids) < limit:
+            rows = db.execute(
+                text(
+                    "SELECT id FROM patients "
+                    "WHERE ci LIKE :term ESCAPE '\\' AND deleted_at IS NULL "
+                    "ORDER BY ci, id "
+                    "LIMIT :limit"
+                ),
+                {"term": f"%{_escape_like(query)}%", "limit": limit},
+            ).all()
+            seen = set(ids)
+            ids += [row[0] for row in rows if row[0] not in seen][:limit - len(ids)]
+        if not ids:
+            return []
+
+        patients = {p.id: p for p in db.query(Patient).filter(Patient.id.in_(ids))}
+        return [patients[patient_id] for patient_id in ids if patient_id in patients]
+
+    def _search_like(self, db: Session, query: str, limit: int) -> List[Patient]:
+        """Unindexed substring search for databases without a search backend."""
+        pattern = f"%{_escape_like(query.lower())}%"
+        return (
+            db.query(Patient)
+            .filter(Patient.deleted_at.is_(None))
+            .filter(or_(
+                Patient.first_name.ilike(pattern, escape="\\"),
+                Patient.last_name.ilike(pattern, escape="\\"),
+                Patient.ci.like(pattern, escape="\\"),
+            ))
+            .order_by(Patient.last_name, Patient.first_name, Patient.id)
+            .limit(limit)
+            .all()
+        )
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _fts_match_expression(query: str):
+    """
+    Turn user input into an FTS5 query: every term must match as a prefix.
+
+    Terms are quoted so FTS5 operators typed by the user are treated as text.
+    """
+    tokens = _TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+# Global instance
+patient_search = PatientSearchService()
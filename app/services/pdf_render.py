@@ -0,0 +1,216 @@
+"""
+Out-of-process PDF rendering engine backed by warm WeasyPrint workers.
+
+WeasyPrint rendering is CPU bound and holds the GIL for the whole layout, so
+renders are dispatched to a process pool whose workers import WeasyPrint (and
+the Pango/Cairo stack) once at startup. The engine bounds the number of
+in-flight renders and applies a per-render timeout so PDF bursts cannot starve
+the rest of the API. A render counts as in flight until its worker is really
+done with it, and a render that times out while running gets its pool
+replaced (the stuck worker process is terminated), so a hung layout never
+holds a worker for good.
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+WARMUP_HTML = "<html><body><h1>Warm-up</h1></body></html>"
+
+
+class RenderError(Exception):
+    """Base error raised by the render engine."""
+
+
+class RenderSaturatedError(RenderError):
+    """Raised when the render queue is full and the request must be rejected."""
+
+
+class RenderTimeoutError(RenderError):
+    """Raised when a render does not finish within the configured timeout."""
+
+
+def _warm_worker() -> None:
+    """Process pool initializer: load WeasyPrint and render a tiny document."""
+    from weasyprint import HTML
+
+    HTML(string=WARMUP_HTML).write_pdf()
+
+
+def _ping() -> bool:
+    """No-op task used to force worker processes to start."""
+    return True
+
+
+def render_pdf(html_content: str) -> bytes:
+    """
+    Render HTML to PDF bytes in the current process.
+
+    Args:
+        html_content: Complete HTML document
+
+    Returns:
+        PDF content as bytes
+    """
+    from weasyprint import HTML
+
+    pdf_file = BytesIO()
+    HTML(string=html_content).write_pdf(pdf_file)
+    return pdf_file.getvalue()
+
+
+class PDFRenderEngine:
+    """
+    Bounded, asynchronous front-end for a pool of PDF render workers.
+
+    With ``workers > 0`` renders run in a process pool (spawned, so workers do
+    not inherit the server's threads or sockets). With ``workers == 0`` renders
+    run in a small thread pool inside the API process, which is useful for
+    development and tests.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int,
+        timeout: float,
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of renders allowed in flight (running + queued)."""
+        return max(self.workers, 1) + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        """Number of renders currently running or queued."""
+        return self._in_flight
+
+    def _create_executor(self) -> Executor:
+        if self.workers <= 0:
+            return ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-render")
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+        )
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            return self._executor
+
+    def _reset_executor(self, broken: Executor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _recycle_executor(self, stuck: Executor) -> None:
+        """Replace a pool whose worker is stuck on a timed-out render."""
+        with self._lock:
+            if self._executor is stuck:
+                self._executor = None
+        # A running task cannot be cancelled; terminating its worker fails it
+        # (and whatever else the old pool still had) with BrokenProcessPool
+        processes = list((getattr(stuck, "_processes", None) or {}).values())
+        for process in processes:
+            process.terminate()
+        stuck.shutdown(wait=False)
+
+    def start(self) -> None:
+        """Start the pool and warm every worker so the first render is fast."""
+        executor = self._get_executor()
+        if self.workers > 0:
+            try:
+                futures = [executor.submit(_ping) for _ in range(self.workers)]
+                for future in futures:
+                    future.result()
+            except BrokenProcessPool:
+                self._reset_executor(executor)
+                raise
+        logger.info("PDF render engine started (workers=%s, max_queue=%s)", self.workers, self.max_queue)
+
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _acquire_slot(self) -> None:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                raise RenderSaturatedError(
+                    f"PDF render queue is full ({self._in_flight}/{self.capacity})"
+                )
+            self._in_flight += 1
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def render(self, html_content: str) -> bytes:
+        """
+        Render HTML to PDF in a worker without blocking the event loop.
+
+        Args:
+            html_content: Complete HTML document
+
+        Returns:
+            PDF content as bytes
+
+        Raises:
+            RenderSaturatedError: If too many renders are already in flight
+            RenderTimeoutError: If the render exceeds the configured timeout
+        """
+        self._acquire_slot()
+        try:
+            executor = self._get_executor()
+            future = executor.submit(render_pdf, html_content)
+        except BrokenProcessPool as exc:
+            self._release_slot()
+            self._reset_executor(executor)
+            raise RenderSaturatedError("PDF render workers are restarting") from exc
+        except BaseException:
+            self._release_slot()
+            raise
+        # The slot is held until the worker is done, not until the caller stops waiting
+        future.add_done_callback(lambda _: self._release_slot())
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError as exc:
+            if not future.cancel():
+                logger.warning("PDF render exceeded %.1fs while running; recycling the worker pool", self.timeout)
+                self._recycle_executor(executor)
+            raise RenderTimeoutError(
+                f"PDF render exceeded {self.timeout:.1f}s timeout"
+            ) from exc
+        except BrokenProcessPool as exc:
+            logger.error("PDF render worker pool broke, recreating: %s", exc)
+            self._reset_executor(executor)
+            raise RenderSaturatedError("PDF render workers are restarting") from exc
+
+
+# Global instance
+render_engine = PDFRenderEngine(
+    workers=settings.PDF_RENDER_WORKERS,
+    max_queue=settings.PDF_RENDER_MAX_QUEUE,
+    timeout=settings.PDF_RENDER_TIMEOUT_SECONDS,
+)
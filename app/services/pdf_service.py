@@ -1,62 +1,270 @@
 """
 PDF generation service using WeasyPrint and Jinja2.
+
+Neither library is imported at module load: Jinja2 is loaded on the first
+template render and WeasyPrint only inside the render workers
+(app.services.pdf_render), so importing the API does not pull in the
+Pango/Cairo stack.
 """
 import hashlib
+import logging
 import os
+import re
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from io import BytesIO
 from pathlib import Path
-from typing import Optional
-from jinja2 import Environment, FileSystemLoader
-from weasyprint import HTML
+from typing import Dict, Iterator, Optional
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.principal_cache import Principal
 from app.models.patient import Patient
-from app.models.user import User
 from app.models.document import Document, DocumentType
+from app.services.blob_store import blob_store
+from app.services.storage_backends import StoredObject
+from app.services.pdf_render import render_engine
+
+logger = logging.getLogger(__name__)
+
+# Bump when the render pipeline changes in a way that alters output for the same HTML
+RENDER_CACHE_VERSION = "1"
+
+# Local files the HTML pulls in (e.g. the clinic logo); they are part of the render cache key
+_FILE_URL_RE = re.compile(r"""file://([^"'\s)]+)""")
+
+# Maximum number of "verified at mtime/size" records kept in memory
+VERIFIED_CACHE_MAX_ENTRIES = 4096
+
+
+class DocumentIntegrityError(Exception):
+    """Raised when a stored document does not match its recorded hash."""
+
+
+class DocumentStream:
+    """
+    Single-pass reader over a stored document.
+
+    Files that have not been verified at their current mtime/size are hashed
+    chunk by chunk as they are streamed. The last chunk is held back until
+    the digest matches, so a tampered file is never sent complete: a mismatch
+    raises before it, which aborts the response short of its Content-Length.
+    """
+
+    def __init__(self, service: "PDFService", document: Document, stored: StoredObject, verified: bool):
+        self._service = service
+        self.stored = stored
+        self.size = stored.size
+        self.verified = verified
+        self.expected_hash = document.file_hash
+        self.document_id = document.id
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self.verified:
+            yield from self.stored.iter_bytes()
+            return
+
+        hasher = hashlib.sha256()
+        held_back = None
+        for chunk in self.stored.iter_bytes():
+            hasher.update(chunk)
+            if held_back is not None:
+                yield held_back
+            held_back = chunk
+
+        if hasher.hexdigest() != self.expected_hash:
+            logger.error("Integrity check failed while streaming document %s (%s)", self.document_id, self.stored.uri)
+            raise DocumentIntegrityError(f"Document {self.document_id} failed integrity verification")
+        self._service._mark_verified(self.stored, self.expected_hash)
+        if held_back is not None:
+            yield held_back
+
+    def iter_range(self, start: int, end: int) -> Iterator[bytes]:
+        """Read an inclusive byte range without hashing; verify the file first."""
+        return self.stored.iter_bytes(start, end)
+
+
+class PDFRenderCache:
+    """
+    Content-addressed cache of rendered PDFs.
+
+    Entries are keyed by a fingerprint of the rendered HTML and of the size
+    and mtime of the local files it references (``file://`` URLs such as the
+    clinic logo), so any change to the patient row, the template, the clinic
+    settings or a replaced logo produces a new key and stale entries simply
+    age out. A bounded in-memory LRU tier sits in
+    front of an on-disk tier; both evict by total size.
+    """
+
+    def __init__(self, cache_dir: Path, memory_max_bytes: int, disk_max_bytes: int):
+        self.cache_dir = cache_dir
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def fingerprint(html_content: str) -> str:
+        """Return the cache key for a rendered HTML document and the files it loads."""
+        digest = hashlib.sha256(RENDER_CACHE_VERSION.encode("utf-8"))
+        digest.update(html_content.encode("utf-8"))
+        for path in sorted(set(_FILE_URL_RE.findall(html_content))):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            digest.update(f"\0{path}\0{stat.st_size}\0{stat.st_mtime_ns}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pdf"
+
+    def _remember(self, key: str, pdf_bytes: bytes) -> None:
+        """Insert into the memory tier; caller must hold the lock."""
+        if len(pdf_bytes) > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = pdf_bytes
+        self._memory_bytes += len(pdf_bytes)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.evictions += 1
+
+    def get_from_memory(self, key: str) -> Optional[bytes]:
+        """Look up the memory tier only (never touches disk)."""
+        with self._lock:
+            pdf_bytes = self._memory.get(key)
+            if pdf_bytes is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+            return pdf_bytes
+
+    def get_from_disk(self, key: str) -> Optional[bytes]:
+        """Look up the disk tier, promoting hits into memory."""
+        path = self._disk_path(key)
+        try:
+            pdf_bytes = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, pdf_bytes)
+        return pdf_bytes
+
+    def put(self, key: str, pdf_bytes: bytes) -> None:
+        """Store a rendered PDF in both tiers."""
+        with self._lock:
+            self._remember(key, pdf_bytes)
+
+        if len(pdf_bytes) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(pdf_bytes)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Could not write PDF render cache entry %s: %s", key, exc)
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += len(pdf_bytes)
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.cache_dir.glob("*/*.pdf"))
+
+    def _evict_disk(self) -> None:
+        """Remove least recently used files until under budget; caller must hold the lock."""
+        entries = []
+        for path in self.cache_dir.glob("*/*.pdf"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        # Evict down to 90% of the budget so we don't rescan on every write
+        target = int(self.disk_max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._disk_bytes = total
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and tier sizes."""
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes or 0,
+            }
 
 
 class PDFService:
     """Service for generating and managing PDF documents."""
 
     def __init__(self):
-        """Initialize PDF service with Jinja2 template environment."""
-        template_dir = Path(__file__).parent.parent / "templates"
-        self.env = Environment(loader=FileSystemLoader(str(template_dir)))
+        """Initialize PDF service (the Jinja2 environment is created on first render)."""
+        self.template_dir = Path(__file__).parent.parent / "templates"
+        self._env = None
 
         # Ensure storage directory exists
         self.storage_path = Path(settings.DOCUMENTS_STORAGE_PATH)
         self.storage_path.mkdir(parents=True, exist_ok=True)
 
-    def _calculate_hash(self, pdf_bytes: bytes) -> str:
-        """Calculate SHA256 hash of PDF content."""
-        return hashlib.sha256(pdf_bytes).hexdigest()
-
-    def _save_pdf(self, pdf_bytes: bytes, filename: str) -> str:
-        """
-        Save PDF to storage and return relative path.
+        self.render_cache = PDFRenderCache(
+            cache_dir=self.storage_path / ".render_cache",
+            memory_max_bytes=settings.PDF_CACHE_MEMORY_MB * 1024 * 1024,
+            disk_max_bytes=settings.PDF_CACHE_DISK_MB * 1024 * 1024,
+        )
 
-        Args:
-            pdf_bytes: PDF content as bytes
-            filename: Filename to use
+        # uri -> (mtime_ns, size, file_hash) of files whose hash was verified
+        self._verified: "OrderedDict[str, tuple[int, int, str]]" = OrderedDict()
+        self._verified_lock = threading.Lock()
 
-        Returns:
-            Relative path to saved file
-        """
-        # Create subdirectory by date for organization
-        date_dir = datetime.now().strftime("%Y/%m")
-        full_dir = self.storage_path / date_dir
-        full_dir.mkdir(parents=True, exist_ok=True)
+    @property
+    def env(self):
+        """Jinja2 environment, imported and built on first use to keep app start-up light."""
+        if self._env is None:
+            from jinja2 import Environment, FileSystemLoader
 
-        # Full path to file
-        file_path = full_dir / filename
+            self._env = Environment(loader=FileSystemLoader(str(self.template_dir)))
+        return self._env
 
-        # Save file
-        with open(file_path, "wb") as f:
-            f.write(pdf_bytes)
-
-        # Return relative path
-        return os.path.join(date_dir, filename)
+    def _calculate_hash(self, pdf_bytes: bytes) -> str:
+        """Calculate SHA256 hash of PDF content."""
+        return hashlib.sha256(pdf_bytes).hexdigest()
 
     def _render_patient_card_html(self, patient: Patient) -> str:
         """
@@ -83,16 +291,43 @@ class PDFService:
             logo_path=logo_path
         )
 
-    def generate_patient_card(
+    async def _render_pdf_cached(self, html_content: str) -> bytes:
+        """
+        Render HTML to PDF, serving identical documents from the render cache.
+
+        Args:
+            html_content: Complete HTML document
+
+        Returns:
+            PDF content as bytes
+        """
+        if not settings.PDF_CACHE_ENABLED:
+            return await render_engine.render(html_content)
+
+        key = self.render_cache.fingerprint(html_content)
+        pdf_bytes = self.render_cache.get_from_memory(key)
+        if pdf_bytes is None:
+            pdf_bytes = await run_in_threadpool(self.render_cache.get_from_disk, key)
+        if pdf_bytes is not None:
+            return pdf_bytes
+
+        pdf_bytes = await render_engine.render(html_content)
+        await run_in_threadpool(self.render_cache.put, key, pdf_bytes)
+        return pdf_bytes
+
+    async def generate_patient_card(
         self,
         db: Session,
         patient: Patient,
-        user: User,
+        user: Principal,
         save_to_db: bool = True
     ) -> tuple[bytes, Optional[Document]]:
         """
         Generate a PDF patient card.
 
+        The PDF is rendered by the out-of-process render engine; storing the
+        file and the document record runs in the threadpool.
+
         Args:
             db: Database session
             patient: Patient model instance
@@ -101,34 +336,58 @@ class PDFService:
 
         Returns:
             Tuple of (PDF bytes, Document instance if saved)
+
+        Raises:
+            RenderSaturatedError: If the render queue is full
+            RenderTimeoutError: If the render exceeds its timeout
         """
         # Render HTML
         html_content = self._render_patient_card_html(patient)
 
-        # Generate PDF
-        pdf_file = BytesIO()
-        HTML(string=html_content).write_pdf(pdf_file)
-        pdf_bytes = pdf_file.getvalue()
+        # Generate PDF (or reuse an identical earlier render)
+        pdf_bytes = await self._render_pdf_cached(html_content)
 
         # If not saving to DB, return just the bytes
         if not save_to_db:
             return pdf_bytes, None
 
+        document = await run_in_threadpool(self._store_patient_card, db, patient, user, pdf_bytes)
+        return pdf_bytes, document
+
+    def _store_patient_card(
+        self,
+        db: Session,
+        patient: Patient,
+        user: Principal,
+        pdf_bytes: bytes
+    ) -> Document:
+        """
+        Save a rendered patient card to storage and create its document record.
+
+        Args:
+            db: Database session
+            patient: Patient model instance
+            user: User generating the document
+            pdf_bytes: Rendered PDF content
+
+        Returns:
+            Created Document instance
+        """
         # Calculate hash
         file_hash = self._calculate_hash(pdf_bytes)
 
         # Generate filename
         filename = f"ficha_paciente_{patient.ci}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
 
-        # Save PDF to storage
-        relative_path = self._save_pdf(pdf_bytes, filename)
+        # Save PDF to storage (an identical earlier card shares its blob)
+        reference = blob_store.put_bytes(db, pdf_bytes, file_hash)
 
         # Create document record
         document = Document(
             document_type=DocumentType.PATIENT_CARD,
             patient_id=patient.id,
             created_by=user.id,
-            pdf_path=relative_path,
+            pdf_path=reference,
             file_hash=file_hash,
             file_size=len(pdf_bytes),
             filename=filename,
@@ -139,7 +398,7 @@ class PDFService:
         db.commit()
         db.refresh(document)
 
-        return pdf_bytes, document
+        return document
 
     def get_document_bytes(self, document: Document) -> Optional[bytes]:
         """
@@ -151,13 +410,54 @@ class PDFService:
         Returns:
             PDF bytes or None if not found
         """
-        file_path = self.storage_path / document.pdf_path
+        stored = blob_store.open(document.pdf_path, self.storage_path)
+        if stored is None:
+            return None
+        return b"".join(stored.iter_bytes())
+
+    def _is_verified(self, stored: StoredObject, file_hash: str) -> bool:
+        """Return True if the file was verified and has not changed since."""
+        if not settings.DOCUMENT_VERIFY_CACHE_ENABLED:
+            return False
+        with self._verified_lock:
+            record = self._verified.get(stored.uri)
+            if record is None:
+                return False
+            self._verified.move_to_end(stored.uri)
+            return record == (stored.mtime_ns, stored.size, file_hash)
+
+    def _mark_verified(self, stored: StoredObject, file_hash: str) -> None:
+        """Remember that a file matched its hash at the given mtime/size."""
+        if not settings.DOCUMENT_VERIFY_CACHE_ENABLED:
+            return
+        with self._verified_lock:
+            self._verified[stored.uri] = (stored.mtime_ns, stored.size, file_hash)
+            self._verified.move_to_end(stored.uri)
+            while len(self._verified) > VERIFIED_CACHE_MAX_ENTRIES:
+                self._verified.popitem(last=False)
+
+    def open_document_stream(self, document: Document) -> Optional[DocumentStream]:
+        """
+        Open a stored document for streaming with integrity verification.
+
+        Args:
+            document: Document instance
 
-        if not file_path.exists():
+        Returns:
+            DocumentStream or None if the file is not in storage
+
+        Raises:
+            DocumentIntegrityError: If the file size does not match the record
+        """
+        stored = blob_store.open(document.pdf_path, self.storage_path)
+        if stored is None:
             return None
 
-        with open(file_path, "rb") as f:
-            return f.read()
+        if stored.size != document.file_size:
+            raise DocumentIntegrityError(f"Document {document.id} size does not match its record")
+
+        verified = self._is_verified(stored, document.file_hash)
+        return DocumentStream(self, document, stored, verified)
 
     def verify_document_integrity(self, document: Document) -> bool:
         """
@@ -169,13 +469,15 @@ class PDFService:
         Returns:
             True if hash matches, False otherwise
         """
-        pdf_bytes = self.get_document_bytes(document)
-
-        if pdf_bytes is None:
+        try:
+            stream = self.open_document_stream(document)
+            if stream is None:
+                return False
+            for _ in stream:
+                pass
+        except DocumentIntegrityError:
             return False
-
-        current_hash = self._calculate_hash(pdf_bytes)
-        return current_hash == document.file_hash
+        return True
 
 
 # Global instance
@@ -0,0 +1,313 @@
+"""
+Resumable (tus-style) attachment uploads.
+
+A client creates an upload session with the total length, then sends the
+bytes in one or more PATCH requests, each starting at the offset the server
+reports (HEAD). Every byte that arrives is written to a staged file and the
+offset is saved even when the connection drops half way, so a retry resumes
+where the link failed instead of starting again. When the last byte arrives
+the staged file is hashed, linked into the blob store and the attachment row
+is created in the same transaction that records it on the session; the
+staged file is only removed once that is committed, so if it fails an empty
+PATCH at the final offset retries the assembly.
+
+Sessions expire ``RESUMABLE_UPLOAD_EXPIRY_HOURS`` after their last PATCH;
+expired sessions and their staged files are purged periodically when new
+sessions are created.
+
+A PATCH first claims the session in the database: a compare-and-set on the
+expected offset takes a lease (``lease_token`` / ``leased_until``) that is
+renewed while bytes arrive and released when the request ends, so only one
+request on any worker writes an upload at a time. A lease left by a worker
+that died expires after ``RESUMABLE_UPLOAD_LEASE_SECONDS``.
+"""
+import logging
+import secrets
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.models.attachment import Attachment, AttachmentType
+from app.models.upload_session import UploadSession
+from app.services.attachment_storage import AttachmentStorage, StoredUpload, UploadTooLargeError, attachment_storage
+
+logger = logging.getLogger(__name__)
+
+
+class UploadBusyError(Exception):
+    """Raised when another request holds (or took over) the lease of an upload."""
+
+
+class UploadLengthExceededError(Exception):
+    """Raised when a PATCH body goes past the declared upload length."""
+
+
+class ResumableUploads:
+    """Stage resumable uploads and assemble them into attachment storage."""
+
+    def __init__(
+        self,
+        staging_dir: Path,
+        storage: AttachmentStorage,
+        expiry: timedelta,
+        purge_interval: float,
+        lease: timedelta,
+    ):
+        self.staging_dir = staging_dir
+        self.storage = storage
+        self.expiry = expiry
+        self.purge_interval = purge_interval
+        self.lease = lease
+        self._last_purge = 0.0
+
+    def staged_path(self, upload_id: str) -> Path:
+        """Path of the partial file of an upload."""
+        return self.staging_dir / f"{upload_id}.part"
+
+    def create(
+        self,
+        db: Session,
+        user_id: int,
+        patient_id: int,
+        encounter_id: Optional[int],
+        attachment_type: AttachmentType,
+        original_filename: Optional[str],
+        mime_type: Optional[str],
+        length: int,
+    ) -> UploadSession:
+        """
+        Start an upload session with an empty staged file.
+
+        Args:
+            db: Database session
+            user_id: Uploading user
+            patient_id: Patient the attachment belongs to
+            encounter_id: Optional encounter of the same patient
+            attachment_type: Type of the finished attachment
+            original_filename: Client filename
+            mime_type: Client content type
+            length: Total size in bytes
+
+        Returns:
+            The new upload session
+
+        Raises:
+            UploadTooLargeError: If ``length`` exceeds the attachment size limit
+        """
+        if length > self.storage.max_bytes:
+            raise UploadTooLargeError(self.storage.max_bytes)
+        self.purge_if_due(db)
+
+        upload = UploadSession(
+            id=secrets.token_hex(16),
+            patient_id=patient_id,
+            encounter_id=encounter_id,
+            attachment_type=attachment_type,
+            original_filename=original_filename,
+            mime_type=mime_type,
+            created_by=user_id,
+            length=length,
+            offset=0,
+            expires_at=datetime.utcnow() + self.expiry,
+        )
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        self.staged_path(upload.id).touch()
+        db.add(upload)
+        db.commit()
+        db.refresh(upload)
+        return upload
+
+    def claim(self, db: Session, upload: UploadSession, offset: int) -> str:
+        """
+        Take the lease of an unfinished upload whose saved offset is ``offset``.
+
+        Args:
+            db: Database session
+            upload: Session to write to
+            offset: Upload-Offset the request starts at
+
+        Returns:
+            Lease token to pass to ``append``, ``complete`` and ``release``
+
+        Raises:
+            UploadBusyError: If the offset moved, the upload completed or
+                another request holds an unexpired lease
+        """
+        token = secrets.token_hex(16)
+        now = datetime.utcnow()
+        claimed = db.query(UploadSession).filter(
+            UploadSession.id == upload.id,
+            UploadSession.offset == offset,
+            UploadSession.attachment_id.is_(None),
+            or_(UploadSession.leased_until.is_(None), UploadSession.leased_until < now)
+        ).update(
+            {UploadSession.lease_token: token, UploadSession.leased_until: now + self.lease},
+            synchronize_session=False
+        )
+        db.commit()
+        if not claimed:
+            raise UploadBusyError(upload.id)
+        db.refresh(upload)
+        return token
+
+    async def append(self, db: Session, upload: UploadSession, token: str, chunks: AsyncIterator[bytes]) -> int:
+        """
+        Write a PATCH body at the session's offset and save the new offset.
+
+        The offset is saved even if the body stops early (dropped connection)
+        or is longer than the declared length, so every byte written counts.
+
+        Args:
+            db: Database session
+            upload: Session claimed with ``token``
+            token: Lease token returned by ``claim``
+            chunks: Request body stream
+
+        Returns:
+            The new offset
+
+        Raises:
+            UploadBusyError: If the lease was lost (it expired and another request took it)
+            UploadLengthExceededError: If the body goes past the declared length
+        """
+        start = offset = upload.offset
+        renewed = time.monotonic()
+        handle = None
+        try:
+            handle = await run_in_threadpool(self.staged_path(upload.id).open, "r+b")
+            # Bytes past the saved offset are from a request that failed before saving it
+            await run_in_threadpool(handle.truncate, offset)
+            await run_in_threadpool(handle.seek, offset)
+            async for chunk in chunks:
+                if offset + len(chunk) > upload.length:
+                    raise UploadLengthExceededError(upload.id)
+                await run_in_threadpool(handle.write, chunk)
+                offset += len(chunk)
+                if time.monotonic() - renewed > self.lease.total_seconds() / 3:
+                    await run_in_threadpool(self._renew, db, upload, token)
+                    renewed = time.monotonic()
+        finally:
+            if handle is not None:
+                await run_in_threadpool(handle.close)
+            await run_in_threadpool(self._save_offset, db, upload, token, start, offset)
+        return offset
+
+    def complete(self, db: Session, upload: UploadSession, token: str, attachment: Attachment) -> None:
+        """
+        Point the upload at its (flushed, uncommitted) attachment and release the lease.
+
+        Runs in the attachment's transaction, so the attachment and the
+        finished upload are committed together.
+
+        Raises:
+            UploadBusyError: If the lease was lost; the caller rolls back
+        """
+        completed = db.query(UploadSession).filter(
+            UploadSession.id == upload.id,
+            UploadSession.lease_token == token,
+            UploadSession.attachment_id.is_(None)
+        ).update(
+            {
+                UploadSession.attachment_id: attachment.id,
+                UploadSession.lease_token: None,
+                UploadSession.leased_until: None,
+            },
+            synchronize_session=False
+        )
+        if not completed:
+            raise UploadBusyError(upload.id)
+
+    def release(self, db: Session, upload: UploadSession, token: str) -> None:
+        """Give up the lease, if still held, so the next PATCH can claim the upload."""
+        db.query(UploadSession).filter(
+            UploadSession.id == upload.id,
+            UploadSession.lease_token == token
+        ).update(
+            {UploadSession.lease_token: None, UploadSession.leased_until: None},
+            synchronize_session=False
+        )
+        db.commit()
+
+    def _renew(self, db: Session, upload: UploadSession, token: str) -> None:
+        renewed = db.query(UploadSession).filter(
+            UploadSession.id == upload.id,
+            UploadSession.lease_token == token
+        ).update(
+            {UploadSession.leased_until: datetime.utcnow() + self.lease},
+            synchronize_session=False
+        )
+        db.commit()
+        if not renewed:
+            raise UploadBusyError(upload.id)
+
+    def _save_offset(self, db: Session, upload: UploadSession, token: str, expected: int, offset: int) -> None:
+        # Compare-and-set: only the lease holder moves the offset, and only from where it started
+        saved = db.query(UploadSession).filter(
+            UploadSession.id == upload.id,
+            UploadSession.lease_token == token,
+            UploadSession.offset == expected
+        ).update(
+            {UploadSession.offset: offset, UploadSession.expires_at: datetime.utcnow() + self.expiry},
+            synchronize_session=False
+        )
+        db.commit()
+        db.refresh(upload)
+        if not saved:
+            logger.warning("Upload %s: lease lost before saving offset %s", upload.id, offset)
+            raise UploadBusyError(upload.id)
+
+    def assemble(self, upload: UploadSession) -> StoredUpload:
+        """Hash the complete staged file (blocking); it is recorded from where it is."""
+        return self.storage.hash_file(self.staged_path(upload.id))
+
+    def discard(self, db: Session, upload: UploadSession) -> None:
+        """Delete a session and its staged file."""
+        self.staged_path(upload.id).unlink(missing_ok=True)
+        db.delete(upload)
+        db.commit()
+
+    def purge_if_due(self, db: Session) -> int:
+        """Purge expired sessions at most once per ``purge_interval``."""
+        if time.monotonic() - self._last_purge < self.purge_interval:
+            return 0
+        self._last_purge = time.monotonic()
+        return self.purge_expired(db)
+
+    def purge_expired(self, db: Session) -> int:
+        """
+        Delete expired sessions and their staged files.
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of sessions deleted
+        """
+        now = datetime.utcnow()
+        expired = db.query(UploadSession).filter(
+            UploadSession.expires_at < now,
+            or_(UploadSession.leased_until.is_(None), UploadSession.leased_until < now)
+        ).all()
+        for upload in expired:
+            self.staged_path(upload.id).unlink(missing_ok=True)
+            db.delete(upload)
+        db.commit()
+        if expired:
+            logger.info("Purged %s expired upload sessions", len(expired))
+        return len(expired)
+
+
+# Global instance
+resumable_uploads = ResumableUploads(
+    staging_dir=Path(settings.RESUMABLE_UPLOAD_STAGING_PATH),
+    storage=attachment_storage,
+    expiry=timedelta(hours=settings.RESUMABLE_UPLOAD_EXPIRY_HOURS),
+    purge_interval=settings.RESUMABLE_UPLOAD_PURGE_INTERVAL_SECONDS,
+    lease=timedelta(seconds=settings.RESUMABLE_UPLOAD_LEASE_SECONDS),
+)
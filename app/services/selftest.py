@@ -0,0 +1,140 @@
+"""
+WeasyPrint startup self-test, run off the request path.
+
+The self-test renders a tiny document in a child interpreter. Running it in a
+subprocess keeps the Pango/GTK stderr noise (and any native crash) out of the
+API process and lets us capture that output through a pipe, so nothing has to
+wait for native writers to drain. A background thread drives the subprocess;
+the application serves traffic while it runs and reports the outcome through
+the readiness endpoint.
+"""
+import json
+import logging
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+uvicorn_logger = logging.getLogger("uvicorn.error")
+
+PENDING = "pending"
+RUNNING = "running"
+PASSED = "passed"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+_CHILD_SCRIPT = """
+import json
+from weasyprint import HTML
+pdf = HTML(string="<html><body><h1>Self-Test</h1></body></html>").write_pdf()
+print(json.dumps({"size": len(pdf), "header_ok": pdf.startswith(b"%PDF")}))
+"""
+
+WINDOWS_HINT = (
+    "Windows: Ensure MSYS2 mingw64 is installed at C:\\msys64\\mingw64\n"
+    "Run: python scripts/test_weasyprint_minimal.py for diagnostics"
+)
+
+
+class WeasyPrintSelfTest:
+    """Runs the WeasyPrint self-test once in the background and records the outcome."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.status = PENDING
+        self.detail: Optional[str] = None
+        self.duration_ms: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._done = threading.Event()
+
+    def skip(self) -> None:
+        """Mark the self-test as skipped (WEASYPRINT_SELFTEST disabled)."""
+        self.status = SKIPPED
+        self.detail = "disabled by WEASYPRINT_SELFTEST"
+        self._done.set()
+
+    def start(self, on_success=None) -> None:
+        """
+        Start the self-test in a background thread.
+
+        Args:
+            on_success: Optional callable run in the same thread after a pass
+        """
+        if self._thread is not None:
+            return
+        self.status = RUNNING
+        self._thread = threading.Thread(
+            target=self._run, args=(on_success,), name="weasyprint-selftest", daemon=True
+        )
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the self-test has finished; returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def run(self) -> None:
+        """Run the self-test in the calling thread and record the outcome."""
+        started = time.perf_counter()
+        try:
+            result = subprocess.run(
+                [sys.executable, "-c", _CHILD_SCRIPT],
+                capture_output=True,
+                text=True,
+                timeout=self.timeout,
+            )
+        except subprocess.TimeoutExpired:
+            self._finish(FAILED, f"self-test did not finish within {self.timeout:.0f}s", started)
+            return
+        except OSError as exc:
+            self._finish(FAILED, f"could not start self-test process: {exc}", started)
+            return
+
+        noise = result.stderr.strip()
+        if result.returncode != 0:
+            last_line = noise.splitlines()[-1] if noise else f"exit code {result.returncode}"
+            self._finish(FAILED, last_line, started, noise)
+            return
+
+        try:
+            report = json.loads(result.stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            self._finish(FAILED, "self-test produced no report", started, noise)
+            return
+        if not report.get("header_ok"):
+            self._finish(FAILED, "WeasyPrint generated invalid PDF (wrong header)", started, noise)
+            return
+        self._finish(PASSED, f"{report['size']} bytes", started, noise)
+
+    def _run(self, on_success) -> None:
+        self.run()
+        if self.status == PASSED and on_success is not None:
+            on_success()
+
+    def _finish(self, status: str, detail: str, started: float, noise: str = "") -> None:
+        self.duration_ms = (time.perf_counter() - started) * 1000
+        self.detail = detail
+        self.status = status
+        if noise:
+            logger.debug("WeasyPrint/GTK stderr captured during self-test:\n%s", noise)
+        if status == PASSED:
+            logger.info("WeasyPrint self-test PASSED (%s, %.0f ms)", detail, self.duration_ms)
+            uvicorn_logger.info("WeasyPrint self-test PASSED (%s, %.0f ms)", detail, self.duration_ms)
+        else:
+            logger.error("WeasyPrint self-test FAILED: %s\n%s", detail, WINDOWS_HINT)
+        self._done.set()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Self-test state for the readiness endpoint."""
+        return {
+            "status": self.status,
+            "detail": self.detail,
+            "duration_ms": round(self.duration_ms, 1) if self.duration_ms is not None else None,
+        }
+
+
+# Global instance
+weasyprint_selftest = WeasyPrintSelfTest(timeout=settings.WEASYPRINT_SELFTEST_TIMEOUT_SECONDS)
@@ -0,0 +1,251 @@
+"""
+Storage backends for the blob store.
+
+``LocalStorageBackend`` keeps objects under a directory on this node;
+``S3StorageBackend`` keeps them in an S3-compatible bucket (AWS S3, MinIO,
+...), so every API node behind a load balancer sees the same files and
+downloads can be redirected to presigned URLs instead of passing through the
+app workers. Both read and write in chunks; nothing is loaded whole into
+memory.
+
+Keys are ``/``-separated relative paths. boto3 is only needed for the S3
+backend and is imported when one is created.
+"""
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from app.core.config import settings
+from app.core.http_cache import iter_file
+
+# Read size when streaming objects from S3
+S3_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class StoredObject:
+    """An object in a storage backend, with what is needed to serve it."""
+    backend: "StorageBackend"
+    key: str
+    size: int
+    mtime_ns: int
+
+    @property
+    def uri(self) -> str:
+        """Location for logs and caches (path or s3:// URI)."""
+        return self.backend.uri(self.key)
+
+    def iter_bytes(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Stream the object, or an inclusive byte range of it, in chunks."""
+        return self.backend.iter_bytes(self.key, start, end)
+
+
+class StorageBackend(ABC):
+    """Interface shared by the storage backends."""
+
+    @abstractmethod
+    def uri(self, key: str) -> str:
+        """Location of an object for logs and caches."""
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[StoredObject]:
+        """Size and modification time of an object, or None if it does not exist."""
+
+    @abstractmethod
+    def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Stream an object, or an inclusive byte range of it, in chunks."""
+
+    @abstractmethod
+    def put_file(self, key: str, source: Path) -> None:
+        """Store a file under ``key``; readers never see a partial object."""
+
+    @abstractmethod
+    def put_bytes(self, key: str, data: bytes) -> None:
+        """Store ``data`` under ``key``; readers never see a partial object."""
+
+    @abstractmethod
+    def touch(self, key: str) -> bool:
+        """Refresh an object's modification time if the backend can; False if it does not exist."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete an object (no error if it does not exist)."""
+
+    @abstractmethod
+    def list_objects(self) -> Iterator[StoredObject]:
+        """Iterate over every object in the backend."""
+
+    def presigned_url(self, key: str, media_type: str, content_disposition: str, expires_in: int) -> Optional[str]:
+        """Time-limited URL a client can download the object from directly, if supported."""
+        return None
+
+
+class LocalStorageBackend(StorageBackend):
+    """Objects are files under ``root``."""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def path(self, key: str) -> Path:
+        """File path of an object."""
+        return self.root / key
+
+    def uri(self, key: str) -> str:
+        return str(self.path(key))
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            stat = self.path(key).stat()
+        except FileNotFoundError:
+            return None
+        return StoredObject(self, key, stat.st_size, stat.st_mtime_ns)
+
+    def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        return iter_file(self.path(key), start, end)
+
+    def put_file(self, key: str, source: Path) -> None:
+        # Hard link when on the same filesystem, so large files are not copied
+        tmp_path = self._tmp_path(key)
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copyfile(source, tmp_path)
+        self._publish(tmp_path, key)
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        tmp_path = self._tmp_path(key)
+        tmp_path.write_bytes(data)
+        self._publish(tmp_path, key)
+
+    def touch(self, key: str) -> bool:
+        try:
+            os.utime(self.path(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def delete(self, key: str) -> None:
+        self.path(key).unlink(missing_ok=True)
+
+    def list_objects(self) -> Iterator[StoredObject]:
+        if not self.root.is_dir():
+            return
+        for path in self.root.rglob("*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.is_file():
+                yield StoredObject(self, path.relative_to(self.root).as_posix(), stat.st_size, stat.st_mtime_ns)
+
+    def _tmp_path(self, key: str) -> Path:
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+
+    def _publish(self, tmp_path: Path, key: str) -> None:
+        """Atomically move a fully written temporary file into place."""
+        path = self.path(key)
+        os.replace(tmp_path, path)
+        os.utime(path)
+
+
+class S3StorageBackend(StorageBackend):
+    """Objects live in an S3-compatible bucket, optionally under a key prefix."""
+
+    def __init__(self, bucket: str, prefix: str = "", client=None, **client_options):
+        if client is None:
+            try:
+                import boto3
+            except ImportError as exc:
+                raise RuntimeError("BLOB_STORAGE_BACKEND=s3 requires boto3 (pip install boto3)") from exc
+            client = boto3.client("s3", **client_options)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _is_missing(self, exc: Exception) -> bool:
+        code = getattr(exc, "response", {}).get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def uri(self, key: str) -> str:
+        return f"s3://{self.bucket}/{self._key(key)}"
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except self.client.exceptions.ClientError as exc:
+            if self._is_missing(exc):
+                return None
+            raise
+        mtime_ns = int(head["LastModified"].timestamp() * 1_000_000_000)
+        return StoredObject(self, key, head["ContentLength"], mtime_ns)
+
+    def iter_bytes(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        params = {"Bucket": self.bucket, "Key": self._key(key)}
+        if start or end is not None:
+            params["Range"] = f"bytes={start}-{'' if end is None else end}"
+        body = self.client.get_object(**params)["Body"]
+        try:
+            yield from body.iter_chunks(S3_CHUNK_SIZE)
+        finally:
+            body.close()
+
+    def put_file(self, key: str, source: Path) -> None:
+        # Multipart upload in parts for large files; S3 verifies the SHA-256 of what it receives
+        self.client.upload_file(
+            str(source), self.bucket, self._key(key),
+            ExtraArgs={"ChecksumAlgorithm": "SHA256"}
+        )
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data, ChecksumAlgorithm="SHA256")
+
+    def touch(self, key: str) -> bool:
+        # Only checks that the object exists: refreshing LastModified would mean
+        # rewriting it with a copy. The garbage collector decides on the blob
+        # row, and a put that finds the row deleted stores the object again.
+        return self.stat(key) is not None
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def list_objects(self) -> Iterator[StoredObject]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get("Contents", []):
+                mtime_ns = int(item["LastModified"].timestamp() * 1_000_000_000)
+                yield StoredObject(self, item["Key"][len(self.prefix):], item["Size"], mtime_ns)
+
+    def presigned_url(self, key: str, media_type: str, content_disposition: str, expires_in: int) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self._key(key),
+                "ResponseContentType": media_type,
+                "ResponseContentDisposition": content_disposition,
+            },
+            ExpiresIn=expires_in
+        )
+
+
+def create_storage_backend() -> StorageBackend:
+    """Build the backend selected by ``BLOB_STORAGE_BACKEND``."""
+    if settings.BLOB_STORAGE_BACKEND == "s3":
+        return S3StorageBackend(
+            bucket=settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region_name=settings.S3_REGION,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+        )
+    return LocalStorageBackend(Path(settings.BLOB_STORAGE_PATH))
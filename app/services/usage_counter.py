@@ -0,0 +1,124 @@
+"""
+Buffered snippet usage counters.
+
+Uses are accumulated in memory and written by a background thread as one
+batch of ``UPDATE snippets SET usage_count = usage_count + :n`` statements.
+The increment happens in the database, so concurrent workers never lose
+each other's counts, and reading a snippet no longer writes.
+
+Counts still in memory when the process dies are lost; usage counts only
+order the snippet list, so that is an acceptable trade for not writing on
+every use.
+"""
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.models.snippet import Snippet
+from app.services.catalog_cache import snippet_catalog
+
+logger = logging.getLogger(__name__)
+
+
+class UsageCounter:
+    """Accumulate per-snippet usage and flush it as atomic increments."""
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._counts: Dict[Optional[Engine], Counter] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def record(self, bind: Optional[Engine], snippet_id: int, uses: int = 1) -> None:
+        """
+        Count uses of a snippet for the next flush.
+
+        Args:
+            bind: Engine the increment must be written to (None uses the app engine)
+            snippet_id: Snippet that was used
+            uses: Number of uses to add
+        """
+        with self._lock:
+            self._counts.setdefault(bind, Counter())[snippet_id] += uses
+        self._ensure_thread()
+
+    def pending(self, snippet_id: int) -> int:
+        """Uses of a snippet recorded in this process but not yet flushed."""
+        with self._lock:
+            return sum(counts[snippet_id] for counts in self._counts.values())
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="snippet-usage", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write all accumulated uses, one batched UPDATE per target engine.
+
+        Returns:
+            Number of snippets whose counters were updated
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._counts = self._counts, {}
+
+            written = 0
+            for bind, counts in batch.items():
+                try:
+                    _increment(bind, counts)
+                    written += len(counts)
+                    # The snippet list is ordered by usage
+                    snippet_catalog.invalidate()
+                except Exception as exc:
+                    logger.warning("Snippet usage flush of %s counters failed: %s", len(counts), exc)
+                    # Put the uses back so they are retried with the next flush
+                    with self._lock:
+                        self._counts.setdefault(bind, Counter()).update(counts)
+            return written
+
+    def stop(self) -> None:
+        """Stop the background flusher and write what is left."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self.flush()
+
+
+def _increment(bind: Optional[Engine], counts: Counter) -> None:
+    if bind is None:
+        from app.db.session import engine as bind
+    table = Snippet.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("snippet_id"))
+        .values(usage_count=table.c.usage_count + bindparam("uses"))
+    )
+    rows = [{"snippet_id": snippet_id, "uses": uses} for snippet_id, uses in sorted(counts.items())]
+    with bind.begin() as conn:
+        conn.execute(statement, rows)
+
+
+# Global instance
+snippet_usage = UsageCounter(flush_interval=settings.SNIPPET_USAGE_FLUSH_INTERVAL_SECONDS)
@@ -0,0 +1,122 @@
+"""
+Stream patients, encounters or document metadata to an NDJSON or CSV file.
+
+Usage:
+    python scripts/export_records.py patients
+    python scripts/export_records.py encounters --format csv --gzip
+    python scripts/export_records.py patients --resume           # continue an interrupted export
+    python scripts/export_records.py encounters --gzip --after-id 52000 --output encounters.csv.gz
+
+Rows are written in ID order. ``--resume`` reads the last complete row of an
+uncompressed output file, drops any half-written row after it and appends the
+rest. Compressed exports are resumed with ``--after-id``; the new data is
+appended as another gzip member, which gzip readers handle transparently.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import engine
+from app.schemas.export import ExportEntity, ExportFormat
+from app.services.bulk_export import bulk_exporter, export_filename
+
+
+def resume_point(path: Path, file_format: ExportFormat) -> Tuple[Optional[int], int]:
+    """
+    Find the last complete row of a partial export.
+
+    Returns:
+        Tuple of (id of the last complete row or None, byte offset where it ends)
+    """
+    last_id, good_offset, offset = None, 0, 0
+    with path.open("rb") as handle:
+        def complete_lines() -> Iterator[str]:
+            nonlocal offset
+            for raw in handle:
+                if not raw.endswith(b"\n"):
+                    return
+                offset += len(raw)
+                yield raw.decode("utf-8")
+
+        lines = complete_lines()
+        if file_format == ExportFormat.NDJSON:
+            for line in lines:
+                try:
+                    last_id = json.loads(line)["id"]
+                except (ValueError, KeyError):
+                    break
+                good_offset = offset
+        else:
+            # In strict mode a quoted field cut off by the interruption is an error, not a row
+            reader = csv.reader(lines, strict=True)
+            try:
+                header = next(reader, None)
+                if header is None:
+                    return None, 0
+                good_offset = offset
+                for record in reader:
+                    if len(record) != len(header):
+                        break
+                    last_id, good_offset = int(record[0]), offset
+            except csv.Error:
+                pass
+    return last_id, good_offset
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export records as NDJSON or CSV")
+    parser.add_argument("entity", choices=[e.value for e in ExportEntity])
+    parser.add_argument("--format", default=ExportFormat.NDJSON.value, choices=[f.value for f in ExportFormat])
+    parser.add_argument("--gzip", action="store_true", help="Compress the output")
+    parser.add_argument("--output", type=Path, help="Output file (default: <entity>.<format>[.gz])")
+    parser.add_argument("--after-id", type=int, default=0, help="Only export rows after this ID")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted uncompressed export")
+    parser.add_argument("--include-deleted", action="store_true", help="Include soft-deleted patients")
+    args = parser.parse_args()
+
+    entity, file_format = ExportEntity(args.entity), ExportFormat(args.format)
+    output = args.output or Path(export_filename(entity, file_format, args.gzip))
+    after_id, mode, header = args.after_id, "wb", True
+
+    if args.resume:
+        if args.gzip:
+            parser.error("--resume needs an uncompressed file; use --after-id with --gzip")
+        if output.exists():
+            last_id, good_offset = resume_point(output, file_format)
+            with output.open("r+b") as handle:
+                handle.truncate(good_offset)
+            after_id = last_id or 0
+            mode, header = "ab", good_offset == 0
+            print(f"Resuming {output} after ID {after_id}")
+    elif after_id and output.exists():
+        mode, header = "ab", False
+
+    started = time.perf_counter()
+    written = 0
+    with output.open(mode) as handle:
+        for chunk in bulk_exporter.stream(
+            engine,
+            entity,
+            file_format,
+            after_id=after_id,
+            include_deleted=args.include_deleted,
+            compress=args.gzip,
+            header=header,
+        ):
+            handle.write(chunk)
+            written += len(chunk)
+
+    seconds = time.perf_counter() - started
+    print(f"Wrote {written / 1024 / 1024:.1f} MB to {output} in {seconds:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Remove unreferenced blobs from the content-addressed file store.
+
+Usage:
+    python scripts/gc_blobs.py
+    python scripts/gc_blobs.py --dry-run
+    python scripts/gc_blobs.py --grace-hours 72
+
+Blobs whose reference count has been zero for longer than the grace period
+are deleted, as are files under BLOB_STORAGE_PATH that have no blob row (left
+by requests that failed after storing their file). Safe to run while the API
+is serving requests; schedule it e.g. nightly.
+"""
+import argparse
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.blob_store import blob_store
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Remove unreferenced attachment and document blobs")
+    parser.add_argument("--grace-hours", type=float, default=settings.BLOB_GC_GRACE_HOURS,
+                        help="Keep blobs and files changed more recently than this")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be removed")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        report = blob_store.collect_garbage(db, timedelta(hours=args.grace_hours), dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(f"{verb} {report.blobs} unreferenced blobs and {report.orphans} orphan files "
+          f"({report.bytes_freed / (1024 * 1024):.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Bulk-import patients from a CSV or NDJSON file.
+
+Usage:
+    python scripts/import_patients.py pacientes.csv
+    python scripts/import_patients.py pacientes.ndjson --batch-size 2000 --user admin
+
+CSV files need a header row with the patient field names (first_name,
+last_name, ci, date_of_birth, phone, email, ...). NDJSON files hold one JSON
+object per line with the same fields. Rows whose CI or email already exists
+are skipped and listed in the report.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.schemas.patient_import import PatientImportFormat
+from app.services.patient_import import PatientImporter, iter_records
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk-import patients from CSV or NDJSON")
+    parser.add_argument("path", type=Path, help="File to import")
+    parser.add_argument("--format", choices=[f.value for f in PatientImportFormat],
+                        help="File format (default: from the extension)")
+    parser.add_argument("--batch-size", type=int, default=settings.PATIENT_IMPORT_BATCH_SIZE)
+    parser.add_argument("--user", default="admin", help="Username the audit entries are attributed to")
+    parser.add_argument("--errors", type=Path, help="Write the per-row errors to this JSON file")
+    args = parser.parse_args()
+
+    file_format = args.format or {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}.get(args.path.suffix.lower())
+    if file_format is None:
+        parser.error("cannot infer the file format; pass --format")
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == args.user).first()
+        if user is None:
+            print(f"User '{args.user}' not found")
+            return 2
+
+        importer = PatientImporter(
+            batch_size=args.batch_size,
+            max_reported_errors=settings.PATIENT_IMPORT_MAX_REPORTED_ERRORS,
+        )
+        with args.path.open(encoding="utf-8-sig", newline="") as stream:
+            report = importer.run(db, iter_records(stream, PatientImportFormat(file_format)), user)
+    finally:
+        db.close()
+
+    print(f"Rows read:   {report.received}")
+    print(f"Inserted:    {report.inserted}")
+    print(f"Duplicates:  {report.duplicates}")
+    print(f"Invalid:     {report.invalid}")
+    print(f"Batches:     {report.batches}")
+    print(f"Time:        {report.seconds:.1f}s ({report.rows_per_second:.0f} rows/s)")
+
+    if args.errors:
+        args.errors.write_text(
+            json.dumps([error.model_dump() for error in report.errors], ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+        print(f"Errors written to {args.errors}")
+    else:
+        for error in report.errors[:20]:
+            print(f"  row {error.row} (CI {error.ci}): {'; '.join(error.errors)}")
+        if len(report.errors) > 20:
+            print(f"  ... {len(report.errors) - 20} more (use --errors to save them all)")
+
+    return 0 if report.inserted or not report.received else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,5 @@
+import asyncio
+import os
 import sys
 from datetime import date, datetime
 from pathlib import Path
@@ -6,6 +8,9 @@ root_dir = Path(__file__).resolve().parents[1]
 if str(root_dir) not in sys.path:
     sys.path.insert(0, str(root_dir))
 
+# Render in-process: this script is not import-safe for spawned pool workers.
+os.environ.setdefault("PDF_RENDER_WORKERS", "0")
+
 try:
     import app  # noqa: F401
 except Exception as exc:
@@ -45,7 +50,9 @@ user = User(
 
 service = PDFService()
 try:
-    pdf_bytes, _ = service.generate_patient_card(db=None, patient=patient, user=user, save_to_db=False)
+    pdf_bytes, _ = asyncio.run(
+        service.generate_patient_card(db=None, patient=patient, user=user, save_to_db=False)
+    )
 except Exception as exc:
     print(f"patient card pdf: FAIL ({exc})")
     sys.exit(1)
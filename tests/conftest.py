@@ -2,17 +2,23 @@
 Shared pytest fixtures for Galenos backend tests.
 Centralizes database setup, user fixtures, and authentication helpers.
 """
+from contextlib import contextmanager
+from typing import Iterator, List
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from datetime import date
 
 from app.main import app
+from app.core.config import settings
 from app.db.session import Base, get_db
 from app.core.security import get_password_hash
 from app.core.limiter import limiter
+from app.core.principal_cache import principal_cache
+from app.services.catalog_cache import snippet_catalog, snippet_favorites, template_catalog, template_favorites
 
 # Import ALL models to register them with Base.metadata
 # This ensures create_all() creates all tables
@@ -49,6 +55,43 @@ def override_get_db():
 # Apply dependency override
 app.dependency_overrides[get_db] = override_get_db
 
+# Write audit entries synchronously so tests can assert on them right away
+settings.AUDIT_ASYNC = False
+
+
+# =============================================================================
+# QUERY COUNTING
+# =============================================================================
+
+@contextmanager
+def count_queries(bind=engine) -> Iterator[List[str]]:
+    """Collect the SQL statements executed on ``bind`` inside the block."""
+    statements: List[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(bind, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", _record)
+
+
+@contextmanager
+def assert_max_queries(limit: int, bind=engine) -> Iterator[List[str]]:
+    """
+    Fail if the block runs more than ``limit`` SQL statements.
+
+    Use around a request to catch N+1 relationship loads; the failure message
+    lists every statement that ran.
+    """
+    with count_queries(bind) as statements:
+        yield statements
+    if len(statements) > limit:
+        listing = "\n".join(f"  {i}. {sql}" for i, sql in enumerate(statements, 1))
+        pytest.fail(f"Expected at most {limit} queries, got {len(statements)}:\n{listing}")
+
 
 # =============================================================================
 # RATE LIMITER CONTROL
@@ -98,6 +141,12 @@ def test_db():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    # User ids are reused across tests, so cached principals and catalogs must not leak
+    principal_cache.clear()
+    template_catalog.invalidate()
+    snippet_catalog.invalidate()
+    template_favorites.clear()
+    snippet_favorites.clear()
 
 
 @pytest.fixture
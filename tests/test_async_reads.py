@@ -0,0 +1,111 @@
+"""
+Tests for the async read endpoints served from the AsyncSession stack.
+"""
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip("aiosqlite")
+
+from app.api.v1.endpoints import async_reads
+from app.core.principal_cache import principal_cache
+from app.core.security import create_access_token, get_password_hash
+from app.db.async_session import async_database_url, get_async_db
+from app.db.session import Base
+from app.models.encounter import Encounter, EncounterStatus, MedicalSpecialty
+from app.models.patient import Patient
+from app.models.user import User, UserRole
+
+
+@pytest.fixture
+def async_client(tmp_path):
+    """App serving only the async router, backed by a file SQLite database."""
+    sync_url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(sync_url)
+    Base.metadata.create_all(bind=sync_engine)
+
+    db = sessionmaker(bind=sync_engine)()
+    doctor = User(
+        email="doctor@test.com",
+        username="doctor_test",
+        full_name="Dr. Test",
+        hashed_password=get_password_hash("password123"),
+        role=UserRole.DOCTOR,
+        is_active=True,
+    )
+    db.add(doctor)
+    db.flush()
+    for i in range(3):
+        patient = Patient(first_name=f"Ana{i}", last_name="Peña", ci=f"9000{i}", date_of_birth=date(1990, 1, 1))
+        db.add(patient)
+        db.flush()
+        db.add(Encounter(
+            patient_id=patient.id,
+            doctor_id=doctor.id,
+            specialty=MedicalSpecialty.CARDIOLOGIA,
+            status=EncounterStatus.DRAFT,
+            subjective="Control",
+        ))
+    db.commit()
+    db.close()
+
+    async_engine = create_async_engine(async_database_url(sync_url))
+    session_factory = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+    async def override_get_async_db():
+        async with session_factory() as session:
+            yield session
+
+    test_app = FastAPI()
+    test_app.include_router(async_reads.router, prefix="/api/v1")
+    test_app.dependency_overrides[get_async_db] = override_get_async_db
+
+    token = create_access_token({"sub": "doctor_test", "role": UserRole.DOCTOR.value})
+    with TestClient(test_app) as test_client:
+        test_client.headers["Authorization"] = f"Bearer {token}"
+        yield test_client
+
+    principal_cache.clear()
+    sync_engine.dispose()
+
+
+def test_async_database_url_swaps_driver():
+    assert async_database_url("sqlite:///./galenos.db") == "sqlite+aiosqlite:///./galenos.db"
+    assert async_database_url("postgresql://u:p@db/galenos") == "postgresql+asyncpg://u:p@db/galenos"
+
+
+def test_async_list_patients_keyset_pages(async_client):
+    first = async_client.get("/api/v1/patients/", params={"limit": 2})
+    assert first.status_code == 200
+    assert [p["first_name"] for p in first.json()] == ["Ana0", "Ana1"]
+
+    second = async_client.get("/api/v1/patients/", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert [p["first_name"] for p in second.json()] == ["Ana2"]
+
+
+def test_async_get_patient_and_encounter(async_client):
+    patient = async_client.get("/api/v1/patients/1")
+    assert patient.status_code == 200
+    assert patient.json()["ci"] == "90000"
+    assert async_client.get("/api/v1/patients/999").status_code == 404
+
+    encounter = async_client.get("/api/v1/encounters/1")
+    assert encounter.status_code == 200
+    assert encounter.json()["patient_name"] == "Ana0 Peña"
+    assert encounter.json()["doctor_name"] == "Dr. Test"
+
+
+def test_async_search(async_client):
+    response = async_client.get("/api/v1/search/", params={"q": "pena"})
+    assert response.status_code == 200
+    assert len(response.json()["patients"]) == 3
+
+
+def test_async_requires_authentication(async_client):
+    response = async_client.get("/api/v1/patients/", headers={"Authorization": ""})
+    assert response.status_code == 401
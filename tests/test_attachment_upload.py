@@ -0,0 +1,93 @@
+"""
+Tests for the chunked attachment upload pipeline.
+"""
+import hashlib
+import io
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.core.upload_limits import RequestBodyLimitMiddleware
+from app.services.attachment_storage import attachment_storage
+from app.services.blob_store import blob_store
+from app.services.storage_backends import LocalStorageBackend
+from tests.conftest import client
+
+PHOTO = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 40
+
+
+@pytest.fixture
+def storage_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(attachment_storage, "directory", tmp_path / "incoming")
+    monkeypatch.setattr(attachment_storage, "chunk_size", 1000)
+    monkeypatch.setattr(blob_store, "backend", LocalStorageBackend(tmp_path / "blobs"))
+    return tmp_path
+
+
+def _upload(token, patient_id, content):
+    return client.post(
+        "/api/v1/attachments/",
+        files={"file": ("lesion.jpg", io.BytesIO(content), "image/jpeg")},
+        data={"patient_id": str(patient_id), "attachment_type": "PHOTO"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+def test_upload_is_hashed_while_streaming(test_patient, auth_token, storage_dir):
+    response = _upload(auth_token, test_patient.id, PHOTO)
+
+    assert response.status_code == 201
+    body = response.json()
+    digest = hashlib.sha256(PHOTO).hexdigest()
+    assert body["file_size"] == len(PHOTO)
+    assert body["file_hash"] == digest
+    assert body["file_path"] == f"sha256:{digest}"
+    assert (storage_dir / "blobs" / blob_store.key_for(digest)).read_bytes() == PHOTO
+    assert list((storage_dir / "incoming").iterdir()) == []
+
+    download = client.get(
+        f"/api/v1/attachments/{body['id']}/download",
+        headers={"Authorization": f"Bearer {auth_token}"},
+    )
+    assert download.headers["etag"] == f'"{digest}"'
+    assert download.content == PHOTO
+
+
+def test_oversized_upload_is_rejected_and_not_kept(test_patient, auth_token, storage_dir, monkeypatch):
+    monkeypatch.setattr(attachment_storage, "max_bytes", len(PHOTO) - 1)
+
+    response = _upload(auth_token, test_patient.id, PHOTO)
+
+    assert response.status_code == 413
+    assert list(storage_dir.rglob("*.*")) == []
+
+
+def test_unknown_patient_404_before_storing(auth_token, test_db, storage_dir):
+    assert _upload(auth_token, 999, PHOTO).status_code == 404
+    assert list(storage_dir.rglob("*.*")) == []
+
+
+def test_body_limit_middleware_refuses_before_parsing():
+    app = FastAPI()
+    app.add_middleware(RequestBodyLimitMiddleware, limits={"/upload": 1024})
+    received = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        received.append(file.filename)
+        return {}
+
+    limited = TestClient(app)
+    small = limited.post("/upload", files={"file": ("a.bin", b"x" * 100)})
+    large = limited.post("/upload", files={"file": ("b.bin", b"x" * 4096)})
+
+    def chunked():
+        yield b"x" * 2048
+
+    streamed = limited.post("/upload", content=chunked(), headers={"Content-Type": "multipart/form-data; boundary=x"})
+
+    assert small.status_code == 200
+    assert large.status_code == 413
+    assert streamed.status_code == 413
+    assert received == ["a.bin"]
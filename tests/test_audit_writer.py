@@ -0,0 +1,125 @@
+"""
+Batched audit writer tests.
+Verifies queued bulk inserts, spool recovery, failure retention and strict mode.
+"""
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+
+import app.services.audit_service as audit_service_module
+from app.core.config import settings
+from app.models.audit_log import AuditLog
+from app.services.audit_writer import AuditWriter
+from tests.conftest import client, engine, TestingSessionLocal
+
+
+@pytest.fixture
+def writer(monkeypatch, tmp_path):
+    """Enable async auditing with a private writer and spool file."""
+    audit_writer = AuditWriter(spool_path=tmp_path / "audit.ndjson", batch_size=100, flush_interval=60)
+    monkeypatch.setattr(settings, "AUDIT_ASYNC", True)
+    monkeypatch.setattr(audit_service_module, "audit_writer", audit_writer)
+    yield audit_writer
+    audit_writer.stop()
+
+
+def _audit_count(action: str) -> int:
+    db = TestingSessionLocal()
+    try:
+        return db.query(AuditLog).filter(AuditLog.action == action).count()
+    finally:
+        db.close()
+
+
+def test_entries_are_queued_spooled_and_bulk_flushed(writer, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    for i in range(3):
+        response = client.post(
+            "/api/v1/patients/",
+            json={
+                "first_name": "Ana",
+                "last_name": f"Quispe {i}",
+                "ci": f"5550000{i}",
+                "date_of_birth": "1980-02-02",
+            },
+            headers=headers
+        )
+        assert response.status_code == 201
+
+    assert _audit_count("create") == 0
+    assert writer.pending == 3
+    assert len(writer.spool_path.read_text().splitlines()) == 3
+
+    assert writer.flush() == 3
+    assert _audit_count("create") == 3
+    assert writer.spool_path.exists() is False
+
+    db = TestingSessionLocal()
+    entry = db.query(AuditLog).filter(AuditLog.action == "create").first()
+    assert entry.metadata_["patient_ci"].startswith("5550000")
+    db.close()
+
+
+def test_failed_flush_keeps_entries_queued_and_spooled(tmp_path):
+    writer = AuditWriter(spool_path=tmp_path / "audit.ndjson", batch_size=100, flush_interval=60)
+    broken_engine = create_engine("sqlite://")  # No audit_logs table
+
+    writer.enqueue(broken_engine, {"user_id": 1, "entity": "patient", "action": "view"})
+
+    assert writer.flush() == 0
+    assert writer.pending == 1
+    assert len(writer.spool_path.read_text().splitlines()) == 1
+
+
+def test_spooled_entries_are_recovered_on_startup(test_db, test_doctor, tmp_path):
+    spool_path = tmp_path / "audit.ndjson"
+    rows = [
+        {"user_id": test_doctor.id, "entity": "patient", "entity_id": 7, "action": "recovered",
+         "description": None, "metadata": {}, "created_at": "2026-01-15 10:00:00"},
+        {"user_id": test_doctor.id, "entity": "patient", "entity_id": 8, "action": "recovered",
+         "description": None, "metadata": {}, "created_at": "2026-01-15 10:00:01"},
+    ]
+    spool_path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+    writer = AuditWriter(spool_path=spool_path, batch_size=100, flush_interval=60)
+    assert writer.recover(bind=engine) == 2
+
+    assert _audit_count("recovered") == 2
+    assert writer.pending == 0
+    assert spool_path.exists() is False
+
+
+def test_strict_entries_commit_with_the_business_transaction(writer, test_patient, admin_token):
+    response = client.delete(
+        f"/api/v1/patients/{test_patient.id}",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+
+    assert response.status_code == 204
+    assert writer.pending == 0
+    assert _audit_count("delete") == 1
+
+
+def test_recover_skips_spools_of_live_workers(test_db, test_doctor, tmp_path):
+    base = tmp_path / "audit.ndjson"
+    row = {"user_id": test_doctor.id, "entity": "patient", "entity_id": 9, "action": "orphaned",
+           "description": None, "metadata": {}, "created_at": "2026-01-15 10:00:00"}
+
+    live = AuditWriter(spool_path=base, batch_size=100, flush_interval=60, owner="101")
+    live.enqueue(engine, {**row, "action": "live", "created_at": datetime(2026, 1, 15, 10, 0)})
+    # A worker that exited without flushing: its spool has no lock holder
+    (tmp_path / "audit.102.ndjson").write_text(json.dumps(row) + "\n")
+
+    newcomer = AuditWriter(spool_path=base, batch_size=100, flush_interval=60, owner="103")
+    try:
+        assert newcomer.recover(bind=engine) == 1
+        assert _audit_count("orphaned") == 1
+        assert (tmp_path / "audit.102.ndjson").exists() is False
+        assert len(live.spool_path.read_text().splitlines()) == 1
+        assert live.pending == 1
+    finally:
+        newcomer.stop()
+        live.stop()
+    assert _audit_count("live") == 1
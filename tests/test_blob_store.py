@@ -0,0 +1,125 @@
+"""
+Tests for content-addressed attachment and document storage.
+"""
+import io
+import os
+import time
+from datetime import timedelta
+
+import pytest
+
+from app.models.blob import Blob
+from app.models.document import Document, DocumentType
+from app.services.attachment_storage import attachment_storage
+from app.services.blob_store import blob_store
+from app.services.pdf_service import pdf_service
+from app.services.storage_backends import LocalStorageBackend
+from tests.conftest import client, TestingSessionLocal
+
+REFERRAL = b"%PDF-1.4 referral " + bytes(range(256)) * 20
+
+
+@pytest.fixture
+def blob_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(attachment_storage, "directory", tmp_path / "incoming")
+    monkeypatch.setattr(blob_store, "backend", LocalStorageBackend(tmp_path / "blobs"))
+    return tmp_path / "blobs"
+
+
+def _upload(token, patient_id):
+    return client.post(
+        "/api/v1/attachments/",
+        files={"file": ("derivacion.pdf", io.BytesIO(REFERRAL), "application/pdf")},
+        data={"patient_id": str(patient_id), "attachment_type": "PDF"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+def _refcount(sha256):
+    db = TestingSessionLocal()
+    try:
+        blob = db.get(Blob, sha256)
+        return blob.refcount if blob else None
+    finally:
+        db.close()
+
+
+def test_identical_uploads_share_one_blob(test_patient, auth_token, blob_dir):
+    first = _upload(auth_token, test_patient.id).json()
+    second = _upload(auth_token, test_patient.id).json()
+
+    assert first["id"] != second["id"]
+    assert first["file_path"] == second["file_path"] == f"sha256:{first['file_hash']}"
+    assert [p for p in blob_dir.rglob("*") if p.is_file()] == [blob_dir / blob_store.key_for(first["file_hash"])]
+    assert _refcount(first["file_hash"]) == 2
+
+    download = client.get(
+        f"/api/v1/attachments/{second['id']}/download",
+        headers={"Authorization": f"Bearer {auth_token}"},
+    )
+    assert download.content == REFERRAL
+
+
+def test_deleted_document_blob_is_collected(test_patient, test_doctor, auth_token, blob_dir, monkeypatch):
+    monkeypatch.setattr(pdf_service, "_verified", type(pdf_service._verified)())
+    db = TestingSessionLocal()
+    try:
+        reference = blob_store.put_bytes(db, REFERRAL)
+        document = Document(
+            document_type=DocumentType.PATIENT_CARD,
+            patient_id=test_patient.id,
+            created_by=test_doctor.id,
+            pdf_path=reference,
+            file_hash=reference.split(":", 1)[1],
+            file_size=len(REFERRAL),
+            filename="ficha.pdf",
+        )
+        db.add(document)
+        db.commit()
+        document_id = document.id
+    finally:
+        db.close()
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    assert client.get(f"/api/v1/documents/{document_id}/download", headers=headers).content == REFERRAL
+
+    sha256 = reference.split(":", 1)[1]
+    path = blob_dir / blob_store.key_for(sha256)
+    assert client.delete(f"/api/v1/documents/{document_id}", headers=headers).status_code == 204
+    assert _refcount(sha256) == 0
+    assert path.exists()
+
+    db = TestingSessionLocal()
+    try:
+        # Still inside the grace period
+        assert blob_store.collect_garbage(db, timedelta(hours=1)).blobs == 0
+        report = blob_store.collect_garbage(db, timedelta(seconds=-1))
+    finally:
+        db.close()
+    assert report.blobs == 1
+    assert report.bytes_freed == len(REFERRAL)
+    assert not path.exists()
+    assert _refcount(sha256) is None
+
+
+def test_gc_removes_orphan_files_but_keeps_fresh_ones(test_db, blob_dir):
+    stale = blob_dir / blob_store.key_for("ab" * 32)
+    fresh = blob_dir / blob_store.key_for("cd" * 32)
+    for path in (stale, fresh):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"left behind")
+    two_days_ago = time.time() - 2 * 24 * 3600
+    os.utime(stale, (two_days_ago, two_days_ago))
+
+    db = TestingSessionLocal()
+    try:
+        dry = blob_store.collect_garbage(db, timedelta(hours=24), dry_run=True)
+        assert (dry.orphans, stale.exists()) == (1, True)
+        report = blob_store.collect_garbage(db, timedelta(hours=24))
+    finally:
+        db.close()
+
+    assert report.orphans == 1
+    assert not stale.exists()
+    assert fresh.exists()
+
@@ -0,0 +1,84 @@
+"""
+Tests for the template/snippet catalog cache and catalog ETags.
+"""
+import pytest
+
+from app.models.encounter import MedicalSpecialty
+from app.models.template import Template
+from app.services.catalog_cache import template_catalog
+from tests.conftest import client, TestingSessionLocal, count_queries
+
+
+@pytest.fixture
+def templates(test_db):
+    db = TestingSessionLocal()
+    db.add_all([
+        Template(title="Control HTA", specialty=MedicalSpecialty.CARDIOLOGIA, is_active=1),
+        Template(title="Dolor torácico", specialty=MedicalSpecialty.CARDIOLOGIA, is_active=1),
+        Template(title="Cefalea", specialty=MedicalSpecialty.NEUROLOGIA, is_active=1),
+        Template(title="Antigua", specialty=MedicalSpecialty.CARDIOLOGIA, is_active=0),
+    ])
+    db.commit()
+    db.close()
+
+
+def _headers(token, etag=None):
+    headers = {"Authorization": f"Bearer {token}"}
+    if etag:
+        headers["If-None-Match"] = etag
+    return headers
+
+
+def test_catalog_served_from_memory_with_etag(auth_token, templates):
+    first = client.get("/api/v1/templates/", params={"specialty": "CARDIOLOGIA"}, headers=_headers(auth_token))
+    assert first.status_code == 200
+    assert [t["title"] for t in first.json()] == ["Control HTA", "Dolor torácico"]
+    assert first.headers["ETag"].startswith('W/"')
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    with count_queries() as statements:
+        again = client.get("/api/v1/templates/", params={"specialty": "CARDIOLOGIA"}, headers=_headers(auth_token))
+    assert statements == []
+    assert again.json() == first.json()
+
+    not_modified = client.get("/api/v1/templates/", headers=_headers(auth_token, first.headers["ETag"]))
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == first.headers["ETag"]
+
+
+def test_writes_and_favorites_change_the_etag(auth_token, templates):
+    listing = client.get("/api/v1/templates/", headers=_headers(auth_token))
+    etag = listing.headers["ETag"]
+
+    created = client.post(
+        "/api/v1/templates/",
+        json={"title": "Arritmia", "specialty": "CARDIOLOGIA", "default_plan": "ECG"},
+        headers=_headers(auth_token),
+    )
+    assert created.status_code == 201
+
+    after_create = client.get("/api/v1/templates/", headers=_headers(auth_token, etag))
+    assert after_create.status_code == 200
+    assert "Arritmia" in [t["title"] for t in after_create.json()]
+
+    etag = after_create.headers["ETag"]
+    favorite = client.post(f"/api/v1/favorites/templates/{created.json()['id']}", headers=_headers(auth_token))
+    assert favorite.status_code == 204
+
+    after_favorite = client.get("/api/v1/templates/", params={"only_favorites": True}, headers=_headers(auth_token, etag))
+    assert after_favorite.status_code == 200
+    assert [(t["title"], t["is_favorite"]) for t in after_favorite.json()] == [("Arritmia", True)]
+
+
+def test_changes_from_other_workers_are_picked_up(auth_token, templates, monkeypatch):
+    client.get("/api/v1/templates/", headers=_headers(auth_token))
+
+    # Another process writes directly to the database
+    db = TestingSessionLocal()
+    db.add(Template(title="Epilepsia", specialty=MedicalSpecialty.NEUROLOGIA, is_active=1))
+    db.commit()
+    db.close()
+
+    monkeypatch.setattr(template_catalog, "ttl", 0)
+    response = client.get("/api/v1/templates/", params={"specialty": "NEUROLOGIA"}, headers=_headers(auth_token))
+    assert [t["title"] for t in response.json()] == ["Cefalea", "Epilepsia"]
@@ -0,0 +1,97 @@
+"""
+Document download streaming tests.
+Verifies single-read streaming, on-the-fly integrity checks and the
+verified-at-mtime/size cache.
+"""
+import hashlib
+
+import pytest
+
+from app.models.document import Document, DocumentType
+from app.services.pdf_service import pdf_service, DocumentIntegrityError
+from tests.conftest import client, TestingSessionLocal
+
+
+PDF_CONTENT = b"%PDF-1.7\n" + b"0123456789" * 20000 + b"\n%%EOF"
+
+
+@pytest.fixture
+def stored_document(monkeypatch, tmp_path, test_patient, test_doctor):
+    """Create a document record backed by a file in a temporary storage dir."""
+    monkeypatch.setattr(pdf_service, "storage_path", tmp_path)
+    monkeypatch.setattr(pdf_service, "_verified", type(pdf_service._verified)())
+    (tmp_path / "card.pdf").write_bytes(PDF_CONTENT)
+
+    db = TestingSessionLocal()
+    document = Document(
+        document_type=DocumentType.PATIENT_CARD,
+        patient_id=test_patient.id,
+        created_by=test_doctor.id,
+        pdf_path="card.pdf",
+        file_hash=hashlib.sha256(PDF_CONTENT).hexdigest(),
+        file_size=len(PDF_CONTENT),
+        filename="card.pdf",
+    )
+    db.add(document)
+    db.commit()
+    db.refresh(document)
+    db.close()
+    return document
+
+
+def test_download_streams_and_records_verification(stored_document, auth_token):
+    response = client.get(
+        f"/api/v1/documents/{stored_document.id}/download",
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+
+    assert response.status_code == 200
+    assert response.content == PDF_CONTENT
+    assert response.headers["content-length"] == str(len(PDF_CONTENT))
+
+    # The second read skips hashing because the file is unchanged
+    stream = pdf_service.open_document_stream(stored_document)
+    assert stream.verified is True
+
+
+def test_preview_aborts_stream_when_content_is_tampered(stored_document, auth_token, tmp_path):
+    tampered = bytearray(PDF_CONTENT)
+    tampered[100] ^= 0xFF
+    (tmp_path / "card.pdf").write_bytes(bytes(tampered))
+
+    with pytest.raises(DocumentIntegrityError):
+        client.get(
+            f"/api/v1/documents/{stored_document.id}/preview",
+            headers={"Authorization": f"Bearer {auth_token}"}
+        )
+
+    # The response body stops short: the final chunk is never sent
+    received = bytearray()
+    with pytest.raises(DocumentIntegrityError):
+        for chunk in pdf_service.open_document_stream(stored_document):
+            received += chunk
+    assert 0 < len(received) < len(PDF_CONTENT)
+    assert pdf_service.verify_document_integrity(stored_document) is False
+
+
+def test_reprint_rejects_size_mismatch_before_streaming(stored_document, auth_token, tmp_path):
+    (tmp_path / "card.pdf").write_bytes(PDF_CONTENT[:-10])
+
+    response = client.post(
+        f"/api/v1/documents/{stored_document.id}/reprint",
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Document integrity verification failed"
+
+
+def test_download_missing_file_returns_404(stored_document, auth_token, tmp_path):
+    (tmp_path / "card.pdf").unlink()
+
+    response = client.get(
+        f"/api/v1/documents/{stored_document.id}/download",
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+
+    assert response.status_code == 404
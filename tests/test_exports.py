@@ -0,0 +1,70 @@
+"""
+Tests for streaming bulk exports.
+"""
+import csv
+import gzip
+import io
+import json
+from datetime import date, datetime
+
+import pytest
+
+from app.models.encounter import Encounter, MedicalSpecialty
+from app.models.patient import Patient
+from tests.conftest import client, TestingSessionLocal
+
+
+@pytest.fixture
+def records(test_doctor):
+    db = TestingSessionLocal()
+    patients = [
+        Patient(first_name="Paciente", last_name=str(i), ci=f"300{i:03d}", date_of_birth=date(1980, 1, i + 1))
+        for i in range(5)
+    ]
+    patients[2].deleted_at = datetime(2026, 1, 1)
+    db.add_all(patients)
+    db.flush()
+    db.add(Encounter(
+        patient_id=patients[0].id,
+        doctor_id=test_doctor.id,
+        specialty=MedicalSpecialty.NEUROLOGIA,
+        subjective="Cefalea, \"pulsátil\"\nde 3 días",
+    ))
+    db.commit()
+    ids = [p.id for p in patients]
+    db.close()
+    return ids
+
+
+def _export(token, entity, **params):
+    return client.get(f"/api/v1/exports/{entity}", params=params, headers={"Authorization": f"Bearer {token}"})
+
+
+def test_ndjson_export_resumes_after_id(admin_token, records):
+    response = _export(admin_token, "patients")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    # Soft-deleted patients are left out unless asked for
+    assert [row["id"] for row in rows] == [i for n, i in enumerate(records) if n != 2]
+    assert rows[0]["date_of_birth"] == "1980-01-01"
+
+    resumed = _export(admin_token, "patients", after_id=records[3], include_deleted=True)
+    assert [json.loads(line)["id"] for line in resumed.text.splitlines()] == [records[4]]
+    assert resumed.headers["content-disposition"].startswith('attachment; filename="patients-after-')
+
+
+def test_csv_export_gzip(admin_token, records):
+    plain = _export(admin_token, "encounters", format="csv")
+    compressed = _export(admin_token, "encounters", format="csv", gzip=True)
+    assert compressed.headers["content-type"] == "application/gzip"
+    assert gzip.decompress(compressed.content) == plain.content
+
+    rows = list(csv.DictReader(io.StringIO(plain.text)))
+    assert len(rows) == 1
+    assert rows[0]["specialty"] == "NEUROLOGIA"
+    assert rows[0]["subjective"] == "Cefalea, \"pulsátil\"\nde 3 días"
+
+
+def test_export_requires_admin(auth_token, test_db):
+    assert _export(auth_token, "patients").status_code == 403
@@ -0,0 +1,94 @@
+"""
+Tests for set-based favorites operations.
+"""
+import pytest
+
+from app.models.encounter import MedicalSpecialty
+from app.models.snippet import Snippet, SnippetCategory, user_favorite_snippets
+from app.models.template import Template
+from tests.conftest import client, TestingSessionLocal, count_queries
+
+
+@pytest.fixture
+def catalog(test_db):
+    db = TestingSessionLocal()
+    templates = [
+        Template(title=f"Plantilla {i}", specialty=MedicalSpecialty.CARDIOLOGIA, is_active=1)
+        for i in range(3)
+    ]
+    snippets = [
+        Snippet(
+            specialty=MedicalSpecialty.CARDIOLOGIA,
+            title=f"Snippet {i}",
+            category=SnippetCategory.DX,
+            content="Contenido",
+        )
+        for i in range(3)
+    ]
+    db.add_all(templates + snippets)
+    db.commit()
+    ids = [t.id for t in templates], [s.id for s in snippets]
+    db.close()
+    return ids
+
+
+def _favorite_snippet_ids():
+    db = TestingSessionLocal()
+    try:
+        return sorted(row[0] for row in db.query(user_favorite_snippets.c.snippet_id).all())
+    finally:
+        db.close()
+
+
+def test_add_favorite_does_not_load_collections(auth_token, catalog):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    template_ids, _ = catalog
+
+    with count_queries() as statements:
+        response = client.post(f"/api/v1/favorites/templates/{template_ids[0]}", headers=headers)
+    assert response.status_code == 204
+    favorites_sql = [sql for sql in statements if "user_favorite_templates" in sql]
+    assert len(favorites_sql) == 1
+    assert "ON CONFLICT DO NOTHING" in favorites_sql[0]
+    # Only the id is checked, no Template row is loaded
+    assert not any("templates.title" in sql for sql in statements)
+
+    # Adding it again is a no-op
+    assert client.post(f"/api/v1/favorites/templates/{template_ids[0]}", headers=headers).status_code == 204
+    listing = client.get("/api/v1/templates/", params={"only_favorites": True}, headers=headers)
+    assert [t["id"] for t in listing.json()] == [template_ids[0]]
+
+
+def test_bulk_add_and_remove(auth_token, catalog):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    _, snippet_ids = catalog
+
+    added = client.post(
+        "/api/v1/favorites/snippets/bulk-add",
+        json={"ids": snippet_ids + [snippet_ids[0], 999]},
+        headers=headers,
+    )
+    assert added.status_code == 200
+    assert added.json() == {"changed": 3, "not_found": [999]}
+    assert _favorite_snippet_ids() == snippet_ids
+
+    again = client.post("/api/v1/favorites/snippets/bulk-add", json={"ids": snippet_ids}, headers=headers)
+    assert again.json() == {"changed": 0, "not_found": []}
+
+    removed = client.post(
+        "/api/v1/favorites/snippets/bulk-remove",
+        json={"ids": snippet_ids[:2]},
+        headers=headers,
+    )
+    assert removed.json() == {"changed": 2, "not_found": []}
+    assert _favorite_snippet_ids() == snippet_ids[2:]
+
+    listing = client.get("/api/v1/snippets/", params={"only_favorites": True}, headers=headers)
+    assert [s["id"] for s in listing.json()] == snippet_ids[2:]
+
+
+def test_unknown_ids_404_and_empty_bulk_rejected(auth_token, catalog):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    assert client.post("/api/v1/favorites/templates/999", headers=headers).status_code == 404
+    assert client.delete("/api/v1/favorites/snippets/999", headers=headers).status_code == 404
+    assert client.post("/api/v1/favorites/templates/bulk-add", json={"ids": []}, headers=headers).status_code == 422
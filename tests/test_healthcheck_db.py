@@ -1,7 +1,13 @@
 """
-Health check tests for DB connectivity.
+Health check tests for DB connectivity and connection pool reporting.
 """
+import time
+
+import pytest
+from sqlalchemy import create_engine, exc
+
 import app.main as main_module
+from app.db.pool_metrics import InstrumentedQueuePool, PoolMetrics, attach_pool_metrics
 from tests.conftest import client
 
 
@@ -21,3 +27,54 @@ def test_healthcheck_degraded_on_db_failure(monkeypatch):
     assert response.status_code == 200
     assert response.json()["status"] == "degraded"
     assert response.json()["db"] == "down"
+
+
+@pytest.fixture
+def small_pool_engine(tmp_path, monkeypatch):
+    """A one-connection instrumented pool served by /health/db."""
+    metrics = PoolMetrics()
+    pool_engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.2,
+    )
+    attach_pool_metrics(pool_engine, metrics)
+    monkeypatch.setattr(main_module, "engine", pool_engine)
+    yield pool_engine, metrics
+    pool_engine.dispose()
+
+
+def test_health_db_reports_pool_and_metrics(small_pool_engine):
+    pool_engine, metrics = small_pool_engine
+
+    response = client.get("/health/db")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "healthy"
+    assert data["size"] == 1
+    assert data["checked_out"] == 0
+    assert data["metrics"]["checkouts"] == 1
+    assert metrics.checkins == 1
+
+
+def test_health_db_does_not_wait_on_exhausted_pool(small_pool_engine):
+    pool_engine, metrics = small_pool_engine
+    held = pool_engine.connect()
+    try:
+        with pytest.raises(exc.TimeoutError):
+            pool_engine.connect()
+
+        started = time.perf_counter()
+        response = client.get("/health/db")
+        elapsed = time.perf_counter() - started
+    finally:
+        held.close()
+
+    data = response.json()
+    assert data["status"] == "saturated"
+    assert data["saturation"] == 1.0
+    assert data["metrics"]["timeouts"] == 1
+    assert elapsed < 0.2
@@ -0,0 +1,186 @@
+"""
+HTTP caching tests for stored documents and attachments.
+Verifies ETag / If-None-Match revalidation, Range requests and Cache-Control.
+"""
+import hashlib
+import io
+
+import pytest
+
+from app.core.http_cache import content_disposition
+from app.models.audit_log import AuditLog
+from app.models.document import Document, DocumentType
+from app.services.pdf_service import pdf_service
+from tests.conftest import client, TestingSessionLocal
+
+
+PDF_CONTENT = b"%PDF-1.7\n" + bytes(range(256)) * 64 + b"\n%%EOF"
+PDF_HASH = hashlib.sha256(PDF_CONTENT).hexdigest()
+
+
+@pytest.fixture
+def stored_document(monkeypatch, tmp_path, test_patient, test_doctor):
+    """Create a document record backed by a file in a temporary storage dir."""
+    monkeypatch.setattr(pdf_service, "storage_path", tmp_path)
+    monkeypatch.setattr(pdf_service, "_verified", type(pdf_service._verified)())
+    (tmp_path / "card.pdf").write_bytes(PDF_CONTENT)
+
+    db = TestingSessionLocal()
+    document = Document(
+        document_type=DocumentType.PATIENT_CARD,
+        patient_id=test_patient.id,
+        created_by=test_doctor.id,
+        pdf_path="card.pdf",
+        file_hash=PDF_HASH,
+        file_size=len(PDF_CONTENT),
+        filename="card.pdf",
+    )
+    db.add(document)
+    db.commit()
+    db.refresh(document)
+    db.close()
+    return document
+
+
+def test_document_download_sends_etag_and_cache_control(stored_document, auth_token):
+    response = client.get(
+        f"/api/v1/documents/{stored_document.id}/download",
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{PDF_HASH}"'
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_document_download_revalidation_returns_304(stored_document, auth_token):
+    response = client.get(
+        f"/api/v1/documents/{stored_document.id}/download",
+        headers={
+            "Authorization": f"Bearer {auth_token}",
+            "If-None-Match": f'"{PDF_HASH}"'
+        }
+    )
+
+    assert response.status_code == 304
+    assert response.content == b""
+
+    db = TestingSessionLocal()
+    downloads = db.query(AuditLog).filter(AuditLog.action == "download").count()
+    db.close()
+    assert downloads == 0
+
+
+def test_document_preview_serves_byte_ranges(stored_document, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    # Not verified yet: the range is ignored and the whole file is sent and verified
+    response = client.get(
+        f"/api/v1/documents/{stored_document.id}/preview",
+        headers={**headers, "Range": "bytes=10-19"}
+    )
+    assert response.status_code == 200
+    assert response.content == PDF_CONTENT
+
+    response = client.get(
+        f"/api/v1/documents/{stored_document.id}/preview",
+        headers={**headers, "Range": "bytes=10-19"}
+    )
+    assert response.status_code == 206
+    assert response.content == PDF_CONTENT[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(PDF_CONTENT)}"
+
+    response = client.get(
+        f"/api/v1/documents/{stored_document.id}/preview",
+        headers={**headers, "Range": "bytes=-6"}
+    )
+    assert response.status_code == 206
+    assert response.content == PDF_CONTENT[-6:]
+
+    response = client.get(
+        f"/api/v1/documents/{stored_document.id}/preview",
+        headers={**headers, "Range": f"bytes={len(PDF_CONTENT)}-"}
+    )
+    assert response.status_code == 416
+
+
+def test_document_range_ignored_when_if_range_is_stale(stored_document, auth_token):
+    response = client.get(
+        f"/api/v1/documents/{stored_document.id}/preview",
+        headers={
+            "Authorization": f"Bearer {auth_token}",
+            "Range": "bytes=0-9",
+            "If-Range": '"stale"'
+        }
+    )
+
+    assert response.status_code == 200
+    assert response.content == PDF_CONTENT
+
+
+def test_attachment_download_supports_etag_and_range(test_patient, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    upload = client.post(
+        "/api/v1/attachments/",
+        files={"file": ("scan.pdf", io.BytesIO(PDF_CONTENT), "application/pdf")},
+        data={"patient_id": str(test_patient.id), "attachment_type": "PDF"},
+        headers=headers
+    )
+    assert upload.status_code == 201
+    attachment_id = upload.json()["id"]
+
+    response = client.get(f"/api/v1/attachments/{attachment_id}/download", headers=headers)
+    assert response.status_code == 200
+    assert response.content == PDF_CONTENT
+    assert "immutable" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+
+    response = client.get(
+        f"/api/v1/attachments/{attachment_id}/download",
+        headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    response = client.get(
+        f"/api/v1/attachments/{attachment_id}/download",
+        headers={**headers, "Range": "bytes=0-3"}
+    )
+    assert response.status_code == 206
+    assert response.content == PDF_CONTENT[:4]
+
+    # A viewer fetching the rest piece by piece adds no audit rows
+    for start in range(4, 40, 4):
+        response = client.get(
+            f"/api/v1/attachments/{attachment_id}/download",
+            headers={**headers, "Range": f"bytes={start}-{start + 3}"}
+        )
+        assert response.status_code == 206
+
+    db = TestingSessionLocal()
+    downloads = db.query(AuditLog).filter(
+        AuditLog.entity == "attachment",
+        AuditLog.action == "download"
+    ).count()
+    db.close()
+    # The first full download and the range starting at byte 0
+    assert downloads == 2
+
+
+def test_attachment_download_encodes_filename(test_patient, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    upload = client.post(
+        "/api/v1/attachments/",
+        files={"file": ("informe ñandú.pdf", io.BytesIO(PDF_CONTENT), "application/pdf")},
+        data={"patient_id": str(test_patient.id), "attachment_type": "PDF"},
+        headers=headers
+    )
+    attachment_id = upload.json()["id"]
+
+    response = client.get(f"/api/v1/attachments/{attachment_id}/download", headers=headers)
+    assert response.headers["content-disposition"] == (
+        "attachment; filename=\"informe nandu.pdf\"; filename*=UTF-8''informe%20%C3%B1and%C3%BA.pdf"
+    )
+    assert content_disposition("inline", 'a "b".pdf') == (
+        "inline; filename=\"a _b_.pdf\"; filename*=UTF-8''a%20%22b%22.pdf"
+    )
@@ -0,0 +1,51 @@
+"""
+Import-time budget for the API.
+Importing app.main must not load the PDF stack and must stay within a time
+budget, so workers, test runs and Alembic start quickly.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Generous enough for slow CI runners; override with IMPORT_TIME_BUDGET_SECONDS
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "4.0"))
+
+HEAVY_MODULES = ["weasyprint", "jinja2", "cairocffi", "pydyf", "tinycss2", "cssselect2", "fontTools"]
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def _measure_import() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=Path(__file__).resolve().parent.parent,
+        env={**os.environ, "WEASYPRINT_SELFTEST": "false"},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_does_not_load_pdf_stack():
+    report = _measure_import()
+
+    assert report["loaded"] == []
+
+
+def test_import_time_within_budget():
+    # Best of three runs to keep noise from a busy machine out of the result
+    best = min(_measure_import()["elapsed"] for _ in range(3))
+
+    assert best < IMPORT_TIME_BUDGET_SECONDS, (
+        f"import app.main took {best:.2f}s (budget {IMPORT_TIME_BUDGET_SECONDS:.2f}s)"
+    )
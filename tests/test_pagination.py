@@ -0,0 +1,165 @@
+"""
+Keyset pagination tests.
+Walks list endpoints page by page using the cursor headers and checks that
+offset pagination keeps working.
+"""
+from datetime import date, datetime, timedelta
+
+from app.models.encounter import Encounter, EncounterStatus, MedicalSpecialty
+from app.models.patient import Patient
+from app.models.snippet import Snippet
+from tests.conftest import client, TestingSessionLocal
+
+
+def _create_patients(count: int):
+    db = TestingSessionLocal()
+    # Identical timestamps force the id tie-breaker to be exercised
+    created_at = datetime(2026, 1, 1, 12, 0, 0)
+    for i in range(count):
+        db.add(Patient(
+            first_name=f"Paciente{i}",
+            last_name="Keyset",
+            ci=f"900{i:04d}",
+            date_of_birth=date(1990, 1, 1),
+            created_at=created_at + timedelta(seconds=i // 2),
+        ))
+    db.commit()
+    ids = [p.id for p in db.query(Patient).order_by(Patient.created_at, Patient.id)]
+    db.close()
+    return ids
+
+
+def _walk(url, headers, header_name):
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200
+        seen.append([item["id"] for item in response.json()])
+        cursor = response.headers.get(header_name)
+        if not cursor:
+            return seen, response
+
+
+def test_patients_cursor_walks_every_row_once(test_db, auth_token):
+    expected = _create_patients(8)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    pages, _ = _walk("/api/v1/patients/", headers, "X-Next-Cursor")
+
+    assert [patient_id for page in pages for patient_id in page] == expected
+    assert [len(page) for page in pages] == [3, 3, 2]
+
+
+def test_patients_prev_cursor_returns_previous_page(test_db, auth_token):
+    expected = _create_patients(8)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    first = client.get("/api/v1/patients/", params={"limit": 3}, headers=headers)
+    assert "X-Prev-Cursor" not in first.headers
+    second = client.get(
+        "/api/v1/patients/",
+        params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]},
+        headers=headers,
+    )
+    back = client.get(
+        "/api/v1/patients/",
+        params={"limit": 3, "cursor": second.headers["X-Prev-Cursor"]},
+        headers=headers,
+    )
+
+    assert [p["id"] for p in second.json()] == expected[3:6]
+    assert [p["id"] for p in back.json()] == expected[:3]
+
+
+def test_offset_mode_and_total_count(test_db, auth_token):
+    expected = _create_patients(5)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    response = client.get(
+        "/api/v1/patients/",
+        params={"skip": 2, "limit": 2, "include_total": True},
+        headers=headers,
+    )
+
+    assert [p["id"] for p in response.json()] == expected[2:4]
+    assert response.headers["X-Total-Count"] == "5"
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_skip_and_cursor_together_rejected(test_db, auth_token):
+    _create_patients(4)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    first = client.get("/api/v1/patients/", params={"limit": 2}, headers=headers)
+
+    response = client.get(
+        "/api/v1/patients/",
+        params={"skip": 2, "cursor": first.headers["X-Next-Cursor"]},
+        headers=headers,
+    )
+
+    assert response.status_code == 400
+
+
+def test_invalid_cursor_rejected(test_db, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    response = client.get("/api/v1/patients/", params={"cursor": "not-a-cursor"}, headers=headers)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
+
+
+def test_encounters_cursor_most_recent_first(test_db, test_patient, test_doctor, auth_token):
+    db = TestingSessionLocal()
+    base = datetime(2026, 1, 1, 8, 0, 0)
+    for i in range(7):
+        db.add(Encounter(
+            patient_id=test_patient.id,
+            doctor_id=test_doctor.id,
+            specialty=MedicalSpecialty.CARDIOLOGIA,
+            status=EncounterStatus.DRAFT,
+            subjective=f"Consulta {i}",
+            created_at=base + timedelta(hours=i % 3),
+        ))
+    db.commit()
+    expected = [
+        e.id for e in db.query(Encounter).order_by(Encounter.created_at.desc(), Encounter.id.desc())
+    ]
+    db.close()
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    pages, _ = _walk(f"/api/v1/patients/{test_patient.id}/encounters", headers, "X-Next-Cursor")
+
+    assert [encounter_id for page in pages for encounter_id in page] == expected
+
+
+def test_snippets_page_by_offset_in_usage_order(test_db, auth_token):
+    db = TestingSessionLocal()
+    for i, usage in enumerate([5, 1, 5, 0, 3, 5, 1]):
+        db.add(Snippet(
+            specialty=MedicalSpecialty.CARDIOLOGIA,
+            title=f"Snippet {i % 3}",
+            category="PLAN",
+            content="...",
+            usage_count=usage,
+        ))
+    db.commit()
+    expected = [
+        s.id for s in db.query(Snippet).order_by(Snippet.usage_count.desc(), Snippet.title, Snippet.id)
+    ]
+    db.close()
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    # Usage counts change while a client pages, so no keyset cursor is offered
+    pages = []
+    for skip in range(0, len(expected), 3):
+        response = client.get("/api/v1/snippets/", params={"skip": skip, "limit": 3}, headers=headers)
+        assert "X-Next-Cursor" not in response.headers
+        pages.append([item["id"] for item in response.json()])
+
+    assert [snippet_id for page in pages for snippet_id in page] == expected
+
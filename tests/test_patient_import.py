@@ -0,0 +1,89 @@
+"""
+Tests for the bulk patient import pipeline.
+"""
+import io
+import json
+
+from app.models.audit_log import AuditLog
+from app.models.patient import Patient
+from app.services.patient_import import PatientImporter, iter_records
+from app.schemas.patient_import import PatientImportFormat
+from tests.conftest import client, TestingSessionLocal, count_queries
+
+CSV_HEADER = "first_name,last_name,ci,date_of_birth,phone,email\n"
+
+
+def _csv(rows):
+    return CSV_HEADER + "".join(f"{','.join(row)}\n" for row in rows)
+
+
+def _import(token, content, filename="pacientes.csv", **params):
+    return client.post(
+        "/api/v1/patients/import",
+        params=params,
+        files={"file": (filename, content.encode("utf-8"), "text/plain")},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+def test_csv_import_reports_invalid_and_duplicate_rows(admin_token, test_patient):
+    content = _csv([
+        ("Ana", "Pérez", "1000001", "1985-04-02", "700 11 111", "ana@test.com"),
+        ("Luis", "Rojas", "1000002", "1990-01-01", "", ""),
+        ("Sin", "Fecha", "1000003", "no-es-fecha", "", ""),
+        ("Otro", "Doe", test_patient.ci, "1980-01-01", "", ""),  # CI already in the database
+        ("Copia", "Ana", "1000001", "1985-04-02", "", ""),  # CI repeated in the file
+        ("Mismo", "Email", "1000004", "1970-05-05", "", "john@test.com"),  # email already in the database
+    ])
+    response = _import(admin_token, content)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["received"], report["inserted"], report["duplicates"], report["invalid"]) == (6, 2, 3, 1)
+    errors = {error["row"]: error["errors"][0] for error in report["errors"]}
+    assert errors[3].startswith("date_of_birth")
+    assert errors[4] == f"Patient with CI {test_patient.ci} already exists"
+    assert errors[5] == "Duplicate CI or email within the file"
+    assert errors[6] == "Patient with email john@test.com already exists"
+
+    db = TestingSessionLocal()
+    try:
+        ana = db.query(Patient).filter(Patient.ci == "1000001").one()
+        assert ana.phone == "70011111"
+        assert db.query(Patient).filter(Patient.ci == "1000002").one().email is None
+        audits = db.query(AuditLog).filter(AuditLog.action == "bulk_import").all()
+        assert len(audits) == 1
+        assert audits[0].metadata_["count"] == 2
+    finally:
+        db.close()
+
+
+def test_ndjson_import_batches_inserts(test_admin):
+    lines = [
+        json.dumps({"first_name": "P", "last_name": str(i), "ci": f"20000{i:02d}", "date_of_birth": "2000-01-01"})
+        for i in range(25)
+    ]
+    lines.insert(3, "{not json")
+    importer = PatientImporter(batch_size=10, max_reported_errors=10)
+    db = TestingSessionLocal()
+    try:
+        with count_queries() as statements:
+            report = importer.run(
+                db, iter_records(io.StringIO("\n".join(lines)), PatientImportFormat.NDJSON), test_admin
+            )
+        inserts = [sql for sql in statements if sql.lstrip().upper().startswith("INSERT INTO PATIENTS")]
+        assert len(inserts) == 3
+        assert report.inserted == 25 and report.invalid == 1 and report.batches == 3
+        assert report.errors[0].row == 4 and report.errors[0].errors[0].startswith("Invalid JSON")
+        assert db.query(AuditLog).filter(AuditLog.action == "bulk_import").count() == 3
+    finally:
+        db.close()
+
+
+def test_import_requires_admin_and_known_format(auth_token, admin_token, test_db):
+    assert _import(auth_token, _csv([])).status_code == 403
+    assert _import(admin_token, "", filename="pacientes.txt").status_code == 400
+    response = _import(admin_token, '{"first_name": "A"}\n', filename="pacientes.txt", format="ndjson")
+    assert response.status_code == 200
+    assert response.json()["invalid"] == 1
+
@@ -0,0 +1,96 @@
+"""
+Patient typeahead index tests.
+Covers accent folding, number fragments, the memory budget and keeping the
+index in sync with the patient endpoints and other workers.
+"""
+from datetime import date
+
+import pytest
+
+from app.models.patient import Patient
+from app.services.patient_index import PatientTypeaheadIndex, fold, patient_index
+from tests.conftest import client, TestingSessionLocal
+
+
+@pytest.fixture
+def live_index(test_db):
+    """Build the global index against the test database for one test."""
+    original_interval = patient_index.refresh_interval
+    patient_index.build(TestingSessionLocal)
+    yield patient_index
+    patient_index.clear()
+    patient_index.refresh_interval = original_interval
+
+
+def _patient(patient_id, first_name, last_name, ci, phone=None):
+    return Patient(
+        id=patient_id,
+        first_name=first_name,
+        last_name=last_name,
+        ci=ci,
+        phone=phone,
+        date_of_birth=date(1970, 1, 1),
+    )
+
+
+def _ready_index(max_bytes=1024 * 1024):
+    index = PatientTypeaheadIndex(max_bytes=max_bytes, refresh_interval=60)
+    index.build(TestingSessionLocal)
+    return index
+
+
+def test_fold_strips_spanish_accents():
+    assert fold("Peña Núñez Güemes") == "pena nunez guemes"
+
+
+def test_prefix_and_number_fragments(test_db):
+    index = _ready_index()
+    index.upsert(_patient(1, "María José", "Ávalos", "6543210", phone="+591 71234567"))
+    index.upsert(_patient(2, "Mario", "Vargas", "7777777"))
+
+    assert [p.id for p in index.search("mar")] == [1, 2]
+    assert [p.id for p in index.search("maria aval")] == [1]
+    assert [p.id for p in index.search("3210")] == [1]
+    assert [p.id for p in index.search("71234")] == [1]
+    assert [p.id for p in index.search("7777777")] == [2]
+    assert index.search("zzz") == []
+
+
+def test_over_budget_index_disables_itself(test_db):
+    index = _ready_index(max_bytes=600)
+    index.upsert(_patient(1, "Ana", "Paz", "1000001"))
+    index.upsert(_patient(2, "Bruno", "Sosa Ballivián Quiroga", "1000002", phone="+591 70000000"))
+
+    assert not index.ready
+    assert index.search("ana") == []
+
+
+def test_search_endpoint_tracks_api_changes(live_index, auth_token, admin_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    created = client.post(
+        "/api/v1/patients/",
+        json={"first_name": "Íñigo", "last_name": "Salinas", "ci": "8080808", "date_of_birth": "1991-03-03"},
+        headers=headers,
+    ).json()
+
+    found = client.get("/api/v1/search/", params={"q": "inigo sal"}, headers=headers).json()
+    assert [p["id"] for p in found["patients"]] == [created["id"]]
+
+    client.put(f"/api/v1/patients/{created['id']}", json={"last_name": "Zárate"}, headers=headers)
+    assert client.get("/api/v1/search/", params={"q": "salinas"}, headers=headers).json()["patients"] == []
+
+    client.delete(f"/api/v1/patients/{created['id']}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert client.get("/api/v1/search/", params={"q": "zarate"}, headers=headers).json()["patients"] == []
+
+
+def test_refresh_picks_up_changes_from_other_workers(live_index, auth_token):
+    live_index.refresh_interval = 0
+    db = TestingSessionLocal()
+    db.add(Patient(first_name="Olga", last_name="Tejada", ci="9090909", date_of_birth=date(1960, 2, 2)))
+    db.commit()
+    db.close()
+
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    found = client.get("/api/v1/search/", params={"q": "olga"}, headers=headers).json()
+
+    assert [p["ci"] for p in found["patients"]] == ["9090909"]
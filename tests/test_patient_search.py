@@ -0,0 +1,97 @@
+"""
+Patient search tests.
+Exercises the SQLite FTS5 backend behind the Command Palette search.
+"""
+from datetime import date, datetime
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+
+from app.db.patient_search_ddl import include_object
+from app.db.session import Base
+from app.models.patient import Patient
+from tests.conftest import client, engine, TestingSessionLocal
+
+
+def _add_patient(first_name, last_name, ci, deleted=False):
+    db = TestingSessionLocal()
+    patient = Patient(
+        first_name=first_name,
+        last_name=last_name,
+        ci=ci,
+        date_of_birth=date(1985, 5, 5),
+        deleted_at=datetime.utcnow() if deleted else None,
+    )
+    db.add(patient)
+    db.commit()
+    patient_id = patient.id
+    db.close()
+    return patient_id
+
+
+def _search(q, auth_token):
+    response = client.get(
+        "/api/v1/search/",
+        params={"q": q},
+        headers={"Authorization": f"Bearer {auth_token}"},
+    )
+    assert response.status_code == 200
+    return [p["id"] for p in response.json()["patients"]]
+
+
+def test_search_is_accent_insensitive_prefix(test_db, auth_token):
+    jose = _add_patient("José", "Pérez", "1111111")
+    _add_patient("Ana", "Gómez", "2222222")
+
+    assert _search("jose", auth_token) == [jose]
+    assert _search("PER", auth_token) == [jose]
+    assert _search("jos pér", auth_token) == [jose]
+
+
+def test_search_by_ci_and_excludes_deleted(test_db, auth_token):
+    active = _add_patient("Luis", "Mora", "3456789")
+    _add_patient("Luis", "Mora", "3456790", deleted=True)
+
+    assert _search("3456789", auth_token) == [active]
+    assert _search("luis", auth_token) == [active]
+
+
+def test_search_by_ci_fragment(test_db, auth_token):
+    patient_id = _add_patient("Elena", "Suárez", "4567123")
+    _add_patient("Pablo", "Castro", "9999999")
+
+    assert _search("67123", auth_token) == [patient_id]
+    assert _search("4567", auth_token) == [patient_id]
+    assert _search("123456", auth_token) == []
+
+
+def test_search_index_follows_updates_and_deletes(test_db, auth_token):
+    patient_id = _add_patient("Carla", "Rivas", "4444444")
+
+    db = TestingSessionLocal()
+    patient = db.get(Patient, patient_id)
+    patient.last_name = "Ñúñez"
+    db.commit()
+    assert _search("rivas", auth_token) == []
+    assert _search("nunez", auth_token) == [patient_id]
+
+    db.delete(db.get(Patient, patient_id))
+    db.commit()
+    db.close()
+    assert _search("nunez", auth_token) == []
+
+
+def test_search_treats_operators_as_text(test_db, auth_token):
+    patient_id = _add_patient("Marta", "Or", "5555555")
+
+    assert _search('"', auth_token) == []
+    assert _search("marta OR", auth_token) == [patient_id]
+    assert _search("NEAR(marta", auth_token) == []
+
+
+def test_autogenerate_ignores_fts_tables(test_db):
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"include_object": include_object})
+        diff = compare_metadata(context, Base.metadata)
+
+    assert not [op for op in diff if op[0] == "remove_table"]
@@ -0,0 +1,125 @@
+"""
+Tests for the merged patient timeline endpoint.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.attachment import Attachment, AttachmentType
+from app.models.audit_log import AuditLog
+from app.models.document import Document, DocumentType
+from app.models.encounter import Encounter, MedicalSpecialty
+from tests.conftest import client, TestingSessionLocal, assert_max_queries
+
+
+@pytest.fixture
+def patient_history(test_patient, test_doctor):
+    """One event of each kind, a minute apart, oldest first."""
+    start = datetime(2026, 3, 1, 9, 0)
+    db = TestingSessionLocal()
+    encounter = Encounter(
+        patient_id=test_patient.id,
+        doctor_id=test_doctor.id,
+        specialty=MedicalSpecialty.DERMATOLOGIA,
+        created_at=start,
+    )
+    db.add(encounter)
+    db.flush()
+    db.add_all([
+        Attachment(
+            patient_id=test_patient.id,
+            encounter_id=encounter.id,
+            created_by=test_doctor.id,
+            file_path="uploads/lesion.jpg",
+            original_filename="lesion.jpg",
+            attachment_type=AttachmentType.PHOTO,
+            created_at=start + timedelta(minutes=1),
+        ),
+        Document(
+            document_type=DocumentType.PATIENT_CARD,
+            patient_id=test_patient.id,
+            created_by=test_doctor.id,
+            pdf_path="ficha.pdf",
+            file_hash="0" * 64,
+            file_size=10,
+            filename="ficha.pdf",
+            created_at=start + timedelta(minutes=2),
+        ),
+        AuditLog(
+            user_id=test_doctor.id,
+            entity="encounter",
+            entity_id=encounter.id,
+            action="SIGN_ENCOUNTER",
+            description="Signed",
+            created_at=start + timedelta(minutes=3),
+        ),
+        # Another patient's event must not leak in
+        AuditLog(
+            user_id=test_doctor.id,
+            entity="patient",
+            entity_id=test_patient.id + 1,
+            action="update",
+            created_at=start + timedelta(minutes=4),
+        ),
+    ])
+    db.commit()
+    db.close()
+    return test_patient.id
+
+
+def test_timeline_merges_all_kinds_newest_first(auth_token, patient_history):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    url = f"/api/v1/patients/{patient_history}/timeline"
+    client.get(url, headers=headers)
+
+    # Patient check plus the single UNION ALL query
+    with assert_max_queries(2):
+        response = client.get(url, headers=headers)
+
+    assert response.status_code == 200
+    entries = response.json()
+    assert [entry["kind"] for entry in entries] == ["audit", "document", "attachment", "encounter"]
+    assert entries[0]["title"] == "SIGN_ENCOUNTER"
+    assert entries[2]["encounter_id"] == entries[3]["id"]
+    assert entries[3]["title"] == "DERMATOLOGIA"
+    assert all(entry["actor_name"] == "Dr. Test" for entry in entries)
+
+
+def test_timeline_cursor_pages_and_kind_filter(auth_token, patient_history):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    url = f"/api/v1/patients/{patient_history}/timeline"
+
+    first = client.get(url, params={"limit": 3}, headers=headers)
+    second = client.get(url, params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]}, headers=headers)
+    assert [entry["kind"] for entry in second.json()] == ["encounter"]
+    assert "X-Next-Cursor" not in second.headers
+
+    filtered = client.get(url, params=[("kind", "document"), ("kind", "encounter")], headers=headers)
+    assert [entry["kind"] for entry in filtered.json()] == ["document", "encounter"]
+
+
+def test_timeline_keeps_audit_events_of_deleted_documents(auth_token, admin_token, test_doctor, patient_history):
+    db = TestingSessionLocal()
+    document_id = db.query(Document.id).filter(Document.patient_id == patient_history).scalar()
+    db.add(AuditLog(
+        user_id=test_doctor.id,
+        entity="document",
+        entity_id=document_id,
+        action="download",
+        metadata_={"patient_id": patient_history},
+        created_at=datetime(2026, 3, 1, 9, 5),
+    ))
+    db.commit()
+    db.close()
+
+    response = client.delete(f"/api/v1/documents/{document_id}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 204
+
+    url = f"/api/v1/patients/{patient_history}/timeline"
+    entries = client.get(url, params=[("kind", "audit")], headers={"Authorization": f"Bearer {auth_token}"}).json()
+    assert [entry["title"] for entry in entries] == ["delete", "download", "SIGN_ENCOUNTER"]
+
+
+def test_timeline_unknown_patient_404(auth_token, test_db):
+    response = client.get("/api/v1/patients/999/timeline", headers={"Authorization": f"Bearer {auth_token}"})
+    assert response.status_code == 404
@@ -0,0 +1,155 @@
+"""
+PDF render engine and render cache tests.
+Verifies backpressure, timeouts and caching on the patient card endpoints
+without depending on the native WeasyPrint stack.
+"""
+import threading
+
+import pytest
+
+import app.services.pdf_render as pdf_render_module
+import app.services.pdf_service as pdf_service_module
+from app.services.pdf_render import PDFRenderEngine
+from app.services.pdf_service import PDFRenderCache
+from tests.conftest import client
+
+
+FAKE_PDF = b"%PDF-1.7 fake"
+
+
+@pytest.fixture
+def render_cache(monkeypatch, tmp_path):
+    """Give each test an empty render cache."""
+    cache = PDFRenderCache(cache_dir=tmp_path, memory_max_bytes=1024, disk_max_bytes=4096)
+    monkeypatch.setattr(pdf_service_module.pdf_service, "render_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def thread_engine(monkeypatch, render_cache):
+    """Swap the global render engine for an in-process one with a fake renderer."""
+    engine = PDFRenderEngine(workers=0, max_queue=1, timeout=5.0)
+    monkeypatch.setattr(pdf_service_module, "render_engine", engine)
+    monkeypatch.setattr(pdf_render_module, "render_pdf", lambda html: FAKE_PDF)
+    yield engine
+    engine.shutdown()
+
+
+def test_card_preview_renders_through_engine(test_patient, auth_token, thread_engine):
+    response = client.get(
+        f"/api/v1/patients/{test_patient.id}/card-pdf",
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content == FAKE_PDF
+    assert thread_engine.in_flight == 0
+
+
+def test_card_preview_returns_503_when_saturated(test_patient, auth_token, thread_engine):
+    thread_engine._in_flight = thread_engine.capacity
+
+    response = client.get(
+        f"/api/v1/patients/{test_patient.id}/card-pdf",
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+    thread_engine._in_flight = 0
+
+
+def test_generate_card_returns_504_on_render_timeout(test_patient, auth_token, thread_engine, monkeypatch):
+    hung = threading.Event()
+    finished = threading.Event()
+
+    def hung_render(html):
+        hung.wait(5)
+        finished.set()
+        return FAKE_PDF
+
+    thread_engine.timeout = 0.05
+    monkeypatch.setattr(pdf_render_module, "render_pdf", hung_render)
+    stuck_executor = thread_engine._get_executor()
+
+    response = client.post(
+        f"/api/v1/patients/{test_patient.id}/generate-card",
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+
+    assert response.status_code == 504
+    # The stuck worker's pool is replaced; the hung render keeps its slot until it ends
+    assert thread_engine._executor is not stuck_executor
+    assert thread_engine.in_flight == 1
+
+    monkeypatch.setattr(pdf_render_module, "render_pdf", lambda html: FAKE_PDF)
+    response = client.get(
+        f"/api/v1/patients/{test_patient.id}/card-pdf",
+        headers={"Authorization": f"Bearer {auth_token}"}
+    )
+    assert response.status_code == 200
+
+    hung.set()
+    assert finished.wait(5)
+    stuck_executor.shutdown(wait=True)
+    assert thread_engine.in_flight == 0
+
+
+def test_card_preview_is_served_from_render_cache(test_patient, auth_token, thread_engine, render_cache, monkeypatch):
+    renders = []
+
+    def counting_render(html):
+        renders.append(html)
+        return FAKE_PDF
+
+    monkeypatch.setattr(pdf_render_module, "render_pdf", counting_render)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    first = client.get(f"/api/v1/patients/{test_patient.id}/card-pdf", headers=headers)
+    second = client.get(f"/api/v1/patients/{test_patient.id}/card-pdf", headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.content == FAKE_PDF
+    assert len(renders) == 1
+    assert render_cache.stats()["memory_hits"] == 1
+
+    # A change to the patient changes the rendered HTML and therefore the key
+    client.put(
+        f"/api/v1/patients/{test_patient.id}",
+        json={"phone": "+59170000001"},
+        headers=headers
+    )
+    client.get(f"/api/v1/patients/{test_patient.id}/card-pdf", headers=headers)
+    assert len(renders) == 2
+
+
+def test_render_cache_disk_tier_and_eviction(tmp_path):
+    cache = PDFRenderCache(cache_dir=tmp_path, memory_max_bytes=10, disk_max_bytes=100)
+    first_key = cache.fingerprint("<p>first</p>")
+    cache.put(first_key, b"x" * 60)
+
+    assert cache.get_from_memory(first_key) is None  # Larger than the memory tier
+    assert cache.get_from_disk(first_key) == b"x" * 60
+
+    second_key = cache.fingerprint("<p>second</p>")
+    cache.put(second_key, b"y" * 60)
+
+    assert cache.get_from_disk(first_key) is None
+    assert cache.get_from_disk(second_key) == b"y" * 60
+    stats = cache.stats()
+    assert stats["disk_hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+
+def test_render_cache_key_follows_replaced_logo(tmp_path):
+    logo = tmp_path / "logo.png"
+    logo.write_bytes(b"old logo")
+    html = f'<img src="file://{logo}" alt="Logo">'
+    before = PDFRenderCache.fingerprint(html)
+    assert PDFRenderCache.fingerprint(html) == before
+
+    # Same path, same HTML, new image
+    logo.write_bytes(b"new logo!")
+    assert PDFRenderCache.fingerprint(html) != before
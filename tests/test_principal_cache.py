@@ -0,0 +1,86 @@
+"""
+Principal cache tests.
+Verifies that authenticated requests are served without querying users and
+that cached principals are invalidated when a user changes.
+"""
+from sqlalchemy import event
+
+from app.core.principal_cache import principal_cache
+from app.models.user import User, UserRole
+from tests.conftest import client, engine, TestingSessionLocal
+
+
+def _count_user_queries(action) -> int:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return len(statements)
+
+
+def test_repeated_requests_do_not_query_users(test_patient, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.get(f"/api/v1/patients/{test_patient.id}", headers=headers)
+
+    queries = _count_user_queries(
+        lambda: client.get(f"/api/v1/patients/{test_patient.id}", headers=headers)
+    )
+
+    assert queries == 0
+
+
+def test_deactivated_user_is_rejected_immediately(test_patient, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    assert client.get(f"/api/v1/patients/{test_patient.id}", headers=headers).status_code == 200
+
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.username == "doctor_test").one()
+    user.is_active = False
+    db.commit()
+    db.close()
+
+    response = client.get(f"/api/v1/patients/{test_patient.id}", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
+
+
+def test_role_change_is_applied_immediately(test_patient, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    assert client.get(f"/api/v1/patients/{test_patient.id}", headers=headers).status_code == 200
+
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.username == "admin_test").one()
+    user.role = UserRole.SECRETARIA
+    db.commit()
+    db.close()
+
+    response = client.delete(f"/api/v1/patients/{test_patient.id}", headers=headers)
+    assert response.status_code == 403
+
+
+def test_invalidation_waits_for_commit(test_patient, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    assert client.get(f"/api/v1/patients/{test_patient.id}", headers=headers).status_code == 200
+
+    def cached() -> bool:
+        return any(key[0] == "doctor_test" for key in principal_cache._entries)
+
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.username == "doctor_test").one()
+    user.is_active = False
+    db.flush()
+    # Flushed but not committed: other sessions may still read (and cache) the old row
+    assert cached()
+    db.commit()
+    assert not cached()
+    db.close()
+
+    response = client.get(f"/api/v1/patients/{test_patient.id}", headers=headers)
+    assert response.json()["detail"] == "Inactive user"
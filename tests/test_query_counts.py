@@ -0,0 +1,73 @@
+"""
+Query-count guards for endpoints that return related names (N+1 regressions).
+"""
+import pytest
+
+from app.core.security import get_password_hash
+from app.models.attachment import Attachment, AttachmentType
+from app.models.encounter import Encounter, MedicalSpecialty
+from app.models.user import User, UserRole
+from tests.conftest import client, TestingSessionLocal, assert_max_queries
+
+
+@pytest.fixture
+def encounter_with_attachments(test_patient, test_doctor):
+    """An encounter with attachments from several different uploaders."""
+    db = TestingSessionLocal()
+    encounter = Encounter(
+        patient_id=test_patient.id,
+        doctor_id=test_doctor.id,
+        specialty=MedicalSpecialty.DERMATOLOGIA,
+        subjective="Lesión en antebrazo",
+    )
+    db.add(encounter)
+    db.flush()
+    for i in range(4):
+        uploader = User(
+            email=f"uploader{i}@test.com",
+            username=f"uploader_{i}",
+            full_name=f"Uploader {i}",
+            hashed_password=get_password_hash("password123"),
+            role=UserRole.DOCTOR,
+        )
+        db.add(uploader)
+        db.flush()
+        db.add(Attachment(
+            patient_id=test_patient.id,
+            encounter_id=encounter.id,
+            created_by=uploader.id,
+            file_path=f"uploads/photo_{i}.jpg",
+            mime_type="image/jpeg",
+            attachment_type=AttachmentType.PHOTO,
+        ))
+    db.commit()
+    encounter_id = encounter.id
+    db.close()
+    return encounter_id
+
+
+def _get(url, token, max_queries):
+    headers = {"Authorization": f"Bearer {token}"}
+    # Warm the principal cache so only the endpoint's own queries are counted
+    client.get(url, headers=headers)
+    with assert_max_queries(max_queries):
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_encounter_detail_loads_names_in_one_query(auth_token, encounter_with_attachments):
+    data = _get(f"/api/v1/encounters/{encounter_with_attachments}", auth_token, max_queries=1)
+
+    assert data["patient_name"] == "John Doe"
+    assert data["doctor_name"] == "Dr. Test"
+
+
+def test_encounter_attachments_do_not_load_uploaders_per_row(auth_token, encounter_with_attachments):
+    url = f"/api/v1/attachments/encounters/{encounter_with_attachments}/attachments"
+    data = _get(url, auth_token, max_queries=2)
+
+    assert sorted(item["uploader_name"] for item in data) == [f"Uploader {i}" for i in range(4)]
+
+    detail = _get(f"/api/v1/attachments/{data[0]['id']}", auth_token, max_queries=1)
+    assert detail["uploader_name"] == data[0]["uploader_name"]
@@ -0,0 +1,81 @@
+"""
+Readiness endpoint and background WeasyPrint self-test tests.
+"""
+import pytest
+
+import app.main as main_module
+import app.services.selftest as selftest_module
+from app.services.selftest import WeasyPrintSelfTest, PASSED, FAILED, SKIPPED
+from tests.conftest import client
+
+
+@pytest.fixture
+def selftest(monkeypatch):
+    """Fresh self-test state for the readiness endpoint."""
+    instance = WeasyPrintSelfTest(timeout=30)
+    monkeypatch.setattr(main_module, "weasyprint_selftest", instance)
+    return instance
+
+
+def test_not_ready_while_selftest_pending(selftest):
+    response = client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["checks"]["weasyprint"]["status"] == "pending"
+
+
+def test_ready_when_selftest_skipped(selftest):
+    selftest.skip()
+
+    response = client.get("/health/ready")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert response.json()["checks"]["weasyprint"]["status"] == SKIPPED
+
+
+def test_not_ready_when_database_down(selftest, monkeypatch):
+    selftest.skip()
+
+    def _raise():
+        raise Exception("db down")
+
+    monkeypatch.setattr(main_module, "SessionLocal", _raise)
+
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["database"] == "down"
+
+
+def test_selftest_runs_in_background_subprocess(selftest, monkeypatch):
+    monkeypatch.setattr(
+        selftest_module,
+        "_CHILD_SCRIPT",
+        "import sys, json\n"
+        "sys.stderr.write('Fontconfig warning: noisy native output\\n')\n"
+        "print(json.dumps({'size': 1234, 'header_ok': True}))\n",
+    )
+    started = []
+
+    selftest.start(on_success=lambda: started.append(True))
+    assert selftest.wait(timeout=30)
+
+    assert selftest.status == PASSED
+    assert selftest.detail == "1234 bytes"
+    assert started == [True]
+    assert client.get("/health/ready").status_code == 200
+
+
+def test_selftest_failure_reported(selftest, monkeypatch):
+    monkeypatch.setattr(main_module.settings, "DEBUG", False)
+    monkeypatch.setattr(
+        selftest_module,
+        "_CHILD_SCRIPT",
+        "raise OSError('cannot load library libpango-1.0-0')\n",
+    )
+
+    selftest.run()
+
+    assert selftest.status == FAILED
+    assert "libpango" in selftest.detail
+    assert client.get("/health/ready").status_code == 503
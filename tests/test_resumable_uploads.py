@@ -0,0 +1,171 @@
+"""
+Tests for resumable (tus-style) attachment uploads.
+"""
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+
+import pytest
+from starlette.requests import ClientDisconnect
+
+from app.models.attachment import Attachment
+from app.models.upload_session import UploadSession
+from app.services.attachment_storage import attachment_storage
+from app.services.blob_store import blob_store
+from app.services.storage_backends import LocalStorageBackend
+from app.services.resumable_uploads import UploadBusyError, resumable_uploads
+from tests.conftest import client, TestingSessionLocal
+
+SCAN = bytes(range(256)) * 200
+PATCH_TYPE = {"Content-Type": "application/offset+octet-stream"}
+
+
+@pytest.fixture
+def storage_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(attachment_storage, "directory", tmp_path / "attachments")
+    monkeypatch.setattr(resumable_uploads, "staging_dir", tmp_path / "staging")
+    monkeypatch.setattr(blob_store, "backend", LocalStorageBackend(tmp_path / "blobs"))
+    return tmp_path
+
+
+def _create(headers, patient_id, length=len(SCAN)):
+    return client.post(
+        "/api/v1/attachments/uploads/",
+        json={
+            "patient_id": patient_id,
+            "attachment_type": "PDF",
+            "original_filename": "resonancia.pdf",
+            "mime_type": "application/pdf",
+            "length": length,
+        },
+        headers=headers,
+    )
+
+
+def test_upload_in_parts_is_assembled(test_patient, auth_token, storage_dirs):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    created = _create(headers, test_patient.id)
+    assert created.status_code == 201
+    assert created.headers["Upload-Offset"] == "0"
+    url = created.headers["Location"]
+
+    first = client.patch(url, content=SCAN[:20000], headers={**headers, **PATCH_TYPE, "Upload-Offset": "0"})
+    assert first.status_code == 204
+    assert first.headers["Upload-Offset"] == "20000"
+
+    # A retry of the same part is refused with the server's offset
+    stale = client.patch(url, content=SCAN[:20000], headers={**headers, **PATCH_TYPE, "Upload-Offset": "0"})
+    assert stale.status_code == 409
+    assert stale.headers["Upload-Offset"] == "20000"
+
+    offset = client.head(url, headers=headers).headers["Upload-Offset"]
+    last = client.patch(url, content=SCAN[int(offset):], headers={**headers, **PATCH_TYPE, "Upload-Offset": offset})
+    assert last.status_code == 204
+    attachment_id = last.headers["X-Attachment-ID"]
+
+    attachment = client.get(f"/api/v1/attachments/{attachment_id}", headers=headers).json()
+    assert attachment["file_size"] == len(SCAN)
+    assert attachment["file_hash"] == hashlib.sha256(SCAN).hexdigest()
+    assert attachment["original_filename"] == "resonancia.pdf"
+    download = client.get(f"/api/v1/attachments/{attachment_id}/download", headers=headers)
+    assert download.content == SCAN
+    assert list((storage_dirs / "staging").iterdir()) == []
+
+
+def test_dropped_connection_keeps_received_bytes(test_patient, auth_token, storage_dirs):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    url = _create(headers, test_patient.id).headers["Location"]
+    upload_id = url.rsplit("/", 1)[-1]
+
+    async def flaky_body():
+        yield SCAN[:1000]
+        yield SCAN[1000:3000]
+        raise ClientDisconnect()
+
+    db = TestingSessionLocal()
+    try:
+        upload = db.get(UploadSession, upload_id)
+        token = resumable_uploads.claim(db, upload, 0)
+        with pytest.raises(ClientDisconnect):
+            asyncio.run(resumable_uploads.append(db, upload, token, flaky_body()))
+        resumable_uploads.release(db, upload, token)
+    finally:
+        db.close()
+
+    assert client.head(url, headers=headers).headers["Upload-Offset"] == "3000"
+    rest = client.patch(url, content=SCAN[3000:], headers={**headers, **PATCH_TYPE, "Upload-Offset": "3000"})
+    assert rest.status_code == 204
+    assert "X-Attachment-ID" in rest.headers
+
+
+def test_upload_leased_by_another_worker_is_refused(test_patient, auth_token, storage_dirs):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    url = _create(headers, test_patient.id).headers["Location"]
+    upload_id = url.rsplit("/", 1)[-1]
+
+    # Another worker is writing this upload
+    db = TestingSessionLocal()
+    try:
+        resumable_uploads.claim(db, db.get(UploadSession, upload_id), 0)
+        busy = client.patch(url, content=SCAN, headers={**headers, **PATCH_TYPE, "Upload-Offset": "0"})
+        assert busy.status_code == 409
+        assert busy.headers["Upload-Offset"] == "0"
+
+        # ... and died: its lease runs out
+        db.get(UploadSession, upload_id).leased_until = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+    finally:
+        db.close()
+
+    done = client.patch(url, content=SCAN, headers={**headers, **PATCH_TYPE, "Upload-Offset": "0"})
+    assert done.status_code == 204
+    assert "X-Attachment-ID" in done.headers
+
+
+def test_failed_completion_creates_no_attachment(test_patient, auth_token, storage_dirs, monkeypatch):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    url = _create(headers, test_patient.id).headers["Location"]
+    complete = resumable_uploads.complete
+
+    def lose_lease_once(db, upload, token, attachment):
+        monkeypatch.setattr(resumable_uploads, "complete", complete)
+        raise UploadBusyError(upload.id)
+
+    monkeypatch.setattr(resumable_uploads, "complete", lose_lease_once)
+    failed = client.patch(url, content=SCAN, headers={**headers, **PATCH_TYPE, "Upload-Offset": "0"})
+    assert failed.status_code == 409
+
+    db = TestingSessionLocal()
+    try:
+        assert db.query(Attachment).count() == 0
+    finally:
+        db.close()
+
+    # The staged file is still there; an empty PATCH at the final offset finishes the upload
+    offset = str(len(SCAN))
+    retry = client.patch(url, content=b"", headers={**headers, **PATCH_TYPE, "Upload-Offset": offset})
+    assert retry.status_code == 204
+    download = client.get(f"/api/v1/attachments/{retry.headers['X-Attachment-ID']}/download", headers=headers)
+    assert download.content == SCAN
+
+
+def test_limits_and_expiry(test_patient, auth_token, storage_dirs, monkeypatch):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    monkeypatch.setattr(attachment_storage, "max_bytes", 1000)
+    assert _create(headers, test_patient.id).status_code == 413
+
+    url = _create(headers, test_patient.id, length=10).headers["Location"]
+    too_long = client.patch(url, content=b"x" * 11, headers={**headers, **PATCH_TYPE, "Upload-Offset": "0"})
+    assert too_long.status_code == 413
+
+    upload_id = url.rsplit("/", 1)[-1]
+    db = TestingSessionLocal()
+    try:
+        db.get(UploadSession, upload_id).expires_at = datetime.utcnow() - timedelta(minutes=1)
+        db.commit()
+        assert client.head(url, headers=headers).status_code == 410
+        assert resumable_uploads.purge_expired(db) == 1
+    finally:
+        db.close()
+    assert client.head(url, headers=headers).status_code == 404
+    assert list((storage_dirs / "staging").iterdir()) == []
@@ -0,0 +1,88 @@
+"""
+Tests for buffered snippet usage counters.
+"""
+import threading
+
+import pytest
+
+from app.models.encounter import MedicalSpecialty
+from app.models.snippet import Snippet, SnippetCategory
+from app.services.usage_counter import UsageCounter, snippet_usage
+from tests.conftest import client, TestingSessionLocal, count_queries, engine
+
+
+@pytest.fixture
+def snippet(test_db):
+    db = TestingSessionLocal()
+    snippet = Snippet(
+        specialty=MedicalSpecialty.CARDIOLOGIA,
+        title="Soplo sistólico",
+        category=SnippetCategory.DX,
+        content="Soplo sistólico grado II/VI",
+        usage_count=5,
+    )
+    db.add(snippet)
+    db.commit()
+    db.refresh(snippet)
+    db.close()
+    yield snippet
+    # Never leave counts for a dropped test database in the shared counter
+    snippet_usage.flush()
+
+
+def _stored_usage(snippet_id):
+    db = TestingSessionLocal()
+    try:
+        return db.query(Snippet.usage_count).filter(Snippet.id == snippet_id).scalar()
+    finally:
+        db.close()
+
+
+def test_get_snippet_is_a_pure_read(auth_token, snippet):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    client.get(f"/api/v1/snippets/{snippet.id}", headers=headers)
+
+    with count_queries() as statements:
+        response = client.get(f"/api/v1/snippets/{snippet.id}", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["usage_count"] == 5
+    assert all(sql.lstrip().upper().startswith("SELECT") for sql in statements)
+    assert _stored_usage(snippet.id) == 5
+
+
+def test_record_usage_is_buffered_then_flushed(auth_token, snippet):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+
+    assert client.post(f"/api/v1/snippets/{snippet.id}/usage", headers=headers).status_code == 202
+    assert client.post(f"/api/v1/snippets/{snippet.id}/usage?uses=2", headers=headers).status_code == 202
+
+    # Not written yet, but visible to this process
+    assert _stored_usage(snippet.id) == 5
+    assert client.get(f"/api/v1/snippets/{snippet.id}", headers=headers).json()["usage_count"] == 8
+
+    assert snippet_usage.flush() == 1
+    assert _stored_usage(snippet.id) == 8
+    assert snippet_usage.pending(snippet.id) == 0
+
+
+def test_record_usage_unknown_snippet_404(auth_token, test_db):
+    response = client.post("/api/v1/snippets/999/usage", headers={"Authorization": f"Bearer {auth_token}"})
+    assert response.status_code == 404
+
+
+def test_concurrent_uses_are_not_lost(snippet):
+    counter = UsageCounter(flush_interval=60)
+
+    def use_many():
+        for _ in range(200):
+            counter.record(engine, snippet.id)
+
+    threads = [threading.Thread(target=use_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.stop()
+
+    assert _stored_usage(snippet.id) == 5 + 800
@@ -0,0 +1,120 @@
+"""
+Tests for SQLite connection pragmas and the in-process write gate.
+"""
+import threading
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db.pool_metrics import InstrumentedQueuePool
+from app.db.sqlite_tuning import SQLiteWriteGate, apply_sqlite_pragmas, attach_write_gate, sqlite_pragmas
+
+
+@pytest.fixture
+def gated_engine(tmp_path):
+    """File SQLite engine with a zero busy_timeout, so any lock contention fails fast."""
+    file_engine = create_engine(
+        f"sqlite:///{tmp_path / 'gate.db'}",
+        connect_args={"check_same_thread": False},
+        poolclass=InstrumentedQueuePool,
+        pool_size=4,
+    )
+    apply_sqlite_pragmas(file_engine, sqlite_pragmas("WAL", "NORMAL", 0, 16, 8))
+    gate = SQLiteWriteGate(timeout=5)
+    attach_write_gate(file_engine, gate)
+    with file_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)"))
+    yield file_engine, gate
+    file_engine.dispose()
+
+
+def test_pragmas_applied_on_connect(gated_engine):
+    file_engine, _ = gated_engine
+
+    with file_engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 0
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -8 * 1024
+
+
+def test_gate_queues_concurrent_writers(gated_engine):
+    file_engine, gate = gated_engine
+    Session = sessionmaker(bind=file_engine)
+    first_wrote = threading.Event()
+    finish_first = threading.Event()
+    errors = []
+
+    def first_writer():
+        db = Session()
+        try:
+            db.execute(text("INSERT INTO notes (body) VALUES ('first')"))
+            first_wrote.set()
+            finish_first.wait(5)
+            db.commit()
+        except Exception as error:
+            errors.append(error)
+        finally:
+            db.close()
+
+    def second_writer():
+        db = Session()
+        try:
+            db.execute(text("INSERT INTO notes (body) VALUES ('second')"))
+            db.commit()
+        except Exception as error:
+            errors.append(error)
+        finally:
+            db.close()
+
+    first = threading.Thread(target=first_writer)
+    first.start()
+    assert first_wrote.wait(5)
+
+    second = threading.Thread(target=second_writer)
+    second.start()
+    second.join(0.3)
+    # Without the gate the second insert would fail at once with "database is locked"
+    assert second.is_alive()
+
+    # Reads are not blocked by the pending write
+    with file_engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM notes")).scalar() == 0
+
+    finish_first.set()
+    first.join(5)
+    second.join(5)
+
+    assert errors == []
+    assert not gate.locked
+    with file_engine.connect() as conn:
+        assert conn.execute(text("SELECT body FROM notes ORDER BY id")).scalars().all() == ["first", "second"]
+
+
+def test_gate_released_when_session_closes_without_commit(gated_engine):
+    file_engine, gate = gated_engine
+    db = sessionmaker(bind=file_engine)()
+
+    db.execute(text("INSERT INTO notes (body) VALUES ('abandoned')"))
+    assert gate.locked
+    db.close()
+
+    assert not gate.locked
+    with file_engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM notes")).scalar() == 0
+
+
+def test_gate_timeout_raises(gated_engine):
+    file_engine, gate = gated_engine
+    gate.timeout = 0.1
+    holder = sessionmaker(bind=file_engine)()
+    holder.execute(text("INSERT INTO notes (body) VALUES ('held')"))
+
+    with pytest.raises(exc.TimeoutError):
+        with file_engine.begin() as conn:
+            conn.execute(text("INSERT INTO notes (body) VALUES ('late')"))
+
+    holder.close()
+    assert gate.timeouts == 1
+    assert not gate.locked
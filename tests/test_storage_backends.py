@@ -0,0 +1,138 @@
+"""
+Tests for the S3 storage backend, against moto's in-process S3.
+"""
+import hashlib
+import io
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+from app.models.blob import Blob
+from app.services.attachment_storage import attachment_storage
+from app.services.blob_store import blob_store
+from app.services.storage_backends import S3StorageBackend
+from tests.conftest import client, TestingSessionLocal
+
+SCAN = b"\x89PNG\r\n" + bytes(range(256)) * 300
+SCAN_HASH = hashlib.sha256(SCAN).hexdigest()
+
+
+@pytest.fixture
+def s3_backend(tmp_path, monkeypatch):
+    with moto.mock_aws():
+        s3 = boto3.client(
+            "s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"
+        )
+        s3.create_bucket(Bucket="galenos")
+        backend = S3StorageBackend(bucket="galenos", prefix="blobs/", client=s3)
+        monkeypatch.setattr(attachment_storage, "directory", tmp_path / "incoming")
+        monkeypatch.setattr(blob_store, "backend", backend)
+        monkeypatch.setattr(blob_store, "presigned_url_seconds", 300)
+        yield backend
+
+
+def _upload(token, patient_id):
+    return client.post(
+        "/api/v1/attachments/",
+        files={"file": ("ecografia.png", io.BytesIO(SCAN), "image/png")},
+        data={"patient_id": str(patient_id), "attachment_type": "PHOTO"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+def test_backend_streams_ranges_and_lists(s3_backend, tmp_path):
+    source = tmp_path / "scan.png"
+    source.write_bytes(SCAN)
+    s3_backend.put_file("ab/cd/scan", source)
+
+    stored = s3_backend.stat("ab/cd/scan")
+    assert stored.size == len(SCAN)
+    assert b"".join(stored.iter_bytes()) == SCAN
+    assert b"".join(stored.iter_bytes(10, 19)) == SCAN[10:20]
+    assert [obj.key for obj in s3_backend.list_objects()] == ["ab/cd/scan"]
+    assert s3_backend.touch("ab/cd/scan") is True
+    # Touching never rewrites the object (a copy would drop its content type)
+    s3_backend.client.put_object(Bucket="galenos", Key="blobs/ab/cd/typed", Body=b"x", ContentType="image/png")
+    assert s3_backend.touch("ab/cd/typed") is True
+    assert s3_backend.client.head_object(Bucket="galenos", Key="blobs/ab/cd/typed")["ContentType"] == "image/png"
+    s3_backend.delete("ab/cd/typed")
+
+    s3_backend.delete("ab/cd/scan")
+    assert s3_backend.stat("ab/cd/scan") is None
+    assert s3_backend.touch("ab/cd/scan") is False
+
+
+def test_download_redirects_to_presigned_url(s3_backend, test_patient, auth_token):
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    first = _upload(auth_token, test_patient.id).json()
+    _upload(auth_token, test_patient.id)
+
+    keys = [obj.key for obj in s3_backend.list_objects()]
+    assert keys == [blob_store.key_for(SCAN_HASH)]
+
+    response = client.get(f"/api/v1/attachments/{first['id']}/download", headers=headers, follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["cache-control"] == "private, no-store"
+    url = urlparse(response.headers["location"])
+    assert url.path.endswith(f"/blobs/{blob_store.key_for(SCAN_HASH)}")
+    query = parse_qs(url.query)
+    assert query["response-content-disposition"] == ['attachment; filename="ecografia.png"']
+    assert "X-Amz-Signature" in query or "Signature" in query
+
+
+def test_download_streams_through_api_when_presigning_is_off(s3_backend, test_patient, auth_token, monkeypatch):
+    monkeypatch.setattr(blob_store, "presigned_url_seconds", 0)
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    attachment_id = _upload(auth_token, test_patient.id).json()["id"]
+
+    full = client.get(f"/api/v1/attachments/{attachment_id}/download", headers=headers)
+    assert full.status_code == 200
+    assert full.content == SCAN
+
+    partial = client.get(
+        f"/api/v1/attachments/{attachment_id}/download",
+        headers={**headers, "Range": "bytes=100-199"},
+    )
+    assert partial.status_code == 206
+    assert partial.content == SCAN[100:200]
+
+
+def test_put_racing_gc_stores_the_object_again(s3_backend, test_db, monkeypatch):
+    db = TestingSessionLocal()
+    try:
+        reference = blob_store.put_bytes(db, SCAN, SCAN_HASH)
+        db.commit()
+        blob = db.get(Blob, SCAN_HASH)
+        blob.refcount = 0
+        blob.updated_at = blob.updated_at - timedelta(days=2)
+        db.commit()
+    finally:
+        db.close()
+
+    touch = s3_backend.touch
+
+    def touch_then_collect(key):
+        exists = touch(key)
+        # The garbage collector removes the row and object between the put's
+        # existence check and its new reference
+        gc_db = TestingSessionLocal()
+        try:
+            assert blob_store.collect_garbage(gc_db, timedelta(hours=24)).blobs == 1
+        finally:
+            gc_db.close()
+        return exists
+
+    monkeypatch.setattr(s3_backend, "touch", touch_then_collect)
+    db = TestingSessionLocal()
+    try:
+        assert blob_store.put_bytes(db, SCAN, SCAN_HASH) == reference
+        db.commit()
+        assert db.get(Blob, SCAN_HASH).refcount == 1
+    finally:
+        db.close()
+
+    assert b"".join(s3_backend.stat(blob_store.key_for(SCAN_HASH)).iter_bytes()) == SCAN